@@ -0,0 +1,297 @@
+import hashlib
+import hmac
+import threading
+import time
+
+import hyperliquid_local.sdk_wrapper as hl_wrapper
+import bybit_local.sdk_wrapper_bybit as bybit_wrapper
+from market_stream import _StreamWorker, HL_WS_URL
+from rate_governor import PRIORITY_BACKGROUND, RequestDeferred, priority
+
+# Private account feeds that keep a local position and balance book. The book
+# is updated incrementally from HL webData2/userEvents and Bybit position/
+# wallet/execution topics, and reconciled against REST on a slow timer only.
+BYBIT_PRIVATE_WS_URL = "wss://stream.bybit.com/v5/private"
+BYBIT_PRIVATE_WS_TESTNET_URL = "wss://stream-testnet.bybit.com/v5/private"
+
+RECONCILE_INTERVAL = 120  # seconds between REST reconciliations
+# Pushes only come on changes, but the reconcile timer refreshes both venues;
+# a book older than this means the feed and the reconcile have both stalled
+BOOK_MAX_AGE = RECONCILE_INTERVAL + 60
+BYBIT_AUTH_TTL_MS = 10000
+
+
+def _usdt_linear(position):
+    # Same scope as the REST path (category=linear, settleCoin=USDT)
+    return (position.get("category", "linear") == "linear"
+            and position.get("settleCoin", "USDT") == "USDT"
+            and position.get("symbol", "").endswith("USDT"))
+
+
+class AccountBook:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hl_state = None            # user_state()-shaped dict
+        self.bybit_positions = None     # symbol -> position dict
+        self.bybit_wallets = None       # accountType -> wallet entry
+        self.last_update = {"hl": 0.0, "bybit": 0.0}
+        self.connected = {"hl": False, "bybit": False}
+        self.executions = []            # most recent Bybit executions
+        self._listeners = []
+
+    # === Listeners
+    def add_listener(self, fn):
+        """fn(venue, keys) is called after every update, outside the lock."""
+        self._listeners.append(fn)
+
+    def _notify(self, venue, keys):
+        for fn in self._listeners:
+            try:
+                fn(venue, keys)
+            except Exception as e:
+                print(f"⚠️ Account book listener failed: {e}")
+
+    def set_connected(self, venue, connected):
+        with self._lock:
+            self.connected[venue] = connected
+
+    # === Hyperliquid
+    def replace_hl_state(self, state):
+        with self._lock:
+            self.hl_state = state
+            self.last_update["hl"] = time.time()
+        coins = [p.get("position", {}).get("coin") for p in state.get("assetPositions", [])]
+        self._notify("hl", coins)
+
+    def apply_hl_fill(self, fill):
+        """Move szi by one fill so the book is right before the next webData2 push."""
+        coin = fill["coin"]
+        size = float(fill["sz"]) if fill["side"] == "B" else -float(fill["sz"])
+        new_szi = float(fill.get("startPosition", 0)) + size
+        with self._lock:
+            if self.hl_state is None:
+                return
+            positions = [p for p in self.hl_state.get("assetPositions", [])
+                         if p.get("position", {}).get("coin") != coin]
+            if abs(new_szi) > 1e-12:
+                previous = next((p for p in self.hl_state.get("assetPositions", [])
+                                 if p.get("position", {}).get("coin") == coin), None)
+                position = dict(previous["position"]) if previous else {"coin": coin, "entryPx": fill["px"]}
+                position["szi"] = str(new_szi)
+                positions.append({"type": "oneWay", "position": position})
+            self.hl_state = dict(self.hl_state, assetPositions=positions)
+            self.last_update["hl"] = time.time()
+        self._notify("hl", (coin,))
+
+    # === Bybit
+    def replace_bybit_positions(self, positions):
+        positions = [p for p in positions if _usdt_linear(p)]
+        with self._lock:
+            self.bybit_positions = {p["symbol"]: p for p in positions if float(p.get("size") or 0) > 0}
+            self.last_update["bybit"] = time.time()
+        self._notify("bybit", [p["symbol"] for p in positions])
+
+    def apply_bybit_positions(self, positions):
+        positions = [p for p in positions if _usdt_linear(p)]
+        with self._lock:
+            if self.bybit_positions is None:
+                self.bybit_positions = {}
+            for p in positions:
+                if float(p.get("size") or 0) > 0:
+                    self.bybit_positions[p["symbol"]] = p
+                else:
+                    self.bybit_positions.pop(p["symbol"], None)
+            self.last_update["bybit"] = time.time()
+        self._notify("bybit", [p["symbol"] for p in positions])
+
+    def apply_bybit_wallets(self, wallets):
+        with self._lock:
+            if self.bybit_wallets is None:
+                self.bybit_wallets = {}
+            for wallet in wallets:
+                self.bybit_wallets[wallet["accountType"]] = wallet
+            self.last_update["bybit"] = time.time()
+        self._notify("bybit", ())
+
+    def apply_bybit_executions(self, executions):
+        with self._lock:
+            self.executions = (self.executions + list(executions))[-100:]
+        self._notify("bybit", [e.get("symbol") for e in executions])
+
+    # === Readers (shaped like the REST responses so callers need no changes)
+    def is_live(self, venue, max_age=BOOK_MAX_AGE):
+        """Connected, filled and updated (by the feed or a reconcile) within max_age seconds."""
+        with self._lock:
+            if not self.connected[venue] or time.time() - self.last_update[venue] > max_age:
+                return False
+            if venue == "hl":
+                return self.hl_state is not None
+            return self.bybit_positions is not None and self.bybit_wallets is not None
+
+    def hl_summary(self):
+        with self._lock:
+            return dict(self.hl_state) if self.hl_state else {}
+
+    def bybit_positions_response(self):
+        with self._lock:
+            positions = list((self.bybit_positions or {}).values())
+        return {"retCode": 0, "result": {"list": positions}}
+
+    def bybit_balances_response(self):
+        with self._lock:
+            wallets = dict(self.bybit_wallets or {})
+        return {account_type: {"retCode": 0, "result": {"list": [wallet]}}
+                for account_type, wallet in wallets.items()}
+
+
+class HyperliquidAccountStream(_StreamWorker):
+    venue = "hl"
+    heartbeat_interval = 50
+
+    def __init__(self, book, address, url=HL_WS_URL):
+        self.book = book
+        super().__init__(book, url)
+        self.address = address
+
+    def subscribe_messages(self):
+        return [
+            {"method": "subscribe", "subscription": {"type": "webData2", "user": self.address}},
+            {"method": "subscribe", "subscription": {"type": "userEvents", "user": self.address}},
+        ]
+
+    def heartbeat_message(self):
+        return {"method": "ping"}
+
+    def handle(self, msg):
+        channel = msg.get("channel")
+        if channel == "webData2":
+            state = msg["data"].get("clearinghouseState")
+            if state is not None:
+                self.book.replace_hl_state(state)
+        elif channel in ("user", "userEvents"):
+            for fill in msg["data"].get("fills", []):
+                self.book.apply_hl_fill(fill)
+
+    def resync(self):
+        reconcile_hl(self.book)
+
+
+class BybitAccountStream(_StreamWorker):
+    venue = "bybit"
+    heartbeat_interval = 20
+    topics = ("position", "wallet", "execution")
+
+    def __init__(self, book, api_key, api_secret, url=BYBIT_PRIVATE_WS_URL):
+        self.book = book
+        super().__init__(book, url)
+        self.api_key = api_key
+        self.api_secret = api_secret
+
+    def subscribe_messages(self):
+        # Topics are subscribed once the auth reply arrives
+        expires = int(time.time() * 1000) + BYBIT_AUTH_TTL_MS
+        signature = hmac.new(self.api_secret.encode(), f"GET/realtime{expires}".encode(), hashlib.sha256).hexdigest()
+        return [{"op": "auth", "args": [self.api_key, expires, signature]}]
+
+    def heartbeat_message(self):
+        return {"op": "ping"}
+
+    def handle(self, msg):
+        if msg.get("op") == "auth":
+            if msg.get("success"):
+                self.send({"op": "subscribe", "args": list(self.topics)})
+            else:
+                print(f"⚠️ Bybit private stream auth failed: {msg.get('ret_msg')}")
+            return
+        topic = msg.get("topic")
+        if topic == "position":
+            self.book.apply_bybit_positions(msg["data"])
+        elif topic == "wallet":
+            self.book.apply_bybit_wallets(msg["data"])
+        elif topic == "execution":
+            self.book.apply_bybit_executions(msg["data"])
+
+    def resync(self):
+        reconcile_bybit(self.book)
+
+
+# === REST reconciliation
+def reconcile_hl(book):
+    try:
+        book.replace_hl_state(hl_wrapper.get_account_summary())
+    except Exception as e:
+        print(f"⚠️ HL account reconcile failed: {e}")
+
+
+def reconcile_bybit(book):
+    try:
+        positions = bybit_wrapper.get_positions()
+        balances = bybit_wrapper.get_wallet_balances()
+    except RequestDeferred as e:
+        print(f"⚠️ Bybit reconcile skipped: {e}")
+        return
+    if positions.get("retCode") == 0:
+        book.replace_bybit_positions(positions["result"]["list"])
+    else:
+        print(f"⚠️ Bybit position reconcile failed: {positions.get('retMsg')}")
+
+    wallets = []
+    for balance in balances.values():
+        if balance.get("retCode") == 0:
+            wallets.extend(balance["result"]["list"])
+    if wallets:
+        book.apply_bybit_wallets(wallets)
+
+
+class AccountStreams:
+    def __init__(self, book, hl_stream, bybit_stream):
+        self.book = book
+        self.hl = hl_stream
+        self.bybit = bybit_stream
+        self._stop_event = threading.Event()
+
+    def _reconcile_loop(self):
+        while not self._stop_event.wait(RECONCILE_INTERVAL):
+            with priority(PRIORITY_BACKGROUND):
+                reconcile_hl(self.book)
+                reconcile_bybit(self.book)
+
+    def start(self):
+        self.hl.start()
+        self.bybit.start()
+        threading.Thread(target=self._reconcile_loop, daemon=True, name="account-reconcile").start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        self.hl.stop()
+        self.bybit.stop()
+
+    # === Readers with REST fallback
+    def hl_summary(self):
+        if self.book.is_live("hl"):
+            return self.book.hl_summary()
+        return hl_wrapper.get_account_summary()
+
+    def bybit_positions(self):
+        if self.book.is_live("bybit"):
+            return self.book.bybit_positions_response()
+        return bybit_wrapper.get_positions()
+
+    def bybit_balances(self):
+        if self.book.is_live("bybit"):
+            return self.book.bybit_balances_response()
+        return bybit_wrapper.get_wallet_balances()
+
+
+def start_account_streams(hl_url=HL_WS_URL, bybit_url=None):
+    """Start both private feeds for the configured HL wallet and Bybit key."""
+    config = bybit_wrapper.config
+    if bybit_url is None:
+        bybit_url = BYBIT_PRIVATE_WS_TESTNET_URL if config.get("testnet") else BYBIT_PRIVATE_WS_URL
+    book = AccountBook()
+    return AccountStreams(
+        book,
+        HyperliquidAccountStream(book, hl_wrapper.ACCOUNT_ADDRESS, url=hl_url),
+        BybitAccountStream(book, config["api_key"], config["api_secret"], url=bybit_url),
+    ).start()
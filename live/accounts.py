@@ -0,0 +1,44 @@
+from collections import namedtuple
+from hyperliquid_local.sdk_wrapper import HyperliquidAccount
+from bybit_local.sdk_wrapper_bybit import BybitAccount
+
+# Sub-accounts watched next to the main one (the wrappers' own config.json).
+# Each entry of the app config's "accounts" list names one account and the
+# venues it trades on; either venue may be left out:
+#
+#   {"name": "sub1",
+#    "hyperliquid": {"account_address": "0x...", "secret_key": "0x..."},
+#    "bybit": {"api_key": "...", "api_secret": "...", "testnet": false}}
+#
+# Only account state is fetched per account. Mids, funding and instruments
+# are market data and come from the shared module-level clients once per
+# refresh, whatever the number of accounts.
+Account = namedtuple("Account", ["name", "hl", "bybit"])  # hl / bybit are None when not configured
+
+
+def load_accounts(entries):
+    accounts, names = [], set()
+    for entry in entries:
+        name = entry["name"]
+        if name in names:
+            raise ValueError(f"Duplicate account name '{name}' in config.json")
+        names.add(name)
+        hl, bybit = entry.get("hyperliquid"), entry.get("bybit")
+        accounts.append(Account(
+            name=name,
+            hl=HyperliquidAccount(name, hl["account_address"], hl.get("secret_key")) if hl else None,
+            bybit=BybitAccount(name, bybit["api_key"], bybit["api_secret"], bybit.get("testnet", False)) if bybit else None,
+        ))
+    return tuple(accounts)
+
+
+def account_calls(account):
+    """Status calls for one account as {name: (fn, default)}, keyed '<account>.<call>'."""
+    calls = {}
+    if account.hl is not None:
+        calls[f"{account.name}.hl_summary"] = (account.hl.get_account_summary, {})
+    if account.bybit is not None:
+        calls[f"{account.name}.bybit_positions"] = (account.bybit.get_positions, {"retCode": -1})
+        calls[f"{account.name}.bybit_unified"] = (lambda: account.bybit.get_wallet_balance("UNIFIED"), {"retCode": -1})
+        calls[f"{account.name}.bybit_contract"] = (lambda: account.bybit.get_wallet_balance("CONTRACT"), {"retCode": -1})
+    return calls
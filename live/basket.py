@@ -0,0 +1,212 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hyperliquid_local.sdk_wrapper import (
+    get_account_summary, get_all_mids, market_order_request, bulk_orders_hl,
+)
+from bybit_local.sdk_wrapper_bybit import get_positions, place_batch_order_bybit, safe_float, BATCH_ORDER_LIMIT
+from instrument_registry import resolve_hl_coin, hl_coin_for
+from execution import prepare_pair_trade, apply_leverage
+
+# Basket open / close through the venues' batch endpoints: every HL leg goes
+# out in one bulk_orders action and the Bybit legs in place_batch_order
+# requests of up to BATCH_ORDER_LIMIT, all of them in flight together. Opening
+# a basket unwinds, again as one batch, any pair where only one leg filled.
+#
+#   BTC:bybit:1000:5, ETH:hl:500:3     coin : long venue : USD : leverage
+DEFAULT_LEVERAGE = 5
+LEVERAGE_WORKERS = 8
+
+_batch_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="basket")
+
+
+def parse_basket(text, default_leverage=DEFAULT_LEVERAGE):
+    """
+    Read pairs from "COIN:long_venue:usd[:leverage], ..." or from a JSON file
+    holding a list of {"coin", "long", "usd", "leverage"} objects.
+    """
+    text = text.strip()
+    if os.path.isfile(text):
+        with open(text) as f:
+            entries = json.load(f)
+        return [{"coin": resolve_hl_coin(e["coin"]), "long": e.get("long", "bybit").lower(),
+                 "usd": float(e["usd"]), "leverage": float(e.get("leverage", default_leverage))} for e in entries]
+    entries = []
+    for part in text.split(","):
+        fields = [f.strip() for f in part.split(":")]
+        if len(fields) < 3 or not fields[0]:
+            raise ValueError(f"Expected COIN:long_venue:usd[:leverage], got '{part.strip()}'")
+        long_venue = {"by": "bybit", "bybit": "bybit", "hl": "hl", "hyperliquid": "hl"}.get(fields[1].lower())
+        if long_venue is None:
+            raise ValueError(f"Unknown long venue '{fields[1]}' (use bybit or hl)")
+        entries.append({"coin": resolve_hl_coin(fields[0]), "long": long_venue, "usd": float(fields[2]),
+                        "leverage": float(fields[3]) if len(fields) > 3 and fields[3] else default_leverage})
+    return entries
+
+
+def prepare_basket(entries, slippage=0.01):
+    """Size every pair against one mids snapshot and one account value read."""
+    mids = get_all_mids()
+    account_value = safe_float(get_account_summary().get("marginSummary", {}).get("accountValue"))
+    plans = []
+    for entry in entries:
+        plan = prepare_pair_trade(entry["coin"], entry["long"], entry["usd"], entry["leverage"], slippage,
+                                  mids=mids, account_value=account_value)
+        if plan is not None:
+            plans.append(plan)
+    return plans
+
+
+def apply_basket_leverage(plans):
+    # No batch endpoint for leverage; set each pair in parallel instead
+    with ThreadPoolExecutor(max_workers=LEVERAGE_WORKERS, thread_name_prefix="basket-lev") as pool:
+        list(pool.map(apply_leverage, plans))
+
+
+# === 📦 Batched sends
+def _hl_batch(requests):
+    if not requests:
+        return []
+    try:
+        result = bulk_orders_hl(requests)
+    except Exception as e:
+        return [{"error": str(e)}] * len(requests)
+    if not isinstance(result, dict) or result.get("status") != "ok":
+        return [{"error": str(result.get("response") if isinstance(result, dict) else result)}] * len(requests)
+    statuses = result.get("response", {}).get("data", {}).get("statuses", [])
+    return statuses + [{"error": "no status returned"}] * (len(requests) - len(statuses))
+
+
+def _bybit_batch(orders):
+    try:
+        result = place_batch_order_bybit(orders)
+    except Exception as e:
+        return [{"ok": False, "msg": str(e)}] * len(orders)
+    if result.get("retCode") != 0:
+        return [{"ok": False, "msg": result.get("retMsg")}] * len(orders)
+    acks = result.get("result", {}).get("list", [])
+    infos = result.get("retExtInfo", {}).get("list", [])
+    out = []
+    for i in range(len(orders)):
+        info = infos[i] if i < len(infos) else {"code": -1, "msg": "no status returned"}
+        ack = acks[i] if i < len(acks) else {}
+        out.append({"ok": info.get("code") == 0, "msg": info.get("msg"), "orderId": ack.get("orderId")})
+    return out
+
+
+def send_batches(hl_requests, bybit_orders):
+    """
+    Submit one HL bulk action and every Bybit chunk at the same time. Returns
+    (HL statuses, Bybit results), each aligned with its input list.
+    """
+    started = time.perf_counter()
+    hl_future = _batch_pool.submit(_hl_batch, hl_requests)
+    chunks = [bybit_orders[i:i + BATCH_ORDER_LIMIT] for i in range(0, len(bybit_orders), BATCH_ORDER_LIMIT)]
+    by_futures = [_batch_pool.submit(_bybit_batch, chunk) for chunk in chunks]
+    hl_statuses = hl_future.result()
+    by_results = [r for future in by_futures for r in future.result()]
+    return hl_statuses, by_results, (time.perf_counter() - started) * 1000
+
+
+def _hl_ok(status):
+    return isinstance(status, dict) and "error" not in status
+
+
+# === 🧺 Open
+def open_basket(plans):
+    """Fire every pair's two legs as batches and unwind half-filled pairs. Returns a report."""
+    hl_requests = [market_order_request(p["hl_coin"], p["hl_is_buy"], p["hl_size"], p["mark_px"], p["slippage"])
+                   for p in plans]
+    bybit_orders = [{"symbol": p["symbol_bybit"], "side": p["bybit_side"], "qty": p["bybit_qty"]} for p in plans]
+    hl_statuses, by_results, elapsed_ms = send_batches(hl_requests, bybit_orders)
+
+    pairs = []
+    unwind_hl, unwind_bybit = [], []
+    for plan, hl_status, by_result in zip(plans, hl_statuses, by_results):
+        hl_ok, by_ok = _hl_ok(hl_status), by_result["ok"]
+        pairs.append({"plan": plan, "hl": hl_status, "bybit": by_result, "hl_ok": hl_ok, "bybit_ok": by_ok})
+        if hl_ok and not by_ok:
+            filled = safe_float(hl_status.get("filled", {}).get("totalSz")) or plan["hl_size"]
+            unwind_hl.append(market_order_request(plan["hl_coin"], not plan["hl_is_buy"], filled,
+                                                  plan["mark_px"], plan["slippage"], reduce_only=True))
+        elif by_ok and not hl_ok:
+            unwind_bybit.append({"symbol": plan["symbol_bybit"], "qty": plan["bybit_qty"], "reduceOnly": True,
+                                 "side": "Buy" if plan["bybit_side"] == "Sell" else "Sell"})
+
+    rollback = None
+    if unwind_hl or unwind_bybit:
+        hl_back, by_back, back_ms = send_batches(unwind_hl, unwind_bybit)
+        rollback = {"hl": hl_back, "bybit": by_back, "elapsed_ms": back_ms,
+                    "failed": sum(not _hl_ok(s) for s in hl_back) + sum(not r["ok"] for r in by_back)}
+    return {"pairs": pairs, "elapsed_ms": elapsed_ms, "rollback": rollback}
+
+
+# === 🧯 Close all
+def close_all_orders(hl_summary=None, bybit_positions=None, slippage=0.01):
+    """Reduce-only orders that flatten every open position on both venues."""
+    hl_summary = get_account_summary() if hl_summary is None else hl_summary
+    bybit_positions = get_positions() if bybit_positions is None else bybit_positions
+    mids = get_all_mids()
+
+    hl_requests = []
+    for p in hl_summary.get("assetPositions", []):
+        pos = p.get("position", {})
+        szi = safe_float(pos.get("szi"))
+        if szi == 0:
+            continue
+        coin = pos["coin"]
+        px = safe_float(mids.get(coin)) or safe_float(pos.get("entryPx"))
+        hl_requests.append(market_order_request(coin, szi < 0, abs(szi), px, slippage, reduce_only=True))
+
+    bybit_orders = []
+    if bybit_positions.get("retCode") == 0:
+        for pos in bybit_positions.get("result", {}).get("list", []):
+            size = safe_float(pos.get("size"))
+            if size > 0:
+                bybit_orders.append({"symbol": pos["symbol"], "qty": pos["size"], "reduceOnly": True,
+                                     "side": "Sell" if pos.get("side") == "Buy" else "Buy"})
+    return hl_requests, bybit_orders
+
+
+def close_all(hl_summary=None, bybit_positions=None, slippage=0.01):
+    """Flatten everything: one HL bulk action plus Bybit batches, all in flight together."""
+    hl_requests, bybit_orders = close_all_orders(hl_summary, bybit_positions, slippage)
+    hl_statuses, by_results, elapsed_ms = send_batches(hl_requests, bybit_orders)
+    return {
+        "hl": list(zip((r["coin"] for r in hl_requests), hl_statuses)),
+        "bybit": list(zip((o["symbol"] for o in bybit_orders), by_results)),
+        "elapsed_ms": elapsed_ms,
+    }
+
+
+# === 🖨️ Reports
+def print_open_report(report):
+    pairs = report["pairs"]
+    print(f"\n🧺 Basket of {len(pairs)} pairs sent in {report['elapsed_ms']:.1f} ms")
+    print(f"{'Coin':<10}| {'HL':<8}| {'Bybit':<8}| {'Notional':>10} | Detail")
+    print("-" * 80)
+    for pair in pairs:
+        plan = pair["plan"]
+        detail = "" if pair["hl_ok"] else f"HL: {pair['hl'].get('error')} "
+        detail += "" if pair["bybit_ok"] else f"Bybit: {pair['bybit'].get('msg')}"
+        print(f"{plan['hl_coin']:<10}| {'✅' if pair['hl_ok'] else '❌':<7}| {'✅' if pair['bybit_ok'] else '❌':<7}| "
+              f"{plan['notional']:>10.2f} | {detail}")
+    rollback = report["rollback"]
+    if rollback is not None:
+        state = "🚨 some unwinds FAILED, legs are unhedged" if rollback["failed"] else "✅ unwound"
+        print(f"↩️ Rolled back {len(rollback['hl']) + len(rollback['bybit'])} half-filled legs in "
+              f"{rollback['elapsed_ms']:.1f} ms: {state}")
+
+
+def print_close_report(report):
+    total = len(report["hl"]) + len(report["bybit"])
+    if total == 0:
+        print("✅ Nothing to close.")
+        return
+    print(f"\n🧯 Sent {total} closing orders in {report['elapsed_ms']:.1f} ms")
+    for coin, status in report["hl"]:
+        print(f"   HL {coin}: {'✅' if _hl_ok(status) else '❌ ' + str(status.get('error'))}")
+    for symbol, result in report["bybit"]:
+        print(f"   Bybit {hl_coin_for(symbol)} ({symbol}): {'✅' if result['ok'] else '❌ ' + str(result['msg'])}")
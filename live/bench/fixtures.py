@@ -0,0 +1,328 @@
+import json
+import os
+import random
+import time
+import zlib
+
+# Recorded exchange responses and the scenarios built from them. `record`
+# captures one real response per endpoint; a Scenario turns the recorded
+# universe (padded with synthetic coins when a run needs more symbols than
+# the venues list) into responses shaped exactly like the live APIs, sized for
+# the number of symbols under test.
+#
+#   python -m bench.fixtures record        # needs real keys in the config files
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+FIXTURE_PATH = os.path.join(FIXTURE_DIR, "recorded.json")
+
+HOUR_MS = 60 * 60 * 1000
+SYNTHETIC_SEED = 7
+DEFAULT_ACCOUNT_VALUE = 25000.0
+INSTRUMENTS_PAGE = 1000
+
+
+# === Recording
+def record_fixtures(path=FIXTURE_PATH, history_symbols=("BTCUSDT", "ETHUSDT")):
+    """Capture live responses for every endpoint the stand-ins replay."""
+    import hyperliquid_local.sdk_wrapper as hl_wrapper
+    import bybit_local.sdk_wrapper_bybit as bybit_wrapper
+    from coinalyze_client import CoinalyzeClient, bybit_symbol, hl_symbol
+
+    def hl_info(body):
+        return hl_wrapper.hl_http.post(f"https://{hl_wrapper.HL_HOST}/info", json=body).json()
+
+    session = bybit_wrapper.session
+    instruments, cursor = [], None
+    while True:
+        page = session.get_instruments_info(category="linear", limit=INSTRUMENTS_PAGE, cursor=cursor)
+        instruments.append(page)
+        cursor = page["result"].get("nextPageCursor")
+        if not cursor:
+            break
+
+    address = hl_wrapper.ACCOUNT_ADDRESS
+    recorded = {
+        "recorded_at": time.time(),
+        "hl_meta_and_ctxs": hl_wrapper.info.meta_and_asset_ctxs(),
+        "hl_predicted_fundings": hl_info({"type": "predictedFundings"}),
+        "hl_all_mids": hl_info({"type": "allMids"}),
+        "hl_user_state": hl_wrapper.info.user_state(address),
+        "hl_user_rate_limit": hl_wrapper.info.user_rate_limit(address),
+        "bybit_tickers": session.get_tickers(category="linear"),
+        "bybit_instruments": instruments,
+        "bybit_positions": session.get_positions(category="linear", settleCoin="USDT"),
+        "bybit_wallet": {t: session.get_wallet_balance(accountType=t) for t in ("UNIFIED", "CONTRACT")},
+        "bybit_funding_history": {
+            s: session.get_funding_rate_history(category="linear", symbol=s, limit=5) for s in history_symbols
+        },
+    }
+
+    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "config.json")
+    with open(config_path) as f:
+        api_key = json.load(f).get("coinalyze", {}).get("api_key")
+    now = int(time.time())
+    tokens = [s[:-4] for s in history_symbols]
+    symbols = [bybit_symbol(t) for t in tokens] + [hl_symbol(t) for t in tokens]
+    recorded["coinalyze_history"] = CoinalyzeClient(api_key).fetch_funding_history(symbols, now - 7 * 86400, now)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(recorded, f)
+    return path
+
+
+def load_recorded(path=FIXTURE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+# === Universe
+def _coin_rng(coin):
+    return random.Random(zlib.crc32(coin.encode()) ^ SYNTHETIC_SEED)
+
+
+def _synthetic_coin(i):
+    coin = f"SYN{i:03d}"
+    rng = _coin_rng(coin)
+    return {
+        "coin": coin,
+        "symbol": f"{coin}USDT",
+        "price": round(10 ** rng.uniform(-2, 4), 6),
+        "hl_funding": rng.gauss(0.0000125, 0.00003),
+        "bybit_funding": rng.gauss(0.0001, 0.0002),
+        "bybit_interval_min": rng.choice((480, 480, 240, 60)),
+        "sz_decimals": rng.randint(0, 4),
+        "max_leverage": rng.choice((3, 5, 10, 20, 50)),
+        "qty_step": rng.choice(("0.001", "0.01", "0.1", "1", "10")),
+        "turnover": rng.uniform(1e5, 1e9),
+    }
+
+
+def _recorded_universe(recorded):
+    meta, ctxs = recorded["hl_meta_and_ctxs"]
+    tickers = {t["symbol"]: t for t in recorded["bybit_tickers"]["result"]["list"]}
+    instruments = {i["symbol"]: i for page in recorded["bybit_instruments"] for i in page["result"]["list"]}
+    universe = []
+    for asset, ctx in zip(meta["universe"], ctxs):
+        symbol = f"{asset['name']}USDT"
+        ticker, instrument = tickers.get(symbol), instruments.get(symbol)
+        if ticker is None or instrument is None or asset.get("isDelisted"):
+            continue
+        universe.append({
+            "coin": asset["name"],
+            "symbol": symbol,
+            "price": float(ctx.get("markPx") or ticker["markPrice"]),
+            "hl_funding": float(ctx.get("funding") or 0),
+            "bybit_funding": float(ticker.get("fundingRate") or 0),
+            "bybit_interval_min": int(instrument.get("fundingInterval") or 480),
+            "sz_decimals": asset.get("szDecimals", 2),
+            "max_leverage": asset.get("maxLeverage", 10),
+            "qty_step": instrument["lotSizeFilter"]["qtyStep"],
+            "turnover": float(ticker.get("turnover24h") or 0),
+        })
+    return universe
+
+
+def build_universe(n_symbols, recorded=None):
+    """Recorded common HL / Bybit coins first, padded with deterministic synthetic ones."""
+    universe = _recorded_universe(recorded) if recorded else []
+    i = 0
+    while len(universe) < n_symbols:
+        universe.append(_synthetic_coin(i))
+        i += 1
+    return universe
+
+
+# === Scenario
+class Scenario:
+    """
+    Live-shaped responses for a universe of coins with a hedged pair open on
+    the first n_positions of them. Responses are pre-serialized once so the
+    stand-ins pay the same JSON decode cost the real clients do.
+    """
+
+    def __init__(self, n_symbols, n_positions=None, recorded=None, account_value=DEFAULT_ACCOUNT_VALUE):
+        self.universe = build_universe(n_symbols, recorded)
+        self.n_symbols = n_symbols
+        self.n_positions = n_symbols if n_positions is None else n_positions
+        self.recorded = recorded or {}
+        self.account_value = account_value
+        self.now_ms = int(time.time() * 1000)
+        self.next_hour_ms = (self.now_ms // HOUR_MS + 1) * HOUR_MS
+        self.positions = self.universe[:self.n_positions]
+        self.responses = {key: json.dumps(build()) for key, build in self._builders().items()}
+
+    def _builders(self):
+        return {
+            "hl_meta": self._hl_meta,
+            "hl_meta_and_ctxs": self._hl_meta_and_ctxs,
+            "hl_spot_meta": lambda: {"universe": [], "tokens": []},
+            "hl_all_mids": self._hl_all_mids,
+            "hl_predicted_fundings": self._hl_predicted_fundings,
+            "hl_user_state": self._hl_user_state,
+            "hl_user_rate_limit": lambda: self.recorded.get(
+                "hl_user_rate_limit", {"cumVlm": "1000000.0", "nRequestsUsed": 2500, "nRequestsCap": 1010000}),
+            "bybit_tickers": self._bybit_tickers,
+            "bybit_instruments": self._bybit_instruments,
+            "bybit_positions": self._bybit_positions,
+            "bybit_wallet_UNIFIED": lambda: self._bybit_wallet("UNIFIED"),
+            "bybit_wallet_CONTRACT": lambda: self._bybit_wallet("CONTRACT"),
+        }
+
+    def response(self, key):
+        return json.loads(self.responses[key])
+
+    # --- Hyperliquid
+    def _hl_meta(self):
+        return {"universe": [{"name": c["coin"], "szDecimals": c["sz_decimals"], "maxLeverage": c["max_leverage"]}
+                             for c in self.universe]}
+
+    def _hl_meta_and_ctxs(self):
+        ctxs = [{
+            "funding": f"{c['hl_funding']:.8f}",
+            "openInterest": "1000.0",
+            "prevDayPx": f"{c['price']:.6g}",
+            "dayNtlVlm": f"{c['turnover']:.2f}",
+            "premium": "0.0",
+            "oraclePx": f"{c['price']:.6g}",
+            "markPx": f"{c['price']:.6g}",
+            "midPx": f"{c['price']:.6g}",
+            "impactPxs": [f"{c['price'] * 0.9999:.6g}", f"{c['price'] * 1.0001:.6g}"],
+        } for c in self.universe]
+        return [self._hl_meta(), ctxs]
+
+    def _hl_all_mids(self):
+        return {c["coin"]: f"{c['price']:.6g}" for c in self.universe}
+
+    def _hl_predicted_fundings(self):
+        return [[c["coin"], [
+            ["BinPerp", {"fundingRate": f"{c['bybit_funding']:.8f}", "nextFundingTime": self.next_hour_ms,
+                         "fundingIntervalHours": 8}],
+            ["HlPerp", {"fundingRate": f"{c['hl_funding']:.8f}", "nextFundingTime": self.next_hour_ms,
+                        "fundingIntervalHours": 1}],
+            ["BybitPerp", {"fundingRate": f"{c['bybit_funding']:.8f}", "nextFundingTime": self.next_hour_ms,
+                           "fundingIntervalHours": c["bybit_interval_min"] // 60}],
+        ]] for c in self.universe]
+
+    def _hl_position(self, i, c):
+        size = round(1000 / c["price"], c["sz_decimals"]) or 10 ** -c["sz_decimals"]
+        szi = -size if i % 2 == 0 else size
+        entry = c["price"] * (1.002 if i % 2 == 0 else 0.998)
+        return {"type": "oneWay", "position": {
+            "coin": c["coin"], "szi": str(szi), "entryPx": f"{entry:.6g}",
+            "positionValue": f"{abs(szi) * c['price']:.4f}", "unrealizedPnl": f"{szi * (c['price'] - entry):.4f}",
+            "returnOnEquity": "0.01", "leverage": {"type": "cross", "value": 5},
+            "liquidationPx": None, "marginUsed": f"{abs(szi) * c['price'] / 5:.4f}",
+            "maxLeverage": c["max_leverage"], "realizedPnl": "0.0",
+            "cumFunding": {"allTime": "1.0", "sinceOpen": "0.5", "sinceChange": "0.5"},
+        }}
+
+    def _hl_user_state(self):
+        return {
+            "marginSummary": {"accountValue": f"{self.account_value:.2f}", "totalNtlPos": "0.0",
+                              "totalRawUsd": f"{self.account_value:.2f}", "totalMarginUsed": "0.0"},
+            "crossMarginSummary": {"accountValue": f"{self.account_value:.2f}", "totalNtlPos": "0.0",
+                                   "totalRawUsd": f"{self.account_value:.2f}", "totalMarginUsed": "0.0"},
+            "crossMaintenanceMarginUsed": "0.0",
+            "withdrawable": f"{self.account_value / 2:.2f}",
+            "assetPositions": [self._hl_position(i, c) for i, c in enumerate(self.positions)],
+            "time": self.now_ms,
+        }
+
+    # --- Bybit
+    def _envelope(self, result):
+        return {"retCode": 0, "retMsg": "OK", "result": result, "retExtInfo": {}, "time": self.now_ms}
+
+    def _bybit_next_funding(self, c):
+        interval = c["bybit_interval_min"] * 60 * 1000
+        return (self.now_ms // interval + 1) * interval
+
+    def _bybit_tickers(self):
+        return self._envelope({"category": "linear", "list": [{
+            "symbol": c["symbol"], "lastPrice": f"{c['price']:.6g}", "indexPrice": f"{c['price']:.6g}",
+            "markPrice": f"{c['price']:.6g}", "prevPrice24h": f"{c['price']:.6g}", "price24hPcnt": "0.0",
+            "highPrice24h": f"{c['price'] * 1.02:.6g}", "lowPrice24h": f"{c['price'] * 0.98:.6g}",
+            "openInterest": "1000", "turnover24h": f"{c['turnover']:.2f}", "volume24h": "1000",
+            "fundingRate": f"{c['bybit_funding']:.8f}", "nextFundingTime": str(self._bybit_next_funding(c)),
+            "bid1Price": f"{c['price'] * 0.9999:.6g}", "ask1Price": f"{c['price'] * 1.0001:.6g}",
+        } for c in self.universe]})
+
+    def _bybit_instruments(self):
+        items = [{
+            "symbol": c["symbol"], "contractType": "LinearPerpetual", "status": "Trading",
+            "baseCoin": c["coin"], "quoteCoin": "USDT", "settleCoin": "USDT",
+            "fundingInterval": c["bybit_interval_min"],
+            "leverageFilter": {"minLeverage": "1", "maxLeverage": "25.00", "leverageStep": "0.01"},
+            "priceFilter": {"tickSize": "0.0001"},
+            "lotSizeFilter": {"minOrderQty": c["qty_step"], "qtyStep": c["qty_step"],
+                              "maxOrderQty": "1000000", "minNotionalValue": "5"},
+        } for c in self.universe]
+        pages = [items[i:i + INSTRUMENTS_PAGE] for i in range(0, len(items), INSTRUMENTS_PAGE)] or [[]]
+        return [self._envelope({"category": "linear", "list": page,
+                                "nextPageCursor": str(i + 1) if i + 1 < len(pages) else ""})
+                for i, page in enumerate(pages)]
+
+    def _bybit_positions(self):
+        rows = []
+        for i, c in enumerate(self.positions):
+            hl = self._hl_position(i, c)["position"]
+            size = abs(float(hl["szi"]))
+            entry = c["price"] * (0.999 if i % 2 == 0 else 1.001)
+            side = "Buy" if i % 2 == 0 else "Sell"  # opposite of the HL leg
+            sign = 1 if side == "Buy" else -1
+            rows.append({
+                "symbol": c["symbol"], "side": side, "size": str(size), "avgPrice": f"{entry:.6g}",
+                "avgEntryPrice": f"{entry:.6g}", "positionValue": f"{size * entry:.4f}",
+                "markPrice": f"{c['price']:.6g}", "leverage": "5",
+                "unrealisedPnl": f"{sign * size * (c['price'] - entry):.4f}", "cumRealisedPnl": "-0.25",
+                "positionIdx": 0, "tradeMode": 0, "positionStatus": "Normal",
+            })
+        return self._envelope({"category": "linear", "list": rows, "nextPageCursor": ""})
+
+    def _bybit_wallet(self, account_type):
+        recorded = self.recorded.get("bybit_wallet", {}).get(account_type)
+        if recorded:
+            return recorded
+        equity = self.account_value if account_type == "UNIFIED" else 0.0
+        return self._envelope({"list": [{"accountType": account_type, "totalEquity": f"{equity:.2f}",
+                                         "coin": [{"coin": "USDT", "equity": f"{equity:.2f}",
+                                                   "walletBalance": f"{equity:.2f}"}]}]})
+
+    def bybit_funding_history(self, symbol, limit=5):
+        coin = next((c for c in self.universe if c["symbol"] == symbol), None)
+        interval = (coin["bybit_interval_min"] if coin else 480) * 60 * 1000
+        last = (self.now_ms // interval) * interval
+        return self._envelope({"category": "linear", "list": [
+            {"symbol": symbol, "fundingRate": f"{coin['bybit_funding'] if coin else 0.0001:.8f}",
+             "fundingRateTimestamp": str(last - k * interval)} for k in range(limit)]})
+
+    # --- Coinalyze
+    def coinalyze_history(self, symbols, start_time, end_time):
+        """Hourly bars per requested symbol, replaying recorded closes when there are any."""
+        recorded = [bar["c"] for entry in self.recorded.get("coinalyze_history", [])
+                    for bar in entry.get("history", [])]
+        first = (start_time // 3600 + 1) * 3600
+        hours = range(first, end_time + 1, 3600)
+        out = []
+        for symbol in symbols:
+            rng = _coin_rng(symbol)
+            venue_scale = 0.00125 if symbol.endswith(".H") else 0.01
+            if recorded:
+                offset = rng.randrange(len(recorded))
+                closes = [recorded[(offset + k) % len(recorded)] for k in range(len(hours))]
+            else:
+                closes = [round(rng.gauss(venue_scale, venue_scale * 2), 6) for _ in hours]
+            out.append({"symbol": symbol, "history": [
+                {"t": t, "o": c, "h": c, "l": c, "c": c} for t, c in zip(hours, closes)]})
+        return out
+
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+    if sys.argv[1:] == ["record"]:
+        print(f"💾 Recorded fixtures to {record_fixtures()}")
+    else:
+        print("usage: python -m bench.fixtures record")
@@ -0,0 +1,243 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+LIVE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(LIVE_DIR)
+sys.path.insert(0, LIVE_DIR)
+
+from bench import standins
+from bench.fixtures import Scenario, load_recorded
+
+# Offline benchmarks of the refresh, analysis and sizing paths against the
+# stand-in exchange clients. Each benchmark runs at every symbol count and
+# injected latency; results can be saved and compared against a baseline so
+# a regression fails the run.
+#
+#   python -m bench.run_bench --sizes 1,10,100,500 --latency-ms 0,30 --json bench.json
+#   python -m bench.run_bench --compare bench.json
+DEFAULT_SIZES = (1, 10, 100, 500)
+DEFAULT_LATENCIES_MS = (0, 30)
+DEFAULT_RUNS = 3
+REGRESSION_THRESHOLD = 0.15  # p50 slower than the baseline by more than this fails --compare
+BENCH_CALLS_PER_MINUTE = 10 ** 6  # Coinalyze bucket out of the way; we time our code, not their quota
+
+
+def _import_app(cache_dir):
+    # main_gui_combined reads config.json from the working directory
+    cwd = os.getcwd()
+    os.chdir(REPO_DIR)
+    try:
+        import main_gui_combined as app
+    finally:
+        os.chdir(cwd)
+    import funding_store
+    import instrument_registry
+    import hyperliquid_local.sdk_wrapper as hl_wrapper
+    from coinalyze_client import CoinalyzeClient
+
+    # Keep the real caches untouched
+    instrument_registry.REGISTRY_PATH = os.path.join(cache_dir, "instrument_registry.json")
+    hl_wrapper.META_CACHE_PATH = os.path.join(cache_dir, "hl_meta.json")
+    funding_store.STORE_DIR = os.path.join(cache_dir, "funding")
+    app.COINALYZE = CoinalyzeClient("bench", BENCH_CALLS_PER_MINUTE)
+    app.WATCHED_TOKENS.clear()
+    return app
+
+
+def _use_scenario(app, scenario):
+    import instrument_registry
+    from rate_governor import GOVERNOR
+
+    standins.set_scenario(scenario)
+    app.get_instruments_table(force=True)
+    instrument_registry.load_registry(force=True)
+    _invalidate_market_caches(app)
+    GOVERNOR.reset_budgets()
+
+
+def _invalidate_market_caches(app):
+    app.invalidate_funding_snapshot()
+    app.invalidate_predicted_funding_cache()
+
+
+def _clear_history(cache_dir):
+    shutil.rmtree(os.path.join(cache_dir, "funding"), ignore_errors=True)
+
+
+# === Benchmarks: (setup before each run, timed body)
+def bench_status_cold(app, scenario, cache_dir):
+    return (lambda: _invalidate_market_caches(app)), app.display_status_fixed
+
+
+def bench_status_warm(app, scenario, cache_dir):
+    app.display_status_fixed()
+    return None, app.display_status_fixed
+
+
+def bench_status_render(app, scenario, cache_dir):
+    snapshot = app.fetch_status_snapshot()
+    return None, (lambda: app.status_lines(snapshot))
+
+
+def bench_analyze_cold(app, scenario, cache_dir):
+    tokens = [c["coin"] for c in scenario.positions]
+    return (lambda: _clear_history(cache_dir)), (lambda: app.analyze_watched_tokens(tokens))
+
+
+def bench_analyze_incremental(app, scenario, cache_dir):
+    tokens = [c["coin"] for c in scenario.positions]
+    _clear_history(cache_dir)
+    app.analyze_watched_tokens(tokens)
+    return None, (lambda: app.analyze_watched_tokens(tokens))
+
+
+def bench_analyze_single(app, scenario, cache_dir):
+    token = scenario.positions[0]["coin"]
+    return None, (lambda: app.analyze_historical_data(token))
+
+
+def bench_sizing(app, scenario, cache_dir):
+    from execution import prepare_pair_trade
+
+    def size_all():
+        for c in scenario.positions:
+            prepare_pair_trade(c["coin"], "bybit", 1000, 5)
+    return None, size_all
+
+
+BENCHMARKS = {
+    "status_cold": bench_status_cold,
+    "status_warm": bench_status_warm,
+    "status_render": bench_status_render,
+    "analyze_cold": bench_analyze_cold,
+    "analyze_incremental": bench_analyze_incremental,
+    "analyze_single": bench_analyze_single,
+    "sizing": bench_sizing,
+}
+
+
+def run_benchmark(name, app, scenario, cache_dir, latency_ms, runs):
+    from rate_governor import GOVERNOR
+
+    quiet = io.StringIO()
+    with contextlib.redirect_stdout(quiet):
+        setup, body = BENCHMARKS[name](app, scenario, cache_dir)
+    timings, calls = [], 0
+    for _ in range(runs):
+        with contextlib.redirect_stdout(quiet):
+            if setup is not None:
+                setup()
+            GOVERNOR.reset_budgets()
+            standins.reset_call_counts()
+            started = time.perf_counter()
+            body()
+            timings.append((time.perf_counter() - started) * 1000)
+        calls += sum(standins.call_counts().values())
+        quiet.seek(0)
+        quiet.truncate()
+    timings.sort()
+    return {
+        "bench": name,
+        "symbols": len(scenario.positions),
+        "latency_ms": latency_ms,
+        "runs": runs,
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))],
+        "min_ms": timings[0],
+        "calls_per_run": calls / runs,
+    }
+
+
+def print_results(results, baseline=None):
+    base = {(r["bench"], r["symbols"], r["latency_ms"]): r for r in baseline or []}
+    print(f"\n🏁 {'Benchmark':<20}| {'Symbols':>7} | {'Latency':>7} | {'Runs':>4} | {'p50 ms':>9} | "
+          f"{'p95 ms':>9} | {'Min ms':>9} | {'Calls':>6} | {'vs base':>8}")
+    print("-" * 108)
+    for r in results:
+        ref = base.get((r["bench"], r["symbols"], r["latency_ms"]))
+        delta = f"{(r['p50_ms'] / ref['p50_ms'] - 1) * 100:+.1f}%" if ref and ref["p50_ms"] > 0 else "-"
+        print(f"   {r['bench']:<20}| {r['symbols']:>7} | {r['latency_ms']:>5}ms | {r['runs']:>4} | "
+              f"{r['p50_ms']:>9.2f} | {r['p95_ms']:>9.2f} | {r['min_ms']:>9.2f} | {r['calls_per_run']:>6.1f} | {delta:>8}")
+
+
+def regressions(results, baseline, threshold=REGRESSION_THRESHOLD):
+    base = {(r["bench"], r["symbols"], r["latency_ms"]): r for r in baseline}
+    slower = []
+    for r in results:
+        ref = base.get((r["bench"], r["symbols"], r["latency_ms"]))
+        if ref and ref["p50_ms"] > 0 and r["p50_ms"] > ref["p50_ms"] * (1 + threshold):
+            slower.append((r, ref))
+    return slower
+
+
+def _int_list(text):
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks against recorded exchange fixtures")
+    parser.add_argument("--sizes", type=_int_list, default=list(DEFAULT_SIZES), help="symbol counts, e.g. 1,10,100,500")
+    parser.add_argument("--latency-ms", type=_int_list, default=list(DEFAULT_LATENCIES_MS),
+                        help="injected per-call latency values, e.g. 0,30")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--only", default="", help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results file; exit 1 on a p50 regression")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()] or list(BENCHMARKS)
+    recorded = load_recorded()
+    print(f"📼 Fixtures: {'recorded' if recorded else 'synthetic (run `python -m bench.fixtures record` to capture real ones)'}")
+
+    # The venue universe stays fixed; the symbol count is the number of open pairs
+    universe = max(args.sizes)
+    cache_dir = tempfile.mkdtemp(prefix="fund_arb_bench_")
+    try:
+        standins.install(Scenario(universe, n_positions=min(args.sizes), recorded=recorded))
+        app = _import_app(cache_dir)
+        results = []
+        for size in args.sizes:
+            scenario = Scenario(universe, n_positions=size, recorded=recorded)
+            _use_scenario(app, scenario)
+            for latency in args.latency_ms:
+                standins.set_latency(latency)
+                for name in names:
+                    results.append(run_benchmark(name, app, scenario, cache_dir, latency, args.runs))
+                    print(f"   ✓ {name} @ {size} symbols, {latency}ms: {results[-1]['p50_ms']:.2f} ms")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Saved results to {args.json}")
+
+    if baseline is not None:
+        slower = regressions(results, baseline, args.threshold)
+        for r, ref in slower:
+            print(f"❌ {r['bench']} @ {r['symbols']} symbols, {r['latency_ms']}ms: "
+                  f"{ref['p50_ms']:.2f} -> {r['p50_ms']:.2f} ms")
+        if slower:
+            return 1
+        print("✅ No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Local stand-ins for pybit's HTTP, the Hyperliquid Info / Exchange clients,
+# eth_account and the socket layer under requests. They answer from the active
+# Scenario after an injected latency, so the wrappers, the shared transport,
+# the rate governor and the instrumentation all run unmodified on top.
+# install() must run before the exchange wrappers are imported.
+HL_API_URL = "https://api.hyperliquid.xyz"
+BYBIT_API_URL = "https://api.bybit.com"
+
+_state = {"scenario": None, "latency_ms": 0.0, "jitter": 0.0}
+_calls = {}
+_calls_lock = threading.Lock()
+_order_ids = itertools.count(1)
+
+
+def set_scenario(scenario):
+    _state["scenario"] = scenario
+
+
+def set_latency(latency_ms, jitter=0.2):
+    """Every stand-in call sleeps latency_ms, +/- jitter as a fraction of it."""
+    _state["latency_ms"] = float(latency_ms)
+    _state["jitter"] = float(jitter)
+
+
+def call_counts():
+    with _calls_lock:
+        return dict(_calls)
+
+
+def reset_call_counts():
+    with _calls_lock:
+        _calls.clear()
+
+
+def _serve(name):
+    with _calls_lock:
+        _calls[name] = _calls.get(name, 0) + 1
+    latency = _state["latency_ms"]
+    if latency > 0:
+        time.sleep(latency * random.uniform(1 - _state["jitter"], 1 + _state["jitter"]) / 1000)
+    return _state["scenario"]
+
+
+def _reply(name, key):
+    return _serve(name).response(key)
+
+
+# === pybit.unified_trading.HTTP
+class StandInBybitHTTP:
+    def __init__(self, testnet=False, api_key=None, api_secret=None, **kwargs):
+        self.endpoint = BYBIT_API_URL
+        self.client = requests.Session()
+
+    def get_tickers(self, category="linear", symbol=None, **kwargs):
+        data = _reply("bybit.get_tickers", "bybit_tickers")
+        if symbol:
+            data["result"]["list"] = [t for t in data["result"]["list"] if t["symbol"] == symbol]
+        return data
+
+    def get_instruments_info(self, category="linear", limit=500, cursor=None, **kwargs):
+        scenario = _serve("bybit.get_instruments_info")
+        pages = json.loads(scenario.responses["bybit_instruments"])
+        return pages[int(cursor or 0)]
+
+    def get_positions(self, **kwargs):
+        return _reply("bybit.get_positions", "bybit_positions")
+
+    def get_wallet_balance(self, accountType="UNIFIED", **kwargs):
+        return _reply("bybit.get_wallet_balance", f"bybit_wallet_{accountType}")
+
+    def get_funding_rate_history(self, category="linear", symbol=None, limit=200, **kwargs):
+        return _serve("bybit.get_funding_rate_history").bybit_funding_history(symbol, limit)
+
+    def set_leverage(self, **kwargs):
+        _serve("bybit.set_leverage")
+        return {"retCode": 0, "retMsg": "OK", "result": {}}
+
+    def place_order(self, **kwargs):
+        _serve("bybit.place_order")
+        return {"retCode": 0, "retMsg": "OK", "result": {"orderId": f"standin-{next(_order_ids)}"}}
+
+
+# === hyperliquid.info.Info / hyperliquid.exchange.Exchange
+class StandInInfo:
+    def __init__(self, base_url=None, skip_ws=True, meta=None, spot_meta=None, **kwargs):
+        self.base_url = base_url or HL_API_URL
+        self.session = requests.Session()
+
+    def meta(self, dex=""):
+        return _reply("hl.meta", "hl_meta")
+
+    def spot_meta(self):
+        return _reply("hl.spot_meta", "hl_spot_meta")
+
+    def meta_and_asset_ctxs(self):
+        return _reply("hl.meta_and_asset_ctxs", "hl_meta_and_ctxs")
+
+    def all_mids(self, dex=""):
+        return _reply("hl.all_mids", "hl_all_mids")
+
+    def user_state(self, address, dex=""):
+        return _reply("hl.user_state", "hl_user_state")
+
+    def user_rate_limit(self, address):
+        return _reply("hl.user_rate_limit", "hl_user_rate_limit")
+
+    def open_orders(self, address, dex=""):
+        _serve("hl.open_orders")
+        return []
+
+    def user_fills(self, address):
+        _serve("hl.user_fills")
+        return []
+
+
+class StandInExchange:
+    def __init__(self, wallet, base_url=None, meta=None, vault_address=None, account_address=None,
+                 spot_meta=None, **kwargs):
+        self.wallet = wallet
+        self.base_url = base_url or HL_API_URL
+        self.account_address = account_address
+        self.info = StandInInfo(self.base_url, True, meta, spot_meta)
+        self.session = requests.Session()
+
+    def _filled(self, name, coin, sz, px=None):
+        _serve(name)
+        return {"status": "ok", "response": {"type": "order", "data": {"statuses": [
+            {"filled": {"totalSz": str(sz), "avgPx": str(px or 0), "oid": next(_order_ids)}}]}}}
+
+    def market_open(self, name, is_buy, sz, px=None, slippage=0.05, cloid=None, builder=None):
+        return self._filled("hl.market_open", name, sz, px)
+
+    def market_close(self, coin, sz=None, px=None, slippage=0.05, cloid=None, builder=None):
+        return self._filled("hl.market_close", coin, sz, px)
+
+    def order(self, name, is_buy, sz, limit_px, order_type, reduce_only=False, cloid=None, builder=None):
+        return self._filled("hl.order", name, sz, limit_px)
+
+    def update_leverage(self, leverage, name, is_cross=True):
+        _serve("hl.update_leverage")
+        return {"status": "ok", "response": {"type": "default"}}
+
+    def approve_agent(self, name=None):
+        _serve("hl.approve_agent")
+        return {"status": "ok"}, "0x" + "0" * 64
+
+
+# === eth_account.Account
+class _StandInWallet:
+    address = "0x" + "0" * 40
+
+
+class StandInAccount:
+    @staticmethod
+    def from_key(key):
+        return _StandInWallet()
+
+
+# === requests (socket layer under the shared transport)
+def _response(request, payload, status=200):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(payload).encode()
+    response.headers["Content-Type"] = "application/json"
+    response.url = request.url
+    response.request = request
+    response.encoding = "utf-8"
+    return response
+
+
+def replay_send(adapter, request, **kwargs):
+    url = urlparse(request.url)
+    if url.path == "/info":
+        body = json.loads(request.body or b"{}")
+        kind = body.get("type")
+        key = {"allMids": "hl_all_mids", "predictedFundings": "hl_predicted_fundings",
+               "metaAndAssetCtxs": "hl_meta_and_ctxs", "meta": "hl_meta",
+               "spotMeta": "hl_spot_meta"}.get(kind)
+        if key is None:
+            return _response(request, {"error": f"no stand-in for info type {kind}"}, 422)
+        return _response(request, _reply(f"http.info.{kind}", key))
+    if url.path == "/v1/funding-rate-history":
+        query = parse_qs(url.query)
+        scenario = _serve("http.coinalyze.funding-rate-history")
+        symbols = query["symbols"][0].split(",")
+        return _response(request, scenario.coinalyze_history(symbols, int(query["from"][0]), int(query["to"][0])))
+    return _response(request, {"error": f"no stand-in for {request.method} {url.path}"}, 404)
+
+
+def install(scenario, latency_ms=0.0):
+    """Swap the exchange clients for stand-ins; call before importing the wrappers."""
+    if "hyperliquid_local.sdk_wrapper" in sys.modules or "bybit_local.sdk_wrapper_bybit" in sys.modules:
+        raise RuntimeError("install() must run before the exchange wrappers are imported")
+    import eth_account
+    import hyperliquid.exchange
+    import hyperliquid.info
+    import pybit.unified_trading
+
+    set_scenario(scenario)
+    set_latency(latency_ms)
+    pybit.unified_trading.HTTP = StandInBybitHTTP
+    hyperliquid.info.Info = StandInInfo
+    hyperliquid.exchange.Exchange = StandInExchange
+    eth_account.Account = StandInAccount
+    HTTPAdapter.send = replay_send
@@ -0,0 +1,97 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+LIVE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(LIVE_DIR)
+
+# Time-to-prompt of the interactive trader: each run starts a fresh
+# interpreter on main_gui_combined.py and stops the clock when the command
+# prompt reaches stdout. Client construction, the registry and the first
+# status fetch all happen behind the prompt and are not part of the number.
+# The interpreter's own start-up and the bare module import are timed too,
+# so a regression can be pinned to imports or to work done in main().
+#
+#   python -m bench.startup --runs 5
+PROMPT = "Enter command"
+DEFAULT_RUNS = 5
+TARGET_MS = 300
+TIMEOUT = 30  # seconds a single run may take to reach the prompt
+
+
+def _time_command(args, env):
+    started = time.perf_counter()
+    subprocess.run(args, cwd=REPO_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def _time_import(env):
+    # Timed inside the child so interpreter start-up and shutdown stay out of it
+    code = (f"import sys, time; sys.path.insert(0, {LIVE_DIR!r}); started = time.perf_counter(); "
+            f"import main_gui_combined; print((time.perf_counter() - started) * 1000)")
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, env=env, capture_output=True, text=True,
+                            check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def time_to_prompt(env):
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-u", os.path.join(LIVE_DIR, "main_gui_combined.py")],
+                            cwd=REPO_DIR, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, text=True)
+    deadline = started + TIMEOUT
+    try:
+        seen = ""
+        while time.perf_counter() < deadline:
+            chunk = proc.stdout.read(1)
+            if not chunk:
+                raise RuntimeError("main_gui_combined exited before the prompt")
+            seen = (seen + chunk)[-len(PROMPT):]
+            if seen == PROMPT:
+                return (time.perf_counter() - started) * 1000
+        raise RuntimeError(f"no prompt within {TIMEOUT}s")
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def _summary(timings):
+    timings = sorted(timings)
+    return statistics.median(timings), timings[0], timings[-1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time from launch to the first command prompt")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--config", help="config file to start with (default: the repo's config.json)")
+    parser.add_argument("--target-ms", type=float, default=TARGET_MS, help="exit 1 if the median exceeds this")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    if args.config:
+        env["TRADER_CONFIG"] = os.path.abspath(args.config)
+    rows = [
+        ("interpreter", [_time_command([sys.executable, "-c", "pass"], env) for _ in range(args.runs)]),
+        ("import main_gui_combined", [_time_import(env) for _ in range(args.runs)]),
+        ("time to prompt", [time_to_prompt(env) for _ in range(args.runs)]),
+    ]
+
+    print(f"\n🚀 {'Stage':<26}| {'p50 ms':>8} | {'Min ms':>8} | {'Max ms':>8}")
+    print("-" * 60)
+    for name, timings in rows:
+        p50, low, high = _summary(timings)
+        print(f"   {name:<26}| {p50:>8.1f} | {low:>8.1f} | {high:>8.1f}")
+
+    p50 = _summary(rows[-1][1])[0]
+    if p50 > args.target_ms:
+        print(f"❌ Time to prompt {p50:.0f} ms is over the {args.target_ms:.0f} ms target.")
+        return 1
+    print(f"✅ Time to prompt {p50:.0f} ms (target {args.target_ms:.0f} ms).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
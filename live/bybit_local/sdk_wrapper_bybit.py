@@ -1,47 +1,176 @@
-from pybit.unified_trading import HTTP
 import json
+import os
+import sys
+if __name__ == "__main__":
+    # Self-test run from this directory: the app modules live one level up
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_transport import mount_transport, host_of
+from rate_governor import GOVERNOR, VENUE_BYBIT, RequestDeferred, with_priority
+from instrumentation import instrument_module
+from lazy_client import LazyClient
+from single_flight import begin_refresh, end_refresh
 import math
 import pprint
 
-import os
 config_path = os.path.join(os.path.dirname(__file__), "config.json")
 with open(config_path) as f:
     config = json.load(f)["bybit"]
 
+BYBIT_API_URL = "https://api-testnet.bybit.com" if config.get("testnet", False) else "https://api.bybit.com"
+GOVERNOR.register_host(host_of(BYBIT_API_URL), VENUE_BYBIT)
 
 
-# Initialize Bybit session
-session = HTTP(
-    testnet=config.get("testnet", False),
-    api_key=config["api_key"],
-    api_secret=config["api_secret"],
-    log_requests=True
-)
+# Initialize Bybit session on first use; importing pybit alone costs ~150 ms
+def _build_session(api_key=None, api_secret=None, testnet=None):
+    from pybit.unified_trading import HTTP
+    client = HTTP(
+        testnet=config.get("testnet", False) if testnet is None else testnet,
+        api_key=api_key or config["api_key"],
+        api_secret=api_secret or config["api_secret"],
+        log_requests=True
+    )
+    # Share the pooled keep-alive adapter with the rest of the app
+    mount_transport(client.client, host_of(client.endpoint))
+    return client
 
-import time
+session = LazyClient("bybit.session", _build_session)
 
-def get_funding_info(symbol):
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# === 📸 Bulk funding snapshot
+# One get_tickers call covers the whole linear universe; funding intervals come
+# from the instruments table, which changes rarely and is cached much longer.
+# Each snapshot has its own lock, held only to read or swap the cached index;
+# the fetch itself runs outside it, one at a time per snapshot.
+FUNDING_SNAPSHOT_TTL = float(config.get("funding_snapshot_ttl", 30))  # seconds
+INSTRUMENTS_TTL = float(config.get("instruments_ttl", 3600))  # seconds
+SNAPSHOT_RETRY = 5  # seconds to wait before re-fetching after an error
+
+_ticker_snapshot = {"index": {}, "fetched_at": 0.0, "expires_at": 0.0, "refreshing": None}
+_instruments_table = {"index": {}, "fetched_at": 0.0, "expires_at": 0.0, "refreshing": None}
+_ticker_lock = threading.Lock()
+_instruments_lock = threading.Lock()
+
+
+def get_instruments_table(force=False):
+    """
+    Return {SYMBOL: instrument} for every linear contract, paging through
+    get_instruments_info once per INSTRUMENTS_TTL.
+    """
+    index, done = begin_refresh(_instruments_table, _instruments_lock, force)
+    if done is None:
+        return index
+
+    now = time.time()
+    index = {}
+    cursor = None
     try:
-        data = session.get_tickers(category="linear", symbol=symbol)
-        ticker = data["result"]["list"][0]
+        while True:
+            data = session.get_instruments_info(category="linear", limit=1000, cursor=cursor)
+            result = data["result"]
+            for item in result["list"]:
+                index[item["symbol"]] = item
+            cursor = result.get("nextPageCursor")
+            if not cursor:
+                break
+    except RequestDeferred as e:
+        return end_refresh(_instruments_table, _instruments_lock, done, None, now, now + e.retry_in)
+    except Exception as e:
+        print(f"⚠️ Failed to get Bybit instruments: {e}")
+        return end_refresh(_instruments_table, _instruments_lock, done, None, now, now + SNAPSHOT_RETRY)
+    return end_refresh(_instruments_table, _instruments_lock, done, index, now, now + INSTRUMENTS_TTL)
 
-        # Correct variable names!
-        prev_ts, next_ts = get_funding_periods(symbol)
 
-        if prev_ts and next_ts:
-            interval_ms = next_ts - prev_ts
-            interval_hours = round(interval_ms / (1000 * 60 * 60*2), 2)
+def invalidate_instruments_table():
+    with _instruments_lock:
+        _instruments_table["expires_at"] = 0.0
 
-            predicted_funding = safe_float(ticker.get("fundingRate", 0)) * 100  # % per period
 
-            return round(predicted_funding, 6), next_ts, interval_hours
-        else:
-            return 0.0, None, 0.0
+def get_funding_interval_hours(symbol):
+    item = get_instruments_table().get(symbol)
+    if item and item.get("fundingInterval"):
+        return round(safe_float(item["fundingInterval"]) / 60, 2)  # minutes -> hours
+    return None
 
+
+def get_ticker_snapshot(force=False):
+    """
+    Return {SYMBOL: {fundingRate, nextFundingTime, markPrice, lastPrice, turnover24h}} for the
+    whole linear universe, refreshed after FUNDING_SNAPSHOT_TTL or at the next
+    funding time, whichever comes first.
+    """
+    index, done = begin_refresh(_ticker_snapshot, _ticker_lock, force)
+    if done is None:
+        return index
+
+    now = time.time()
+    index = {}
+    next_funding_ms = None
+    try:
+        data = session.get_tickers(category="linear")
+        for ticker in data["result"]["list"]:
+            next_ts = int(ticker.get("nextFundingTime") or 0) or None
+            index[ticker["symbol"]] = {
+                "fundingRate": safe_float(ticker.get("fundingRate")),
+                "nextFundingTime": next_ts,
+                "markPrice": safe_float(ticker.get("markPrice")),
+                "lastPrice": safe_float(ticker.get("lastPrice")),
+                "turnover24h": safe_float(ticker.get("turnover24h")),
+            }
+            if next_ts and (next_funding_ms is None or next_ts < next_funding_ms):
+                next_funding_ms = next_ts
+    except RequestDeferred as e:
+        return end_refresh(_ticker_snapshot, _ticker_lock, done, None, now, now + e.retry_in)
     except Exception as e:
-        print(f"⚠️ Failed to get funding info for {symbol}: {e}")
+        print(f"⚠️ Failed to get Bybit tickers: {e}")
+        return end_refresh(_ticker_snapshot, _ticker_lock, done, None, now, now + SNAPSHOT_RETRY)
+
+    expires_at = now + FUNDING_SNAPSHOT_TTL
+    if next_funding_ms and now < next_funding_ms / 1000 < expires_at:
+        expires_at = next_funding_ms / 1000  # rates reset at the funding boundary
+    return end_refresh(_ticker_snapshot, _ticker_lock, done, index, now, expires_at)
+
+
+def invalidate_funding_snapshot():
+    with _ticker_lock:
+        _ticker_snapshot["expires_at"] = 0.0
+
+
+# === 📡 Streaming store
+# market_stream.start_market_streams() attaches a MarketDataStore here; while it
+# is fresh, subscribed tickers are served from memory instead of REST.
+_stream_store = None
+
+def attach_stream_store(store):
+    global _stream_store
+    _stream_store = store
+
+def _streamed_ticker(symbol):
+    store = _stream_store
+    if store is None or not store.is_fresh("bybit"):
+        return None
+    return store.get_bybit_ticker(symbol)
+
+
+def get_funding_info(symbol):
+    ticker = _streamed_ticker(symbol) or get_ticker_snapshot().get(symbol)
+    if ticker is None:
+        print(f"⚠️ No Bybit ticker for {symbol}")
         return 0.0, None, 0.0
 
+    interval_hours = get_funding_interval_hours(symbol)
+    if interval_hours is None:
+        # Instrument missing from the cached table (e.g. a fresh listing)
+        prev_ts, next_ts = get_funding_periods(symbol)
+        if not (prev_ts and next_ts):
+            return 0.0, None, 0.0
+        interval_hours = round((next_ts - prev_ts) / (1000 * 60 * 60 * 2), 2)
+
+    predicted_funding = ticker["fundingRate"] * 100  # % per period
+    return round(predicted_funding, 6), ticker["nextFundingTime"], interval_hours
+
 
 def safe_float(val, default=0.0):
     try:
@@ -99,39 +228,43 @@ def close_selected_position():
             print(f"⚠️ Failed to get BYBIT positions: {positions.get('retMsg', 'Unknown error')}")
 
 # === Wallet balances
-def get_wallet_balances():
-    balances = {}
-    try:
-        balances["UNIFIED"] = session.get_wallet_balance(accountType="UNIFIED")
-    except Exception as e:
-        balances["UNIFIED"] = {"retCode": -1, "retMsg": str(e)}
+WALLET_ACCOUNT_TYPES = ("UNIFIED", "CONTRACT")
+_wallet_pool = ThreadPoolExecutor(max_workers=len(WALLET_ACCOUNT_TYPES), thread_name_prefix="bybit-wallet")
+
+# client defaults to the config.json session; BybitAccount passes its own so
+# sub-account calls are timed like the rest.
+def get_wallet_balance(account_type, client=None):
     try:
-        balances["CONTRACT"] = session.get_wallet_balance(accountType="CONTRACT")
+        return (session if client is None else client).get_wallet_balance(accountType=account_type)
+    except RequestDeferred:
+        raise  # no data, not a failed call; the caller decides
     except Exception as e:
-        balances["CONTRACT"] = {"retCode": -1, "retMsg": str(e)}
-    return balances
+        return {"retCode": -1, "retMsg": str(e)}
+
+def get_wallet_balances():
+    # Both account types are queried at the same time
+    results = _wallet_pool.map(with_priority(get_wallet_balance), WALLET_ACCOUNT_TYPES)
+    return dict(zip(WALLET_ACCOUNT_TYPES, results))
 
 # === Get open positions
-def get_positions():
+def get_positions(client=None):
     try:
-        return session.get_positions(category="linear", settleCoin="USDT")
+        return (session if client is None else client).get_positions(category="linear", settleCoin="USDT")
+    except RequestDeferred:
+        raise
     except Exception as e:
         return {"retCode": -1, "retMsg": str(e)}
 
 
 # === Get price
 def get_price(symbol):
-    try:
-        data = session.get_tickers(category="linear", symbol=symbol)
-        return float(data["result"]["list"][0]["lastPrice"])
-    except:
-        return 0.0
+    ticker = _streamed_ticker(symbol) or get_ticker_snapshot().get(symbol)
+    return ticker["lastPrice"] if ticker else 0.0
 
 # === Get symbol precision
 def get_symbol_precision(symbol):
     try:
-        data = session.get_instruments_info(category="linear", symbol=symbol)
-        item = data["result"]["list"][0]
+        item = get_instruments_table()[symbol]
         lot = item["lotSizeFilter"]
         min_qty = float(lot["minOrderQty"])
         step = float(lot["qtyStep"])
@@ -141,8 +274,8 @@ def get_symbol_precision(symbol):
         return 0.01, 0.01, 2
 
 # === Set leverage
-def set_leverage(symbol, buy_leverage=5, sell_leverage=5):
-    return session.set_leverage(
+def set_leverage(symbol, buy_leverage=5, sell_leverage=5, client=None):
+    return (session if client is None else client).set_leverage(
         category="linear",
         symbol=symbol,
         buyLeverage=str(buy_leverage),
@@ -150,8 +283,8 @@ def set_leverage(symbol, buy_leverage=5, sell_leverage=5):
     )
 
 # === Place market order
-def place_market_order_bybit(symbol, side, qty):
-    return session.place_order(
+def place_market_order_bybit(symbol, side, qty, client=None):
+    return (session if client is None else client).place_order(
         category="linear",
         symbol=symbol,
         side=side,
@@ -160,15 +293,29 @@ def place_market_order_bybit(symbol, side, qty):
     )
 
 # === Close position
-def close_position(symbol, side, qty):
-    return session.place_order(
+def close_position(symbol, side, qty, reduce_only=False, client=None):
+    return (session if client is None else client).place_order(
         category="linear",
         symbol=symbol,
         side=side,  # ✅ Use the passed side
         orderType="Market",
-        qty=qty
+        qty=qty,
+        reduceOnly=True if reduce_only else None  # None is dropped from the request
     )
 
+# === Batch market orders
+BATCH_ORDER_LIMIT = 20  # linear orders per place_batch_order request
+
+def place_batch_order_bybit(orders):
+    """orders: [{symbol, side, qty, reduceOnly?}], at most BATCH_ORDER_LIMIT per call."""
+    request = []
+    for order in orders:
+        item = {"symbol": order["symbol"], "side": order["side"], "orderType": "Market", "qty": str(order["qty"])}
+        if order.get("reduceOnly"):
+            item["reduceOnly"] = True
+        request.append(item)
+    return session.place_batch_order(category="linear", request=request)
+
 # === Pretty print
 def pretty_print(data):
     pprint.pprint(data)
@@ -208,6 +355,36 @@ def get_funding_periods(symbol):
         return None, None
 
 
+# === 👥 Accounts
+# One object per Bybit (sub-)account key. The module-level functions above are
+# the account from config.json; tickers, instruments and funding are shared.
+class BybitAccount:
+    def __init__(self, name, api_key, api_secret, testnet=False):
+        self.name = name
+        self.session = LazyClient(f"bybit.session[{name}]", lambda: _build_session(api_key, api_secret, testnet))
+
+    # Through the module functions, which are the ones instrument_module times
+    def get_positions(self):
+        return get_positions(client=self.session)
+
+    def get_wallet_balance(self, account_type):
+        return get_wallet_balance(account_type, client=self.session)
+
+    def set_leverage(self, symbol, buy_leverage=5, sell_leverage=5):
+        return set_leverage(symbol, buy_leverage, sell_leverage, client=self.session)
+
+    def place_market_order(self, symbol, side, qty, reduce_only=False):
+        if reduce_only:
+            return close_position(symbol, side, qty, reduce_only=True, client=self.session)
+        return place_market_order_bybit(symbol, side, qty, client=self.session)
+
+
+# === ⏱️ Instrumentation
+# Time every public wrapper function; must stay below the last definition
+instrument_module(sys.modules[__name__], VENUE_BYBIT,
+                  skip=("safe_float", "pretty_print", "attach_stream_store", "invalidate_funding_snapshot",
+                        "invalidate_instruments_table", "close_selected_position"))
+
 
 # === Test function
 if __name__ == "__main__":
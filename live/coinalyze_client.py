@@ -0,0 +1,114 @@
+import threading
+import time
+
+from http_transport import get_session
+
+# Batched, rate-limit-aware access to Coinalyze funding-rate-history. The
+# endpoint takes a comma-separated symbol list, so watched tokens are packed
+# into as few requests as the per-request symbol cap allows, and every request
+# draws from a per-API-key token bucket.
+COINALYZE_HOST = "api.coinalyze.net"
+COINALYZE_HISTORY_URL = f"https://{COINALYZE_HOST}/v1/funding-rate-history"
+MAX_SYMBOLS_PER_REQUEST = 20
+CALLS_PER_MINUTE = 40
+REQUEST_TIMEOUT = (5, 30)  # connect, read
+
+
+class TokenBucket:
+    def __init__(self, capacity, refill_per_second):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def acquire(self, cost=1):
+        """Block until `cost` tokens are available, then take them."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= cost:
+                    self.tokens -= cost
+                    return
+                wait = (cost - self.tokens) / self.refill_per_second
+            time.sleep(wait)
+
+    def drain(self, seconds):
+        """Server told us to back off: empty the bucket for `seconds`."""
+        with self._lock:
+            self._refill()
+            self.tokens = -seconds * self.refill_per_second
+
+
+def bybit_symbol(token):
+    return f"{token}USDT.6"
+
+
+def hl_symbol(token):
+    return f"{token}.H"
+
+
+class CoinalyzeClient:
+    def __init__(self, api_key, calls_per_minute=CALLS_PER_MINUTE):
+        self.api_key = api_key
+        self.bucket = TokenBucket(calls_per_minute, calls_per_minute / 60)
+        self.requests_made = 0
+
+    def fetch_funding_history(self, symbols, start_time, end_time, interval="1hour"):
+        """One funding-rate-history request; retries once after a 429."""
+        params = {
+            "symbols": ",".join(symbols),
+            "interval": interval,
+            "from": start_time,
+            "to": end_time,
+            "api_key": self.api_key
+        }
+        for _ in range(2):
+            self.bucket.acquire()
+            self.requests_made += 1
+            response = get_session(COINALYZE_HOST).get(COINALYZE_HISTORY_URL, params=params, timeout=REQUEST_TIMEOUT)
+            if response.status_code == 429:
+                retry_after = float(response.headers.get("Retry-After", 10))
+                print(f"⏳ Coinalyze rate limit hit, retrying in {retry_after:.0f}s")
+                self.bucket.drain(retry_after)
+                continue
+            data = response.json()
+            if not isinstance(data, list):
+                raise RuntimeError(f"Coinalyze error: {data}")
+            return data
+        raise RuntimeError("Coinalyze rate limit persisted")
+
+    def fetch_token_histories(self, token_starts, end_time):
+        """
+        Fetch Bybit and HL hourly funding for many tokens.
+
+        token_starts maps token -> first timestamp wanted. Tokens are sorted by
+        start and packed MAX_SYMBOLS_PER_REQUEST // 2 per request, so tokens
+        sharing a request also share roughly the same start. Returns
+        {token: {t: [bybit_rate, hl_rate]}} with None for a missing venue.
+        """
+        per_request = MAX_SYMBOLS_PER_REQUEST // 2
+        tokens = sorted(token_starts, key=lambda token: token_starts[token])
+        bars = {token: {} for token in tokens}
+
+        for i in range(0, len(tokens), per_request):
+            batch = tokens[i:i + per_request]
+            owners = {}
+            for token in batch:
+                owners[bybit_symbol(token)] = (token, 0)
+                owners[hl_symbol(token)] = (token, 1)
+            start_time = min(token_starts[token] for token in batch)
+
+            for entry in self.fetch_funding_history(list(owners), start_time, end_time):
+                owner = owners.get(entry.get("symbol"))
+                if owner is None:
+                    continue
+                token, venue = owner
+                for record in entry.get("history", []):
+                    bars[token].setdefault(record.get("t"), [None, None])[venue] = record.get("c")
+        return bars
@@ -0,0 +1,225 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hyperliquid_local.sdk_wrapper import (
+    get_account_summary, get_all_mids, place_market_order_hl, close_market_order_hl, set_leverage_hl,
+)
+from bybit_local.sdk_wrapper_bybit import (
+    get_price, set_leverage, place_market_order_bybit, close_position, safe_float,
+)
+from instrument_registry import bybit_symbol_for, bybit_qty_ratio, hl_asset, hl_sz_decimals, bybit_precision
+
+# Two long-lived workers so neither leg pays thread start-up cost at fire time.
+# One pair at a time owns them: with two pairs in the pool, each worker could
+# hold one leg of a different pair at the barrier.
+_leg_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="leg")
+_pair_lock = threading.Lock()
+LEG_BARRIER_TIMEOUT = 2.0  # seconds a leg waits for its counterpart before giving up unsent
+
+
+def _floor_to_step(value, step):
+    # Small epsilon so 0.3 / 0.1 does not floor to 2
+    return math.floor(value / step + 1e-9) * step
+
+
+def _decimals(step):
+    return max(0, -int(math.floor(math.log10(step) + 1e-9))) if step < 1 else 0
+
+
+def pair_leverage(hl_coin, leverage):
+    """
+    The whole-number leverage both legs are set to, or None if it is invalid.
+    HL only takes integers, so a fractional value is refused rather than
+    truncated on one venue and sent as is to the other.
+    """
+    try:
+        value = float(leverage)
+    except (TypeError, ValueError):
+        value = math.nan
+    if not math.isfinite(value) or value < 1 or value != int(value):
+        print(f"❌ Invalid leverage {leverage} for {hl_coin}: use a whole number of at least 1.")
+        return None
+    max_leverage = (hl_asset(hl_coin) or {}).get("max_leverage")
+    if max_leverage and value > max_leverage:
+        print(f"❌ Leverage {int(value)}x is above the HL maximum of {max_leverage}x for {hl_coin}.")
+        return None
+    return int(value)
+
+
+def prepare_pair_trade(hl_coin, long_venue, trade_usd, leverage, slippage=0.01, mids=None, account_value=None):
+    """
+    Pre-compute everything both legs need so nothing but the two order calls
+    remains on the critical path. Both legs get the same base-asset size,
+    floored to the coarser of the two venues' size steps.
+
+    long_venue is "bybit" or "hl"; the other venue takes the short leg.
+    mids and account_value can be passed in when sizing many pairs at once.
+    """
+    leverage = pair_leverage(hl_coin, leverage)
+    if leverage is None:
+        return None
+    symbol_bybit = bybit_symbol_for(hl_coin)
+    qty_ratio = bybit_qty_ratio(hl_coin)
+
+    if mids is None:
+        mids = get_all_mids()
+    mark_px = safe_float(mids.get(hl_coin))
+    if mark_px <= 0:
+        by_price = get_price(symbol_bybit)
+        mark_px = by_price / qty_ratio if by_price > 0 else 0.0
+    if mark_px <= 0:
+        print(f"❌ No price for {hl_coin}, cannot size trade.")
+        return None
+
+    trade_value = trade_usd
+    if account_value is None:
+        account_value = safe_float(get_account_summary().get("marginSummary", {}).get("accountValue"))
+    if account_value > 0:
+        trade_value = min(account_value * leverage, trade_usd)
+
+    hl_step = 10 ** (-hl_sz_decimals(hl_coin))
+    min_qty, by_step, _ = bybit_precision(symbol_bybit)
+    step = max(hl_step, by_step / qty_ratio)  # in HL units
+
+    hl_size = round(_floor_to_step(trade_value / mark_px, step), _decimals(hl_step))
+    by_qty = round(hl_size * qty_ratio, _decimals(by_step))
+    if hl_size <= 0 or by_qty < min_qty:
+        print(f"❌ Trade size too small for {hl_coin} (min Bybit qty {min_qty}).")
+        return None
+
+    hl_is_buy = long_venue == "hl"
+    return {
+        "hl_coin": hl_coin,
+        "symbol_bybit": symbol_bybit,
+        "leverage": leverage,
+        "mark_px": mark_px,
+        "slippage": slippage,
+        "hl_is_buy": hl_is_buy,
+        "hl_size": hl_size,
+        "bybit_side": "Sell" if hl_is_buy else "Buy",
+        "bybit_qty": by_qty,
+        "notional": hl_size * mark_px,
+    }
+
+
+def apply_leverage(plan):
+    try:
+        set_leverage(plan["symbol_bybit"], buy_leverage=plan["leverage"], sell_leverage=plan["leverage"])
+    except Exception as e:
+        # Bybit rejects a set_leverage that does not change anything
+        print(f"ℹ️ Bybit leverage unchanged for {plan['symbol_bybit']}: {e}")
+    try:
+        set_leverage_hl(plan["hl_coin"], plan["leverage"])
+    except Exception as e:
+        print(f"⚠️ Failed to set HL leverage for {plan['hl_coin']}: {e}")
+
+
+def hl_order_ok(result):
+    if not isinstance(result, dict) or result.get("status") != "ok":
+        return False
+    statuses = result.get("response", {}).get("data", {}).get("statuses", [])
+    return bool(statuses) and all("error" not in s for s in statuses)
+
+
+def hl_filled_size(result, default):
+    statuses = result.get("response", {}).get("data", {}).get("statuses", [])
+    filled = sum(safe_float(s.get("filled", {}).get("totalSz")) for s in statuses if isinstance(s, dict))
+    return filled or default
+
+
+def bybit_order_ok(result):
+    return isinstance(result, dict) and result.get("retCode") == 0
+
+
+def _timed_leg(barrier, send_fn):
+    if barrier is not None:
+        try:
+            barrier.wait(LEG_BARRIER_TIMEOUT)
+        except threading.BrokenBarrierError:
+            now = time.perf_counter()
+            error = RuntimeError(f"leg not sent, counterpart missed the {LEG_BARRIER_TIMEOUT}s barrier")
+            return {"sent": now, "acked": now, "result": None, "error": error}
+    sent = time.perf_counter()
+    try:
+        result, error = send_fn(), None
+    except Exception as e:
+        result, error = None, e
+    return {"sent": sent, "acked": time.perf_counter(), "result": result, "error": error}
+
+
+def _send_hl(plan):
+    return place_market_order_hl(
+        asset=plan["hl_coin"], is_buy=plan["hl_is_buy"], size=plan["hl_size"],
+        slippage=plan["slippage"], px=plan["mark_px"],
+    )
+
+
+def _send_bybit(plan):
+    return place_market_order_bybit(plan["symbol_bybit"], plan["bybit_side"], plan["bybit_qty"])
+
+
+def rollback_leg(plan, venue, leg):
+    """Unwind the leg that filled when its counterpart failed."""
+    try:
+        if venue == "hl":
+            size = hl_filled_size(leg["result"], plan["hl_size"])
+            print(f"↩️ Rolling back HL {plan['hl_coin']} ({size})...")
+            return close_market_order_hl(plan["hl_coin"], size=size, slippage=plan["slippage"])
+        side = "Buy" if plan["bybit_side"] == "Sell" else "Sell"
+        print(f"↩️ Rolling back Bybit {plan['symbol_bybit']} ({side} {plan['bybit_qty']})...")
+        return close_position(plan["symbol_bybit"], side, plan["bybit_qty"], reduce_only=True)
+    except Exception as e:
+        print(f"🚨 Rollback of {venue} leg FAILED, position is unhedged: {e}")
+        return None
+
+
+def execute_pair_trade(plan, concurrent=True):
+    """
+    Send both legs of a prepared plan. With concurrent=True both orders are
+    released together from the leg pool; otherwise they go out back to back.
+    If exactly one leg fails the other is rolled back. Returns a report with
+    both results and the ack skew in milliseconds.
+    """
+    if concurrent:
+        with _pair_lock:
+            barrier = threading.Barrier(2)
+            hl_future = _leg_pool.submit(_timed_leg, barrier, lambda: _send_hl(plan))
+            by_future = _leg_pool.submit(_timed_leg, barrier, lambda: _send_bybit(plan))
+            hl_leg, by_leg = hl_future.result(), by_future.result()
+    else:
+        by_leg = _timed_leg(None, lambda: _send_bybit(plan))
+        hl_leg = _timed_leg(None, lambda: _send_hl(plan))
+
+    hl_ok = hl_leg["error"] is None and hl_order_ok(hl_leg["result"])
+    by_ok = by_leg["error"] is None and bybit_order_ok(by_leg["result"])
+
+    report = {
+        "hl": hl_leg,
+        "bybit": by_leg,
+        "hl_ok": hl_ok,
+        "bybit_ok": by_ok,
+        "skew_ms": abs(hl_leg["acked"] - by_leg["acked"]) * 1000,
+        "send_skew_ms": abs(hl_leg["sent"] - by_leg["sent"]) * 1000,
+        "rollback": None,
+    }
+
+    if hl_ok and not by_ok:
+        report["rollback"] = rollback_leg(plan, "hl", hl_leg)
+    elif by_ok and not hl_ok:
+        report["rollback"] = rollback_leg(plan, "bybit", by_leg)
+    return report
+
+
+def print_execution_report(plan, report):
+    for venue, label in (("hl", "HL"), ("bybit", "Bybit")):
+        leg = report[venue]
+        status = "✅" if report[f"{venue}_ok"] else "❌"
+        latency = (leg["acked"] - leg["sent"]) * 1000
+        detail = leg["error"] if leg["error"] is not None else leg["result"]
+        print(f"{status} {label} leg ack in {latency:.1f} ms: {detail}")
+    print(f"⏱️ Leg skew: {report['skew_ms']:.1f} ms (send skew {report['send_skew_ms']:.2f} ms) | "
+          f"Notional ≈ {plan['notional']:.2f} USD")
+    if report["rollback"] is not None:
+        print(f"↩️ Rollback result: {report['rollback']}")
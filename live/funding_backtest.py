@@ -0,0 +1,209 @@
+from collections import namedtuple
+
+import numpy as np
+
+from funding_stats import SIDE_BYBIT, SIDE_HL, SIDE_NAMES
+
+# Vectorized backtest of the funding spread trade over aligned hourly arrays
+# (tokens x hours, hourly % as produced by funding_stats.stack_histories).
+# Entries and exits are threshold crossings of a trailing mean of the spread,
+# turned into positions with a forward-filled state machine; holding limits,
+# flips, fees and slippage are all applied as whole-array operations, and
+# per-trade numbers come out of one np.add.reduceat over the trade runs.
+HOURS_PER_YEAR = 24 * 365
+
+StrategyParams = namedtuple("StrategyParams", [
+    "entry_apr",     # open when the signal's APR (%) reaches this, on either side
+    "exit_apr",      # close when it falls back below this
+    "signal_hours",  # trailing hours averaged into the signal
+    "max_hold_h",    # force a close after this many hours (0 = no limit); re-entry needs a fresh signal
+    "allow_flip",    # switch sides in one hour; otherwise sit flat for an hour first
+    "hl_fee",        # taker fee per HL fill (fraction of notional)
+    "bybit_fee",     # taker fee per Bybit fill
+    "slippage_bps",  # per fill, on each venue
+    "leverage",      # notional per unit of capital across both legs' margin
+    "close_at_end",  # charge the exit of trades still open on the last hour
+], defaults=[20.0, 5.0, 24, 0, True, 0.00045, 0.00055, 2.0, 1.0, True])
+
+TRADE_DTYPE = np.dtype([
+    ("token", np.int32), ("side", np.int8), ("start", np.int32), ("hours", np.int32),
+    ("funding", float), ("cost", float), ("net", float), ("ret", float),
+])
+
+
+def rolling_mean(values, hours):
+    """Trailing mean over `hours` columns, skipping NaN; NaN where the window holds no data."""
+    valid = ~np.isnan(values)
+    total = np.cumsum(np.where(valid, values, 0.0), axis=1)
+    count = np.cumsum(valid, axis=1, dtype=float)
+    if hours < values.shape[1]:
+        total[:, hours:] -= total[:, :-hours].copy()
+        count[:, hours:] -= count[:, :-hours].copy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def forward_fill(events):
+    """Carry the last non-NaN event along each row; hours before the first event are 0."""
+    cols = np.arange(events.shape[1])
+    last = np.where(np.isnan(events), 0, cols)
+    np.maximum.accumulate(last, axis=1, out=last)
+    return np.nan_to_num(np.take_along_axis(events, last, axis=1), nan=0.0)
+
+
+def _run_starts(position):
+    """Column where the run of equal positions containing each hour began."""
+    cols = np.arange(position.shape[1])
+    prev = np.zeros_like(position)
+    prev[:, 1:] = position[:, :-1]
+    start = np.where(position != prev, cols, 0)
+    return np.maximum.accumulate(start, axis=1)
+
+
+def spread_signal(spread, signal_hours):
+    """Trailing mean spread as an APR (%); depends only on signal_hours, so sweeps can reuse it."""
+    return rolling_mean(spread, signal_hours) * HOURS_PER_YEAR
+
+
+def positions(spread, params, signal=None):
+    """
+    Hourly position per token: +1 long Bybit / short HL, -1 the opposite, 0
+    flat. The decision for hour t uses the signal up to hour t-1.
+    """
+    if signal is None:
+        signal = spread_signal(spread, params.signal_hours)
+
+    # Two independent hysteresis states; entering one side always exits the other
+    long_events = np.full(spread.shape, np.nan)
+    long_events[signal < params.exit_apr] = 0.0
+    long_events[signal >= params.entry_apr] = 1.0
+    short_events = np.full(spread.shape, np.nan)
+    short_events[signal > -params.exit_apr] = 0.0
+    short_events[signal <= -params.entry_apr] = 1.0
+    state = (forward_fill(long_events) - forward_fill(short_events)).astype(np.int8)
+
+    position = np.zeros_like(state)
+    position[:, 1:] = state[:, :-1]
+
+    if not params.allow_flip:
+        flipped = np.zeros(position.shape, dtype=bool)
+        flipped[:, 1:] = position[:, 1:] * position[:, :-1] < 0
+        position[flipped] = 0
+
+    if params.max_hold_h > 0:
+        age = np.arange(position.shape[1]) - _run_starts(position)
+        position[(age >= params.max_hold_h) & (position != 0)] = 0
+    return position
+
+
+def _trades(position, funding, cost_per_change, params):
+    """One row per run of a non-zero position, summed with reduceat."""
+    tokens, hours = position.shape
+    # A flat separator column keeps runs from crossing into the next token
+    padded = np.zeros((tokens, hours + 1), dtype=position.dtype)
+    padded[:, :hours] = position
+    flat = padded.ravel()
+    prev = np.concatenate(([0], flat[:-1]))
+    nxt = np.concatenate((flat[1:], [0]))
+    starts = np.flatnonzero((flat != 0) & (flat != prev))
+    ends = np.flatnonzero((flat != 0) & (flat != nxt))
+
+    trades = np.zeros(len(starts), dtype=TRADE_DTYPE)
+    if len(starts) == 0:
+        return trades
+    bounds = np.empty(2 * len(starts), dtype=np.intp)
+    bounds[0::2] = starts
+    bounds[1::2] = ends + 1
+    funding_padded = np.zeros((tokens, hours + 1))
+    funding_padded[:, :hours] = funding
+    trades["funding"] = np.add.reduceat(funding_padded.ravel(), bounds)[0::2]
+
+    trades["token"], trades["start"] = np.divmod(starts, hours + 1)
+    trades["hours"] = ends - starts + 1
+    trades["side"] = np.where(flat[starts] > 0, SIDE_BYBIT, SIDE_HL)
+    still_open = (trades["start"] + trades["hours"] == hours) & (not params.close_at_end)
+    trades["cost"] = np.where(still_open, 1.0, 2.0) * cost_per_change
+    trades["net"] = trades["funding"] - trades["cost"]
+    trades["ret"] = trades["net"] * params.leverage / 2
+    return trades
+
+
+def _max_drawdown(equity):
+    return (equity - np.maximum.accumulate(equity, axis=-1)).min(axis=-1)
+
+
+def backtest(bybit, hl, params=StrategyParams()):
+    """
+    Run the strategy over hourly funding (%) of shape (tokens, hours). Each
+    token trades one unit of capital; `leverage` units of notional per pair,
+    so a return is half the notional PnL times leverage (two legs' margin).
+    Returns a dict of arrays:
+      position  int8 (tokens, hours)
+      returns   hourly return on capital per token, after costs
+      equity    cumulative equity per token, starting at 1
+      portfolio equal-weight equity curve over all tokens
+      trades    structured array (TRADE_DTYPE), one row per trade
+      summary   per-token and portfolio statistics
+    """
+    bybit = np.atleast_2d(np.asarray(bybit, dtype=float))
+    hl = np.atleast_2d(np.asarray(hl, dtype=float))
+    return backtest_spread(hl - bybit, params)  # earned per hour (%) by long Bybit / short HL
+
+
+def backtest_spread(spread, params=StrategyParams(), signal=None):
+    """backtest() on a precomputed hl - bybit spread, optionally with its spread_signal()."""
+    position = positions(spread, params, signal)
+
+    # Entry and exit each cross the spread on both venues
+    cost_per_change = params.hl_fee + params.bybit_fee + 2 * params.slippage_bps / 10_000
+    funding = position * np.nan_to_num(spread) / 100
+    changes = np.abs(np.diff(position, axis=1, prepend=0)).astype(float)
+    if params.close_at_end:
+        changes[:, -1] += np.abs(position[:, -1])
+    net = funding - changes * cost_per_change
+
+    returns = net * params.leverage / 2
+    equity = 1.0 + np.cumsum(returns, axis=1)
+    portfolio_returns = returns.mean(axis=0)
+    portfolio = 1.0 + np.cumsum(portfolio_returns)
+
+    trades = _trades(position, funding, cost_per_change, params)
+    years = position.shape[1] / HOURS_PER_YEAR
+    n_trades = np.bincount(trades["token"], minlength=len(position))
+    wins = np.bincount(trades["token"], weights=(trades["net"] > 0).astype(float), minlength=len(position))
+    std = portfolio_returns.std()
+    summary = {
+        "total_return": equity[:, -1] - 1,
+        "apr": (equity[:, -1] - 1) / years * 100,
+        "max_drawdown": _max_drawdown(equity),
+        "trades": n_trades,
+        "win_rate": np.divide(wins, n_trades, out=np.zeros(len(position)), where=n_trades > 0) * 100,
+        "exposure": (position != 0).mean(axis=1) * 100,
+        "portfolio_return": portfolio[-1] - 1,
+        "portfolio_apr": (portfolio[-1] - 1) / years * 100,
+        "portfolio_max_drawdown": _max_drawdown(portfolio),
+        "sharpe": portfolio_returns.mean() / std * np.sqrt(HOURS_PER_YEAR) if std > 0 else 0.0,
+    }
+    return {"position": position, "returns": returns, "equity": equity, "portfolio": portfolio,
+            "trades": trades, "summary": summary}
+
+
+def print_backtest(tokens, result, params=StrategyParams()):
+    s = result["summary"]
+    trades = result["trades"]
+    hours = result["position"].shape[1]
+    print(f"\n🧪 Funding Backtest ({len(tokens)} tokens, {hours / 24:.0f} days, entry {params.entry_apr:.0f}% / "
+          f"exit {params.exit_apr:.0f}% APR, {params.signal_hours}h signal, {params.leverage:g}x)")
+    print("=" * 100)
+    print(f"{'Token':<10}| {'Return':>9} | {'APR':>9} | {'Max DD':>8} | {'Trades':>6} | {'Win %':>6} | "
+          f"{'In Mkt %':>8} | {'Last Side'}")
+    print("-" * 100)
+    for i in np.argsort(-s["total_return"]):
+        last = trades[trades["token"] == i]
+        side = SIDE_NAMES[last["side"][-1]] if len(last) else "-"
+        print(f"{tokens[i]:<10}| {s['total_return'][i] * 100:>8.2f}% | {s['apr'][i]:>8.2f}% | "
+              f"{s['max_drawdown'][i] * 100:>7.2f}% | {s['trades'][i]:>6} | {s['win_rate'][i]:>5.1f}% | "
+              f"{s['exposure'][i]:>7.1f}% | {side}")
+    print("-" * 100)
+    print(f"💼 Portfolio: {s['portfolio_return'] * 100:+.2f}% | APR {s['portfolio_apr']:.2f}% | "
+          f"Max DD {s['portfolio_max_drawdown'] * 100:.2f}% | Sharpe {s['sharpe']:.2f} | {len(trades)} trades")
@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+
+from hyperliquid_local.sdk_wrapper import get_predicted_fundings_snapshot
+from bybit_local.sdk_wrapper_bybit import get_ticker_snapshot
+from instrument_registry import load_registry
+
+# Whole-universe funding spread scan: one bulk HL predictedFundings snapshot,
+# one bulk Bybit linear tickers snapshot, every common pair ranked in a single
+# vectorized pass.
+DEFAULT_TOP_N = 20
+
+
+def scan_funding_spreads(top_n=DEFAULT_TOP_N, min_turnover=0.0):
+    """
+    Return the top_n common HL / Bybit pairs by absolute hourly funding spread.
+    Each row holds both hourly rates (%), the spread, the better long side and
+    the annualized APR (%) of holding the spread.
+    """
+    started = time.perf_counter()
+    registry = load_registry()
+    hl_funding = get_predicted_fundings_snapshot()
+    tickers = get_ticker_snapshot()
+
+    coins, symbols = [], []
+    hl_rate, hl_interval, by_rate, by_interval, turnover = [], [], [], [], []
+    for coin, mapping in registry["hl_to_bybit"].items():
+        hl_entry = hl_funding.get((coin.upper(), "HlPerp"))
+        ticker = tickers.get(mapping["symbol"])
+        instrument = registry["bybit"].get(mapping["symbol"])
+        if hl_entry is None or ticker is None or instrument is None:
+            continue
+        coins.append(coin)
+        symbols.append(mapping["symbol"])
+        hl_rate.append(hl_entry[0])
+        hl_interval.append(hl_entry[2] or 1.0)
+        by_rate.append(ticker["fundingRate"] * 100)
+        by_interval.append(instrument["funding_interval_h"] or 8.0)
+        turnover.append(ticker.get("turnover24h", 0.0))
+
+    if not coins:
+        return []
+
+    hl_hourly = np.asarray(hl_rate) / np.asarray(hl_interval)
+    by_hourly = np.asarray(by_rate) / np.asarray(by_interval)
+    spread = hl_hourly - by_hourly  # > 0: long Bybit / short HL collects it
+    apr = np.abs(spread) * 24 * 365
+    eligible = np.asarray(turnover) >= min_turnover
+
+    ranked = np.flatnonzero(eligible)
+    ranked = ranked[np.argsort(-apr[ranked], kind="stable")][:top_n]
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return [{
+        "coin": coins[i],
+        "symbol_bybit": symbols[i],
+        "hl_rate_h": float(hl_hourly[i]),
+        "by_rate_h": float(by_hourly[i]),
+        "spread_h": float(spread[i]),
+        "long": "Bybit" if spread[i] > 0 else "Hyperliquid",
+        "apr": float(apr[i]),
+        "pairs_scanned": len(coins),
+        "elapsed_ms": elapsed_ms,
+    } for i in ranked]
+
+
+def print_scan(rows):
+    if not rows:
+        print("📭 No common HL / Bybit pairs found.")
+        return
+    print(f"\n🔭 Top {len(rows)} Funding Spreads ({rows[0]['pairs_scanned']} pairs scanned in {rows[0]['elapsed_ms']:.1f} ms)")
+    print("=" * 95)
+    print(f"{'#':<4}| {'Coin':<10}| {'Bybit':<16}| {'HL Rate/h':<11}| {'BY Rate/h':<11}| {'Spread/h':<11}| {'Long':<12}| {'APR'}")
+    print("-" * 95)
+    for rank, row in enumerate(rows, 1):
+        print(f"{rank:<4}| {row['coin']:<10}| {row['symbol_bybit']:<16}| {row['hl_rate_h']:+.5f}% | "
+              f"{row['by_rate_h']:+.5f}% | {row['spread_h']:+.5f}% | {row['long']:<12}| {row['apr']:.2f}%")
+    print("-" * 95)
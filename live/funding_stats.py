@@ -0,0 +1,99 @@
+import numpy as np
+
+# Vectorized funding statistics over aligned hourly arrays. Rates are hourly
+# percentages, oldest hour first and most recent hour last; NaN marks an hour
+# with no bar. Inputs may be 1-D (one token) or 2-D (tokens x hours), and every
+# statistic is computed for all tokens and all trailing windows in one pass.
+HOUR = 60 * 60
+WINDOWS = {"24h": 24, "7d": 168, "30d": 720, "90d": 2160}
+
+SIDE_NONE, SIDE_BYBIT, SIDE_HL = 0, 1, 2
+SIDE_NAMES = np.array(["None", "Bybit", "Hyperliquid"])
+
+
+def stack_histories(histories, end_ts, hours, bybit_intervals=None):
+    """
+    Align per-token store rows (structured arrays with t / bybit / hl) onto a
+    shared hourly grid of `hours` columns ending at end_ts. Bybit rates are
+    divided by each token's funding interval so both venues are hourly.
+    Returns (bybit, hl) float arrays of shape (len(histories), hours).
+    """
+    bybit = np.full((len(histories), hours), np.nan)
+    hl = np.full((len(histories), hours), np.nan)
+    first_ts = (end_ts // HOUR - hours + 1) * HOUR
+    for i, rows in enumerate(histories):
+        if len(rows) == 0:
+            continue
+        cols = (rows["t"] - first_ts) // HOUR
+        keep = (cols >= 0) & (cols < hours)
+        interval = bybit_intervals[i] if bybit_intervals is not None and bybit_intervals[i] else 1.0
+        bybit[i, cols[keep]] = rows["bybit"][keep] / interval
+        hl[i, cols[keep]] = rows["hl"][keep]
+    return bybit, hl
+
+
+def window_stats(bybit, hl, windows=WINDOWS):
+    """
+    For each trailing window return a dict of per-token arrays:
+      success     share of non-zero-spread hours where longing Bybit was better (%)
+      better_side SIDE_BYBIT / SIDE_HL / SIDE_NONE by annualized funding earned
+      bybit_apr   APR (%) collected by longing Bybit in the hours it was better
+      hl_apr      APR (%) collected by longing HL in the hours it was better
+      better_apr  max(bybit_apr, hl_apr)
+      max_spread / min_spread  extremes of the better side's hourly spread
+      zero_pct    share of the window with no spread or no data (%)
+      hours       number of non-zero-spread hours
+    """
+    bybit = np.atleast_2d(np.asarray(bybit, dtype=float))
+    hl = np.atleast_2d(np.asarray(hl, dtype=float))
+
+    results = {}
+    for name, size in windows.items():
+        by_w = bybit[:, -size:]
+        hl_w = hl[:, -size:]
+        # Long Bybit / short HL earns hl - bybit; the opposite pair earns the negative
+        spread = hl_w - by_w
+        active = ~np.isnan(spread) & (spread != 0)
+        spread = np.where(active, spread, 0.0)
+
+        n = active.sum(axis=1)
+        bybit_better = spread > 0
+        hl_better = spread < 0
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            success = np.where(n > 0, bybit_better.sum(axis=1) / n * 100, 0.0)
+            period_days = n / 24
+            bybit_apr = np.where(n > 0, np.where(bybit_better, spread, 0).sum(axis=1) / period_days * 365, 0.0)
+            hl_apr = np.where(n > 0, np.where(hl_better, -spread, 0).sum(axis=1) / period_days * 365, 0.0)
+
+        better_is_bybit = bybit_apr > hl_apr
+        better_side = np.where(n == 0, SIDE_NONE, np.where(better_is_bybit, SIDE_BYBIT, SIDE_HL))
+        side_spread = np.where(better_is_bybit[:, None], spread, -spread)
+        max_spread = np.where(n > 0, np.where(active, side_spread, -np.inf).max(axis=1), 0.0)
+        min_spread = np.where(n > 0, np.where(active, side_spread, np.inf).min(axis=1), 0.0)
+
+        results[name] = {
+            "success": success,
+            "better_side": better_side,
+            "bybit_apr": bybit_apr,
+            "hl_apr": hl_apr,
+            "better_apr": np.maximum(bybit_apr, hl_apr),
+            "max_spread": max_spread,
+            "min_spread": min_spread,
+            "zero_pct": (size - n) / size * 100,
+            "hours": n,
+        }
+    return results
+
+
+def token_row(stats, window, i):
+    """Plain-Python view of one token's numbers in one window."""
+    w = stats[window]
+    return {
+        "success": float(w["success"][i]),
+        "better_side": str(SIDE_NAMES[w["better_side"][i]]),
+        "better_apr": float(w["better_apr"][i]),
+        "max_spread": float(w["max_spread"][i]),
+        "min_spread": float(w["min_spread"][i]),
+        "zero_pct": float(w["zero_pct"][i]),
+    }
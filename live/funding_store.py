@@ -0,0 +1,81 @@
+import os
+import threading
+
+import numpy as np
+
+# On-disk hourly funding history, one .npy file per token holding a structured
+# array of (t, bybit, hl) rows sorted by t. Missing venue values are NaN. Files
+# are opened memory-mapped, so loading a month of history costs microseconds,
+# and the last row doubles as the per-token high-water mark for incremental
+# Coinalyze syncs.
+STORE_DIR = os.path.join(os.path.dirname(__file__), ".cache", "funding")
+FUNDING_DTYPE = np.dtype([("t", "<i8"), ("bybit", "<f8"), ("hl", "<f8")])
+
+_write_lock = threading.Lock()
+
+
+def _path(token):
+    return os.path.join(STORE_DIR, f"{token.upper()}.npy")
+
+
+def load_history(token):
+    """Return the stored rows for token (read-only memory map), or an empty array."""
+    try:
+        return np.load(_path(token), mmap_mode="r")
+    except (FileNotFoundError, ValueError):
+        return np.empty(0, dtype=FUNDING_DTYPE)
+
+
+def history_range(token):
+    """Return (first t, last t) in seconds, or (None, None) when nothing is stored."""
+    rows = load_history(token)
+    if len(rows) == 0:
+        return None, None
+    return int(rows["t"][0]), int(rows["t"][-1])
+
+
+def high_water_mark(token):
+    return history_range(token)[1]
+
+
+def merge_history(token, timestamps, bybit_rates, hl_rates):
+    """
+    Upsert rows keyed by timestamp. A NaN in the new data never overwrites a
+    stored value, so a bar that arrived for only one venue is completed on a
+    later sync. Returns the number of stored rows.
+    """
+    new = np.empty(len(timestamps), dtype=FUNDING_DTYPE)
+    new["t"] = timestamps
+    new["bybit"] = bybit_rates
+    new["hl"] = hl_rates
+
+    with _write_lock:
+        old = np.array(load_history(token))  # copy out of the memory map before replacing the file
+        merged = np.concatenate([old, new])
+        # Stable sort keeps stored rows ahead of new rows for equal t
+        merged = merged[np.argsort(merged["t"], kind="stable")]
+        if len(merged) == 0:
+            return 0
+
+        is_start = np.r_[True, merged["t"][1:] != merged["t"][:-1]]
+        group = np.cumsum(is_start) - 1
+        out = merged[is_start].copy()
+        for venue in ("bybit", "hl"):
+            # Last non-NaN value per timestamp group wins
+            values = merged[venue]
+            valid = ~np.isnan(values)
+            last_valid = np.full(len(out), np.nan)
+            last_valid[group[valid]] = values[valid]
+            out[venue] = last_valid
+
+        os.makedirs(STORE_DIR, exist_ok=True)
+        tmp_path = _path(token) + ".tmp.npy"
+        np.save(tmp_path, out)
+        os.replace(tmp_path, _path(token))
+        return len(out)
+
+
+def window(token, start_ts):
+    """Rows with t >= start_ts, still memory-mapped."""
+    rows = load_history(token)
+    return rows[np.searchsorted(rows["t"], start_ts):]
@@ -0,0 +1,131 @@
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from funding_backtest import StrategyParams, backtest_spread, spread_signal
+
+# Parameter sweeps of the funding backtest on a process pool. The spread
+# matrix is copied once into shared memory; each worker maps it at start-up
+# and keeps the last trailing signal it computed, so a task carries only a few
+# parameter tuples and returns a few numbers. Results are yielded as tasks
+# finish. Workers come from a forkserver that preloads only this module (spawn
+# where there is none), never from a fork of the caller: the interactive app
+# runs stream, refresh and HTTP pool threads whose held locks a forked child
+# would inherit. Workers touch nothing but numpy and the shared block.
+DEFAULT_GRID = {
+    "entry_apr": (10.0, 20.0, 30.0, 50.0),
+    "exit_apr": (0.0, 5.0, 10.0),
+    "signal_hours": (8, 24, 72),
+    "max_hold_h": (0, 168, 720),
+    "leverage": (1.0, 3.0, 5.0),
+}
+PARAMS_PER_TASK = 4
+
+_worker = {}
+
+
+def param_grid(**axes):
+    """Every combination of the given StrategyParams fields, sorted so equal signal_hours share a worker cache."""
+    names = list(axes)
+    grid = [StrategyParams(**dict(zip(names, values))) for values in itertools.product(*axes.values())]
+    # Exits above the entry never trigger anything new
+    grid = [p for p in grid if p.exit_apr < p.entry_apr]
+    return sorted(grid, key=lambda p: p.signal_hours)
+
+
+def _attach(name, shape, dtype):
+    # Workers share the parent's resource tracker, so only the parent's unlink frees the block
+    shm = SharedMemory(name=name)
+    _worker["shm"] = shm
+    _worker["spread"] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker["signal"] = (None, None)
+
+
+def _signal(signal_hours):
+    hours, signal = _worker["signal"]
+    if hours != signal_hours:
+        signal = spread_signal(_worker["spread"], signal_hours)
+        _worker["signal"] = (signal_hours, signal)
+    return signal
+
+
+def _run(params_list):
+    out = []
+    for params in params_list:
+        result = backtest_spread(_worker["spread"], params, _signal(params.signal_hours))
+        s = result["summary"]
+        out.append((params, {
+            "apr": float(s["portfolio_apr"]),
+            "total_return": float(s["portfolio_return"]),
+            "max_drawdown": float(s["portfolio_max_drawdown"]),
+            "sharpe": float(s["sharpe"]),
+            "trades": int(len(result["trades"])),
+            "win_rate": float((result["trades"]["net"] > 0).mean() * 100) if len(result["trades"]) else 0.0,
+        }))
+    return out
+
+
+def _mp_context():
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])  # instead of re-importing the caller's __main__
+    return context
+
+
+def sweep(bybit, hl, grid, workers=None, params_per_task=PARAMS_PER_TASK):
+    """
+    Backtest every StrategyParams in `grid` over the same funding arrays and
+    yield (params, metrics) as each task completes, in completion order.
+    """
+    spread = np.ascontiguousarray(np.atleast_2d(np.asarray(hl, dtype=float) - np.asarray(bybit, dtype=float)))
+    workers = workers or os.cpu_count() or 1
+    tasks = [grid[i:i + params_per_task] for i in range(0, len(grid), params_per_task)]
+
+    shm = SharedMemory(create=True, size=max(spread.nbytes, 1))
+    try:
+        np.ndarray(spread.shape, dtype=spread.dtype, buffer=shm.buf)[:] = spread
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context(),
+                                 initializer=_attach, initargs=(shm.name, spread.shape, spread.dtype.str)) as pool:
+            futures = [pool.submit(_run, task) for task in tasks]
+            for future in as_completed(futures):
+                yield from future.result()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def run_sweep(bybit, hl, grid, workers=None, top_n=10, key="apr", progress=True):
+    """Run a sweep, printing progress as results stream in; returns all results best first."""
+    started = time.perf_counter()
+    results = []
+    for params, metrics in sweep(bybit, hl, grid, workers):
+        results.append((params, metrics))
+        if progress:
+            print(f"\r⚙️ {len(results)}/{len(grid)} parameter sets ({time.perf_counter() - started:.1f}s)", end="", flush=True)
+    if progress:
+        print()
+    results.sort(key=lambda r: r[1][key], reverse=True)
+    print_sweep(results[:top_n], len(grid), time.perf_counter() - started)
+    return results
+
+
+def print_sweep(rows, evaluated, elapsed):
+    if not rows:
+        print("📭 No parameter sets evaluated.")
+        return
+    print(f"\n🧮 Top {len(rows)} of {evaluated} parameter sets ({elapsed:.1f}s)")
+    print("=" * 104)
+    print(f"{'#':<4}| {'Entry':>6} | {'Exit':>5} | {'Signal':>6} | {'Max Hold':>8} | {'Lev':>4} | {'APR':>9} | "
+          f"{'Max DD':>8} | {'Sharpe':>7} | {'Trades':>6} | {'Win %':>6}")
+    print("-" * 104)
+    for rank, (p, m) in enumerate(rows, 1):
+        hold = f"{p.max_hold_h}h" if p.max_hold_h else "-"
+        print(f"{rank:<4}| {p.entry_apr:>5.0f}% | {p.exit_apr:>4.0f}% | {p.signal_hours:>5}h | {hold:>8} | "
+              f"{p.leverage:>3g}x | {m['apr']:>8.2f}% | {m['max_drawdown'] * 100:>7.2f}% | {m['sharpe']:>7.2f} | "
+              f"{m['trades']:>6} | {m['win_rate']:>5.1f}%")
@@ -0,0 +1,301 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+import hyperliquid_local.sdk_wrapper as hl_wrapper
+import bybit_local.sdk_wrapper_bybit as bybit_wrapper
+from instrument_registry import bybit_symbol_for, hl_coin_for, bybit_qty_ratio, hl_sz_decimals, bybit_precision
+from account_stream import BOOK_MAX_AGE
+
+# Event-driven hedge drift monitor. It listens to the market store (mids) and
+# the account book (positions), recomputes the delta of every HL / Bybit pair
+# the moment either side moves, and once the mismatched notional crosses the
+# USD or percentage threshold sends one corrective order on the venue that
+# brings the legs back together, rounded to that venue's lot size. Every
+# correction is appended to a JSON-lines log.
+#
+# A sent correction stays in flight, netted into its leg, until the account
+# book shows the fill, so a lagging private feed cannot trigger it again. Any
+# correction needs both venues live in the book and updated within
+# max_book_age seconds.
+LOG_PATH = os.path.join(os.path.dirname(__file__), ".cache", "hedge_corrections.jsonl")
+
+DEFAULT_THRESHOLD_USD = 25.0
+DEFAULT_THRESHOLD_PCT = 2.0
+DEFAULT_COOLDOWN = 10.0   # seconds before the same pair may be corrected again
+DEFAULT_MAX_BOOK_AGE = BOOK_MAX_AGE
+PENDING_SETTLE = 5.0      # a venue update this long after a send without the fill means it did not fill
+DEFAULT_SLIPPAGE = 0.01
+MODE_REDUCE = "reduce"    # trim the larger leg (reduce-only)
+MODE_EXTEND = "extend"    # grow the smaller leg
+RECENT_CORRECTIONS = 50
+
+
+def _floor_to_step(value, step):
+    return math.floor(value / step + 1e-9) * step
+
+
+class HedgeMonitor:
+    def __init__(self, store, book, threshold_usd=DEFAULT_THRESHOLD_USD, threshold_pct=DEFAULT_THRESHOLD_PCT,
+                 mode=MODE_REDUCE, cooldown=DEFAULT_COOLDOWN, slippage=DEFAULT_SLIPPAGE, dry_run=False,
+                 log_path=LOG_PATH, max_book_age=DEFAULT_MAX_BOOK_AGE):
+        """
+        store: market_stream.MarketDataStore; book: account_stream.AccountBook.
+        A pair is corrected when its drift reaches threshold_usd or
+        threshold_pct of the larger leg; either threshold can be 0 to disable it.
+        """
+        self.store = store
+        self.book = book
+        self.threshold_usd = threshold_usd
+        self.threshold_pct = threshold_pct
+        self.mode = mode
+        self.cooldown = cooldown
+        self.slippage = slippage
+        self.dry_run = dry_run
+        self.log_path = log_path
+        self.max_book_age = max_book_age
+
+        self._lock = threading.Lock()
+        self._dirty = {}            # HL coin -> perf_counter of the first unhandled update
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._pairs = set()         # HL coins with a position on either venue
+        self._last_correction = {}  # HL coin -> monotonic time
+        self._pending = {}          # HL coin -> correction sent but not yet in the book
+        self.corrections = deque(maxlen=RECENT_CORRECTIONS)
+        self.stats = {"evaluations": 0, "corrections": 0, "skipped_min_size": 0, "skipped_stale": 0, "failed": 0}
+        self._thread = None
+
+    # === Listeners (run on the stream threads, so they only mark and wake)
+    def _on_market(self, venue, keys):
+        coins = keys if venue == "hl" else [hl_coin_for(symbol) for symbol in keys]
+        self._mark(coins)
+
+    def _on_account(self, venue, keys):
+        coins = keys if venue == "hl" else [hl_coin_for(symbol) for symbol in keys if symbol]
+        with self._lock:
+            self._pairs.update(c for c in coins if c)
+        self._mark(coins)
+
+    def _mark(self, coins):
+        now = time.perf_counter()
+        marked = False
+        with self._lock:
+            for coin in coins:
+                if coin in self._pairs and coin not in self._dirty:
+                    self._dirty[coin] = now
+                    marked = True
+        if marked:
+            self._wake.set()
+
+    # === Delta
+    def _legs(self):
+        """HL coin -> (HL size, Bybit size in HL units) with signs, short < 0."""
+        legs = {}
+        for p in self.book.hl_summary().get("assetPositions", []):
+            pos = p.get("position", {})
+            szi = float(pos.get("szi") or 0)
+            if szi:
+                legs[pos.get("coin")] = [szi, 0.0]
+        for pos in self.book.bybit_positions_response()["result"]["list"]:
+            size = float(pos.get("size") or 0)
+            if not size:
+                continue
+            coin = hl_coin_for(pos["symbol"])
+            signed = size if pos.get("side") == "Buy" else -size
+            legs.setdefault(coin, [0.0, 0.0])[1] = signed / bybit_qty_ratio(coin)
+        self._net_pending(legs)
+        return legs
+
+    def _net_pending(self, legs):
+        """Add in-flight corrections to their legs; drop those the book has caught up with."""
+        with self._lock:
+            for coin, pending in list(self._pending.items()):
+                leg = legs.get(coin, (0.0, 0.0))[pending["index"]]
+                filled = abs(leg - pending["before"]) >= abs(pending["delta"]) / 2
+                settled = self.book.last_update[pending["venue"]] > pending["sent_at"] + PENDING_SETTLE
+                if filled or settled:
+                    del self._pending[coin]
+                else:
+                    legs.setdefault(coin, [0.0, 0.0])[pending["index"]] += pending["delta"]
+
+    def _book_fresh(self):
+        return all(self.book.is_live(venue, self.max_book_age) for venue in ("hl", "bybit"))
+
+    def _price(self, coin):
+        mid = self.store.get_hl_mid(coin)
+        if mid:
+            return mid
+        ticker = self.store.get_bybit_ticker(bybit_symbol_for(coin))
+        return ticker["markPrice"] / bybit_qty_ratio(coin) if ticker and ticker.get("markPrice") else None
+
+    def drift(self, coin, legs):
+        """(net size in HL units, drift USD, drift % of the larger leg, mark) for one pair, or None."""
+        hl_size, by_size = legs.get(coin, (0.0, 0.0))
+        # Only hedged pairs: one leg long, the other short
+        if hl_size == 0 or by_size == 0 or (hl_size > 0) == (by_size > 0):
+            return None
+        mark = self._price(coin)
+        if not mark:
+            return None
+        net = hl_size + by_size
+        drift_usd = abs(net) * mark
+        larger = max(abs(hl_size), abs(by_size)) * mark
+        return net, drift_usd, drift_usd / larger * 100 if larger else 0.0, mark
+
+    def _breached(self, drift_usd, drift_pct):
+        return ((self.threshold_usd > 0 and drift_usd >= self.threshold_usd)
+                or (self.threshold_pct > 0 and drift_pct >= self.threshold_pct))
+
+    # === Correction
+    def _correction(self, coin, legs, net):
+        """Pick the venue, side and lot-size-rounded quantity that moves net towards zero."""
+        hl_size, by_size = legs[coin]
+        hl_larger = abs(hl_size) > abs(by_size)
+        on_hl = hl_larger if self.mode == MODE_REDUCE else not hl_larger
+        is_buy = net < 0  # buying adds to net, so buy when net is short
+        if on_hl:
+            qty = round(_floor_to_step(abs(net), 10 ** -hl_sz_decimals(coin)), hl_sz_decimals(coin))
+            return "hl", is_buy, qty, qty > 0
+        symbol = bybit_symbol_for(coin)
+        min_qty, step, precision = bybit_precision(symbol)
+        qty = round(_floor_to_step(abs(net) * bybit_qty_ratio(coin), step), precision)
+        return "bybit", is_buy, qty, qty >= min_qty
+
+    def _send(self, coin, venue, is_buy, qty, mark):
+        reduce_only = self.mode == MODE_REDUCE
+        if venue == "hl":
+            if reduce_only:
+                result = hl_wrapper.close_market_order_hl(coin, size=qty, px=mark, slippage=self.slippage)
+            else:
+                result = hl_wrapper.place_market_order_hl(coin, is_buy, qty, slippage=self.slippage, px=mark)
+            statuses = (result or {}).get("response", {}).get("data", {}).get("statuses", [])
+            ok = isinstance(result, dict) and result.get("status") == "ok" and bool(statuses) \
+                and all("error" not in s for s in statuses)
+            return ok, result
+        symbol = bybit_symbol_for(coin)
+        side = "Buy" if is_buy else "Sell"
+        if reduce_only:
+            result = bybit_wrapper.close_position(symbol, side, qty, reduce_only=True)
+        else:
+            result = bybit_wrapper.place_market_order_bybit(symbol, side, qty)
+        return isinstance(result, dict) and result.get("retCode") == 0, result
+
+    def _log(self, entry):
+        self.corrections.append(entry)
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+        except OSError as e:
+            print(f"⚠️ Failed to write hedge log: {e}")
+
+    def check(self, coin, legs=None, marked_at=None):
+        """Evaluate one pair and correct it if it has drifted; returns the log entry or None."""
+        legs = self._legs() if legs is None else legs
+        self.stats["evaluations"] += 1
+        if not self._book_fresh():
+            self.stats["skipped_stale"] += 1
+            return None
+        drift = self.drift(coin, legs)
+        if drift is None:
+            return None
+        net, drift_usd, drift_pct, mark = drift
+        if not self._breached(drift_usd, drift_pct):
+            return None
+        if time.monotonic() - self._last_correction.get(coin, float("-inf")) < self.cooldown:
+            return None
+        if coin in self._pending:  # already netted into legs; one correction in flight per pair
+            return None
+
+        venue, is_buy, qty, sizeable = self._correction(coin, legs, net)
+        if not sizeable:
+            self.stats["skipped_min_size"] += 1
+            return None
+
+        self._last_correction[coin] = time.monotonic()
+        sent_at = time.time()
+        sent = time.perf_counter()
+        entry = {
+            "time": time.time(), "coin": coin, "venue": venue, "side": "buy" if is_buy else "sell",
+            "qty": qty, "mode": self.mode, "mark": mark, "hl_size": legs[coin][0], "bybit_size": legs[coin][1],
+            "drift_usd": round(drift_usd, 4), "drift_pct": round(drift_pct, 4), "dry_run": self.dry_run,
+            "reaction_ms": round((sent - marked_at) * 1000, 3) if marked_at else None,
+        }
+        if self.dry_run:
+            entry["ok"] = True
+        else:
+            try:
+                entry["ok"], entry["result"] = self._send(coin, venue, is_buy, qty, mark)
+            except Exception as e:
+                entry["ok"], entry["result"] = False, str(e)
+            entry["ack_ms"] = round((time.perf_counter() - sent) * 1000, 3)
+            if entry["ok"]:
+                index = 0 if venue == "hl" else 1
+                delta = qty if venue == "hl" else qty / bybit_qty_ratio(coin)
+                with self._lock:
+                    self._pending[coin] = {"venue": venue, "index": index, "before": legs[coin][index],
+                                           "delta": delta if is_buy else -delta, "sent_at": sent_at}
+        self.stats["corrections" if entry["ok"] else "failed"] += 1
+        self._log(entry)
+        label = "🧪 Would correct" if self.dry_run else ("🩹 Corrected" if entry["ok"] else "🚨 Correction FAILED for")
+        print(f"{label} {coin}: {entry['side']} {qty} on {venue} (drift ${drift_usd:.2f} / {drift_pct:.2f}%)")
+        return entry
+
+    # === Worker
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+            if not dirty:
+                continue
+            try:
+                legs = self._legs()
+                with self._lock:
+                    self._pairs = set(legs)
+                for coin, marked_at in dirty.items():
+                    if coin in legs:
+                        self.check(coin, legs, marked_at)
+            except Exception as e:
+                print(f"⚠️ Hedge monitor check failed: {e}")
+
+    def start(self):
+        legs = self._legs()
+        with self._lock:
+            self._pairs = set(legs)
+        self.store.add_listener(self._on_market)
+        self.book.add_listener(self._on_account)
+        self._thread = threading.Thread(target=self._run, daemon=True, name="hedge-monitor")
+        self._thread.start()
+        self._mark(list(self._pairs))  # check whatever is already open
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+
+    def summary_line(self):
+        s = self.stats
+        mode = f"{self.mode}{', dry run' if self.dry_run else ''}"
+        return (f"{len(self._pairs)} pairs watched ({mode}) | {s['corrections']} corrections | "
+                f"{s['failed']} failed | {s['skipped_min_size']} below min size | "
+                f"{s['skipped_stale']} skipped on a stale book | {len(self._pending)} in flight")
+
+
+def start_hedge_monitor(store, book, config):
+    """Build a monitor from the `hedge_monitor` config section and start it."""
+    return HedgeMonitor(
+        store, book,
+        threshold_usd=config.get("threshold_usd", DEFAULT_THRESHOLD_USD),
+        threshold_pct=config.get("threshold_pct", DEFAULT_THRESHOLD_PCT),
+        mode=config.get("mode", MODE_REDUCE),
+        cooldown=config.get("cooldown", DEFAULT_COOLDOWN),
+        slippage=config.get("slippage", DEFAULT_SLIPPAGE),
+        dry_run=config.get("dry_run", False),
+        max_book_age=config.get("max_book_age", DEFAULT_MAX_BOOK_AGE),
+    ).start()
@@ -0,0 +1,151 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_governor import GOVERNOR
+from instrumentation import record, is_enabled
+
+# Shared keep-alive HTTP transport. Every host gets one adapter (and so one
+# urllib3 connection pool) that is mounted on our own sessions and on the SDK
+# sessions inside pybit's HTTP and the HL Info/Exchange clients, so all three
+# modules reuse the same warm TLS connections. Every attempt is first admitted
+# by the rate governor, which may block it or raise RequestDeferred.
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+POOL_MAXSIZE = 16
+
+MAX_READ_RETRIES = 2
+RETRY_BASE_DELAY = 0.25  # seconds, doubled per attempt and jittered
+RETRY_STATUS = {500, 502, 503, 504}  # 429s go back to the caller, which owns the backoff
+
+# POSTs that only read state and are therefore safe to retry
+IDEMPOTENT_POST_PATHS = {"/info"}
+
+
+class TransportAdapter(HTTPAdapter):
+    def __init__(self, host, **kwargs):
+        self.host = host
+        self.stats = {"requests": 0, "errors": 0, "retries": 0}
+        self._stats_lock = threading.Lock()
+        self._pools = set()
+        super().__init__(pool_connections=1, pool_maxsize=POOL_MAXSIZE, **kwargs)
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _is_idempotent(self, request):
+        if request.method in ("GET", "HEAD", "OPTIONS"):
+            return True
+        return request.method == "POST" and urlparse(request.url).path in IDEMPOTENT_POST_PATHS
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+        attempts = 1 + (MAX_READ_RETRIES if self._is_idempotent(request) else 0)
+
+        for attempt in range(attempts):
+            GOVERNOR.admit(request)
+            self._count("requests")
+            started = time.perf_counter()
+            try:
+                response = super().send(request, timeout=timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._count("errors")
+                self._record(request, started, True)
+                if attempt == attempts - 1:
+                    raise
+            else:
+                self._record(request, started, response.status_code >= 400)
+                GOVERNOR.observe(request, response)
+                if response.status_code not in RETRY_STATUS or attempt == attempts - 1:
+                    return response
+                self._count("errors")
+                response.close()
+            self._count("retries")
+            time.sleep(RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def _record(self, request, started, error):
+        # Per-endpoint latency next to the per-function wrapper timings
+        if is_enabled():
+            name = f"{request.method} {urlparse(request.url).path}"
+            record(self.host, name, (time.perf_counter() - started) * 1000, error)
+
+    def _track_pool(self, pool):
+        with self._stats_lock:
+            self._pools.add(pool)
+        return pool
+
+    def get_connection_with_tls_context(self, *args, **kwargs):
+        return self._track_pool(super().get_connection_with_tls_context(*args, **kwargs))
+
+    def get_connection(self, *args, **kwargs):
+        return self._track_pool(super().get_connection(*args, **kwargs))
+
+    def connection_stats(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+            pools = list(self._pools)
+        opened = sum(pool.num_connections for pool in pools)
+        served = sum(pool.num_requests for pool in pools)
+        stats["connections_opened"] = opened
+        stats["connections_reused"] = max(0, served - opened)
+        return stats
+
+
+_adapters = {}
+_sessions = {}
+_registry_lock = threading.Lock()
+
+
+def get_adapter(host):
+    with _registry_lock:
+        adapter = _adapters.get(host)
+        if adapter is None:
+            adapter = _adapters[host] = TransportAdapter(host)
+        return adapter
+
+
+def mount_transport(session, host):
+    """Route a session's requests to `host` through the shared pooled adapter."""
+    adapter = get_adapter(host)
+    session.mount(f"https://{host}", adapter)
+    session.mount(f"http://{host}", adapter)
+    return session
+
+
+def get_session(host):
+    """Shared keep-alive session for `host`."""
+    with _registry_lock:
+        session = _sessions.get(host)
+    if session is None:
+        session = mount_transport(requests.Session(), host)
+        with _registry_lock:
+            session = _sessions.setdefault(host, session)
+    return session
+
+
+def host_of(url):
+    return urlparse(url).netloc
+
+
+def transport_stats():
+    with _registry_lock:
+        adapters = dict(_adapters)
+    return {host: adapter.connection_stats() for host, adapter in adapters.items()}
+
+
+def print_transport_stats():
+    stats = transport_stats()
+    if not stats:
+        print("📭 No HTTP traffic yet.")
+        return
+    print(f"\n🔌 {'Host':<28}| {'Requests':>8} | {'Opened':>6} | {'Reused':>6} | {'Errors':>6} | {'Retries':>7}")
+    print("-" * 80)
+    for host, s in sorted(stats.items()):
+        print(f"   {host:<28}| {s['requests']:>8} | {s['connections_opened']:>6} | {s['connections_reused']:>6} | "
+              f"{s['errors']:>6} | {s['retries']:>7}")
@@ -1,8 +1,13 @@
-from hyperliquid.info import Info
-from hyperliquid.exchange import Exchange
 from hyperliquid.utils import constants
-from eth_account import Account
 import json
+from http_transport import get_session, mount_transport, host_of
+from rate_governor import GOVERNOR, VENUE_HL, RequestDeferred
+from instrumentation import instrument_module
+from lazy_client import LazyClient, resolve
+from single_flight import begin_refresh, end_refresh
+import sys
+import threading
+import time
 
 # Load config
 import os
@@ -13,30 +18,112 @@ with open(config_path, "r") as f:
 ACCOUNT_ADDRESS = config["account_address"]
 SECRET_KEY = config["secret_key"]
 
-# Init wallet
-wallet = Account.from_key(SECRET_KEY)
+HL_HOST = host_of(constants.MAINNET_API_URL)
+HL_INFO_URL = constants.MAINNET_API_URL + "/info"
+hl_http = get_session(HL_HOST)
+GOVERNOR.register_host(HL_HOST, VENUE_HL)
+
+# === 🗂️ Meta snapshot
+# Info() and Exchange() fetch meta and spotMeta themselves when none is passed.
+# A copy kept on disk lets both clients be built without those round trips.
+META_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "hl_meta.json")
+META_CACHE_TTL = float(config.get("meta_cache_ttl", 6 * 60 * 60))  # seconds
+
+_meta_snapshot = None
+_meta_lock = threading.Lock()
+
+
+def _post_info(body):
+    response = hl_http.post(url=HL_INFO_URL, json=body, headers={"Content-Type": "application/json"})
+    response.raise_for_status()
+    return response.json()
+
+
+def load_meta_snapshot(force=False):
+    """
+    Return (meta, spot_meta) from memory or disk, refetching both when the
+    copy is missing or older than META_CACHE_TTL. A stale copy is kept if the
+    refetch fails; (None, None) means the SDK has to fetch them itself.
+    """
+    global _meta_snapshot
+    with _meta_lock:
+        if _meta_snapshot is not None and not force:
+            return _meta_snapshot["meta"], _meta_snapshot["spot_meta"]
+
+        cached = None
+        try:
+            with open(META_CACHE_PATH, "r") as f:
+                cached = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        if cached and not force and time.time() - cached.get("fetched_at", 0) < META_CACHE_TTL:
+            _meta_snapshot = cached
+            return cached["meta"], cached["spot_meta"]
+
+        try:
+            snapshot = {"fetched_at": time.time(), "meta": _post_info({"type": "meta"}),
+                        "spot_meta": _post_info({"type": "spotMeta"})}
+            os.makedirs(os.path.dirname(META_CACHE_PATH), exist_ok=True)
+            with open(META_CACHE_PATH + ".tmp", "w") as f:
+                json.dump(snapshot, f)
+            os.replace(META_CACHE_PATH + ".tmp", META_CACHE_PATH)
+        except Exception as e:
+            print(f"⚠️ Failed to refresh HL meta snapshot: {e}")
+            snapshot = cached
+        _meta_snapshot = snapshot
+        return (snapshot["meta"], snapshot["spot_meta"]) if snapshot else (None, None)
+
+
+# === 🔌 Clients
+# Built on first use (see lazy_client); importing this module touches neither
+# the SDK nor the network.
+def _build_wallet(secret_key=None):
+    from eth_account import Account
+    return Account.from_key(secret_key or SECRET_KEY)
+
+def _build_info():
+    from hyperliquid.info import Info
+    meta, spot_meta = load_meta_snapshot()
+    client = Info(constants.MAINNET_API_URL, skip_ws=True, meta=meta, spot_meta=spot_meta)
+    # Route the SDK session through the shared keep-alive pool
+    mount_transport(client.session, HL_HOST)
+    return client
 
-# Init clients (✅ CORRECT ORDER: wallet first, then URL)
-exchange = Exchange(
-    wallet,
-    constants.MAINNET_API_URL,
-    account_address=ACCOUNT_ADDRESS
-)
+def _build_exchange(signer=None, account_address=None):
+    from hyperliquid.exchange import Exchange
+    meta, spot_meta = load_meta_snapshot()
+    client = Exchange(
+        resolve(signer if signer is not None else wallet),
+        constants.MAINNET_API_URL,
+        meta=meta,
+        spot_meta=spot_meta,
+        account_address=account_address or ACCOUNT_ADDRESS
+    )
+    mount_transport(client.session, HL_HOST)
+    mount_transport(client.info.session, HL_HOST)
+    return client
 
-info = exchange.info  # already initialized inside Exchange class
+wallet = LazyClient("hl.wallet", _build_wallet)
+info = LazyClient("hl.info", _build_info)
+exchange = LazyClient("hl.exchange", _build_exchange)
 
 # === 📊 Account Info ===
-def get_account_summary():
-    return info.user_state(ACCOUNT_ADDRESS)
+# address / client default to the config.json account; HyperliquidAccount
+# passes its own so sub-account calls are timed like the rest.
+def get_account_summary(address=None):
+    return info.user_state(address or ACCOUNT_ADDRESS)
 
-def get_open_orders():
-    return info.open_orders(ACCOUNT_ADDRESS)
+def get_open_orders(address=None):
+    return info.open_orders(address or ACCOUNT_ADDRESS)
 
 def get_user_fills():
     return info.user_fills(ACCOUNT_ADDRESS)
 
 def get_user_rate_limit():
-    return info.user_rate_limit(ACCOUNT_ADDRESS)
+    # Also feeds the governor's address-based action budget
+    data = info.user_rate_limit(ACCOUNT_ADDRESS)
+    GOVERNOR.update_hl_user_limit(data)
+    return data
 
 # === 📈 Limit Order
 def place_limit_order(
@@ -69,17 +156,52 @@ def place_market_order_hl(
     slippage: float = 0.01,
     reduce_only: bool = False,
     cloid: str = None,
-    builder: dict = None
+    builder: dict = None,
+    px: float = None,
+    client=None
 ):
-    return exchange.market_open(
+    # Passing px skips the SDK's own allMids round-trip before the order
+    return (exchange if client is None else client).market_open(
         name=asset,
         is_buy=is_buy,
         sz=size,
+        px=px,
         slippage=slippage,
         cloid=cloid,
         builder=builder
     )
 
+# === 🔻 Market Close
+def close_market_order_hl(asset: str, size: float = None, px: float = None, slippage: float = 0.01, client=None):
+    return (exchange if client is None else client).market_close(coin=asset, sz=size, px=px, slippage=slippage)
+
+# === 📦 Bulk Orders
+def market_order_request(asset: str, is_buy: bool, size: float, px: float, slippage: float = 0.01,
+                         reduce_only: bool = False):
+    # An aggressive IOC limit, priced the way the SDK prices market orders
+    return {
+        "coin": asset,
+        "is_buy": is_buy,
+        "sz": size,
+        "limit_px": exchange._slippage_price(asset, is_buy, slippage, px),
+        "order_type": {"limit": {"tif": "Ioc"}},
+        "reduce_only": reduce_only,
+    }
+
+def bulk_orders_hl(order_requests: list, client=None):
+    # One signed action for every order; statuses come back in request order
+    return (exchange if client is None else client).bulk_orders(order_requests)
+
+# === ⚙️ Leverage
+def _whole_leverage(leverage):
+    # HL only takes integers; truncating here would split a pair's leverage across venues
+    if leverage != int(leverage):
+        raise ValueError(f"HL leverage must be a whole number, got {leverage}")
+    return int(leverage)
+
+def set_leverage_hl(asset: str, leverage: int, is_cross: bool = True, client=None):
+    return (exchange if client is None else client).update_leverage(_whole_leverage(leverage), asset, is_cross=is_cross)
+
 # ✅ API Wallet Approval (not needed in this version if wallet is handled in constructor)
 def approve_api_wallet(api_wallet_address: str):
     return exchange.approve_agent(
@@ -93,13 +215,29 @@ def pretty_print(data):
     pprint.pprint(data)
 
 
-import requests
-import time
+# === 📡 Streaming store
+# market_stream.start_market_streams() attaches a MarketDataStore here; while it
+# is fresh, mids and HL funding are served from memory instead of REST.
+_stream_store = None
+
+def attach_stream_store(store):
+    global _stream_store
+    _stream_store = store
+
+def _fresh_stream_store():
+    store = _stream_store
+    return store if store is not None and store.is_fresh("hl") else None
 
 def get_all_mids():
+    store = _fresh_stream_store()
+    if store is not None:
+        return store.get_hl_mids()
+    return fetch_all_mids_rest()
+
+def fetch_all_mids_rest():
     try:
-        response = requests.post(
-            url="https://api.hyperliquid.xyz/info",
+        response = hl_http.post(
+            url=HL_INFO_URL,
             json={"type": "allMids"},
             headers={"Content-Type": "application/json"}
         )
@@ -108,34 +246,134 @@ def get_all_mids():
         else:
             print(f"⚠️ Failed to fetch mids: {response.status_code}")
             return {}
+    except RequestDeferred:
+        raise  # no data, not an empty answer; the caller decides
     except Exception as e:
         print(f"⚠️ Error fetching mids: {e}")
         return {}
 
-def get_predicted_funding(symbol):
+# === 🔮 Predicted funding snapshot
+# predictedFundings returns every asset on every venue, so fetch it once per
+# refresh epoch and index it by (symbol, venue) for O(1) lookups.
+PREDICTED_FUNDING_TTL = float(config.get("predicted_funding_ttl", 30))  # seconds
+PREDICTED_FUNDING_RETRY = 5  # seconds to wait before re-fetching after an error
+
+_funding_snapshot = {"index": {}, "fetched_at": 0.0, "expires_at": 0.0, "refreshing": None}
+_funding_lock = threading.Lock()
+
+
+def _index_predicted_fundings(data):
+    index = {}
+    next_funding_ms = None
+    for asset_entry in data:
+        coin = asset_entry[0].upper()
+        for venue, details in asset_entry[1]:
+            if not details:
+                continue
+            rate = float(details.get("fundingRate", 0)) * 100
+            next_ts = details.get("nextFundingTime", None)
+            if "fundingIntervalHours" in details:
+                interval_h = float(details["fundingIntervalHours"])
+            else:
+                interval_ms = details.get("fundingIntervalMs", 3600000)  # usually 1h
+                interval_h = round(interval_ms / (1000 * 60 * 60), 2)
+            index[(coin, venue)] = (rate, next_ts, interval_h)
+
+            if venue == "HlPerp" and next_ts and (next_funding_ms is None or next_ts < next_funding_ms):
+                next_funding_ms = next_ts
+    return index, next_funding_ms
+
+
+def invalidate_predicted_funding_cache():
+    with _funding_lock:
+        _funding_snapshot["expires_at"] = 0.0
+
+
+def get_predicted_fundings_snapshot(force=False):
+    """
+    Return the {(SYMBOL, venue): (rate %, next funding ms, interval h)} index,
+    re-fetching only when the TTL lapsed or the next HL funding time passed.
+    """
+    index, done = begin_refresh(_funding_snapshot, _funding_lock, force)
+    if done is None:
+        return index
+
+    now = time.time()
     try:
-        payload = {"type": "predictedFundings"}
-        response = requests.post(
-            url="https://api.hyperliquid.xyz/info",
-            json=payload,
+        response = hl_http.post(
+            url=HL_INFO_URL,
+            json={"type": "predictedFundings"},
             headers={"Content-Type": "application/json"}
         )
         if response.status_code != 200:
-            return 0.0, None, 1.0  # default to 1h if error
-
-        data = response.json()
-        for asset_entry in data:
-            if asset_entry[0].upper() == symbol.upper():
-                for venue, details in asset_entry[1]:
-                    if venue == "HlPerp":
-                        rate = float(details.get("fundingRate", 0)) * 100
-                        next_ts = details.get("nextFundingTime", None)
-                        interval_ms = details.get("fundingIntervalMs", 3600000)  # usually 1h
+            print(f"⚠️ Failed to fetch HL predicted fundings: {response.status_code}")
+            return end_refresh(_funding_snapshot, _funding_lock, done, None, now, now + PREDICTED_FUNDING_RETRY)
 
-                        interval_h = round(interval_ms / (1000 * 60 * 60), 2)
-                        return rate, next_ts, interval_h
-
-        return 0.0, None, 1.0
+        index, next_funding_ms = _index_predicted_fundings(response.json())
+    except RequestDeferred as e:
+        return end_refresh(_funding_snapshot, _funding_lock, done, None, now, now + e.retry_in)
     except Exception as e:
         print(f"⚠️ Failed to fetch HL funding: {e}")
-        return 0.0, None, 1.0
+        return end_refresh(_funding_snapshot, _funding_lock, done, None, now, now + PREDICTED_FUNDING_RETRY)
+
+    expires_at = now + PREDICTED_FUNDING_TTL
+    if next_funding_ms and now < next_funding_ms / 1000 < expires_at:
+        expires_at = next_funding_ms / 1000  # rates reset at the funding boundary
+    return end_refresh(_funding_snapshot, _funding_lock, done, index, now, expires_at)
+
+def get_predicted_funding(symbol, venue="HlPerp"):
+    store = _fresh_stream_store()
+    if store is not None and venue == "HlPerp":
+        ctx = store.get_hl_ctx(symbol)
+        if ctx and ctx.get("funding") is not None:
+            next_ts = (int(time.time() // 3600) + 1) * 3600 * 1000  # HL funds on the hour
+            return float(ctx["funding"]) * 100, next_ts, 1.0
+
+    entry = get_predicted_fundings_snapshot().get((symbol.upper(), venue))
+    if entry is None:
+        return 0.0, None, 1.0  # default to 1h if missing
+    return entry
+
+
+# === 👥 Accounts
+# One object per HL wallet or sub-account. The module-level functions above
+# are the account from config.json; info, mids, funding and meta are shared,
+# so only user state and signing are per account.
+class HyperliquidAccount:
+    def __init__(self, name, account_address, secret_key=None):
+        """secret_key may be left out for an account that is only watched."""
+        self.name = name
+        self.account_address = account_address
+        self.wallet = LazyClient(f"hl.wallet[{name}]", lambda: _build_wallet(self._require_key(secret_key)))
+        self.exchange = LazyClient(f"hl.exchange[{name}]", lambda: _build_exchange(self.wallet, account_address))
+
+    def _require_key(self, secret_key):
+        if not secret_key:
+            raise ValueError(f"HL account '{self.name}' has no secret_key; it can only be watched")
+        return secret_key
+
+    # Through the module functions, which are the ones instrument_module times
+    def get_account_summary(self):
+        return get_account_summary(self.account_address)
+
+    def get_open_orders(self):
+        return get_open_orders(self.account_address)
+
+    def place_market_order(self, asset, is_buy, size, slippage=0.01, px=None):
+        return place_market_order_hl(asset, is_buy, size, slippage=slippage, px=px, client=self.exchange)
+
+    def close_market_order(self, asset, size=None, px=None, slippage=0.01):
+        return close_market_order_hl(asset, size=size, px=px, slippage=slippage, client=self.exchange)
+
+    def bulk_orders(self, order_requests):
+        return bulk_orders_hl(order_requests, client=self.exchange)
+
+    def set_leverage(self, asset, leverage, is_cross=True):
+        return set_leverage_hl(asset, leverage, is_cross=is_cross, client=self.exchange)
+
+
+# === ⏱️ Instrumentation
+# Time every public wrapper function; must stay at the bottom of the module
+instrument_module(sys.modules[__name__], VENUE_HL,
+                  skip=("pretty_print", "attach_stream_store", "invalidate_predicted_funding_cache",
+                        "market_order_request"))
@@ -0,0 +1,225 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+
+from hyperliquid_local.sdk_wrapper import info
+from bybit_local.sdk_wrapper_bybit import get_instruments_table, safe_float
+
+# Registry of tradable contracts on both venues, loaded once and persisted to
+# disk so sizing and symbol resolution never hit the network on the trade path.
+REGISTRY_PATH = os.path.join(os.path.dirname(__file__), ".cache", "instrument_registry.json")
+REGISTRY_MAX_AGE = 6 * 60 * 60  # seconds before the on-disk copy is rebuilt
+
+_registry = None
+_registry_lock = threading.Lock()
+
+# HL prefixes 1000x contracts with "k" (kPEPE); Bybit puts the multiplier in
+# front of or behind the base coin (1000PEPEUSDT, SHIB1000USDT).
+_HL_MULT_RE = re.compile(r"^k([A-Z0-9]+)$")
+_BYBIT_PREFIX_RE = re.compile(r"^(10{2,})([A-Z][A-Z0-9]*)$")
+_BYBIT_SUFFIX_RE = re.compile(r"^([A-Z][A-Z0-9]*?)(10{2,})$")
+
+
+def _split_hl_coin(coin):
+    match = _HL_MULT_RE.match(coin)
+    if match:
+        return match.group(1), 1000
+    return coin.upper(), 1
+
+
+def _split_bybit_base(base_coin):
+    match = _BYBIT_PREFIX_RE.match(base_coin)
+    if match:
+        return match.group(2), int(match.group(1))
+    match = _BYBIT_SUFFIX_RE.match(base_coin)
+    if match:
+        return match.group(1), int(match.group(2))
+    return base_coin, 1
+
+
+def _step_precision(step):
+    return abs(int(round(-1 * math.log10(step)))) if 0 < step < 1 else 0
+
+
+def build_registry(hl_meta=None, instruments=None):
+    """
+    Fetch HL meta and the Bybit instruments table and index them into plain
+    dicts: HL asset ids / szDecimals, Bybit lot sizes / funding intervals and
+    the canonical HL coin <-> Bybit symbol mapping. Either source can be
+    passed in instead of fetched.
+    """
+    if hl_meta is None:
+        hl_meta = info.meta()
+    if instruments is None:
+        instruments = get_instruments_table()
+
+    hl = {}
+    for asset_id, asset in enumerate(hl_meta.get("universe", [])):
+        hl[asset["name"]] = {
+            "asset_id": asset_id,
+            "sz_decimals": asset.get("szDecimals", 5),
+            "max_leverage": asset.get("maxLeverage"),
+        }
+
+    bybit = {}
+    for symbol, item in instruments.items():
+        if item.get("quoteCoin") != "USDT" or item.get("contractType") != "LinearPerpetual":
+            continue
+        lot = item.get("lotSizeFilter", {})
+        step = safe_float(lot.get("qtyStep"), 0.01)
+        bybit[symbol] = {
+            "base_coin": item.get("baseCoin", symbol[:-4]),
+            "min_qty": safe_float(lot.get("minOrderQty"), 0.01),
+            "qty_step": step,
+            "precision": _step_precision(step),
+            "funding_interval_h": round(safe_float(item.get("fundingInterval"), 60) / 60, 2),
+        }
+
+    by_underlying = {}
+    for symbol, record in bybit.items():
+        underlying, mult = _split_bybit_base(record["base_coin"])
+        by_underlying.setdefault(underlying, {})[mult] = symbol
+
+    hl_to_bybit = {}
+    for coin in hl:
+        underlying, hl_mult = _split_hl_coin(coin)
+        candidates = by_underlying.get(underlying)
+        if candidates:
+            # Prefer the contract with the same multiplier so quantities match 1:1
+            by_mult = hl_mult if hl_mult in candidates else min(candidates)
+            symbol = candidates[by_mult]
+            # Bybit qty per one unit of HL size (kPEPE vs 1000PEPEUSDT -> 1.0)
+            hl_to_bybit[coin] = {"symbol": symbol, "qty_ratio": hl_mult / by_mult}
+
+    return {
+        "built_at": time.time(),
+        "hl": hl,
+        "bybit": bybit,
+        "hl_to_bybit": hl_to_bybit,
+        "bybit_to_hl": {m["symbol"]: coin for coin, m in hl_to_bybit.items()},
+    }
+
+
+def _read_registry_file():
+    try:
+        with open(REGISTRY_PATH, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_registry_file(registry):
+    os.makedirs(os.path.dirname(REGISTRY_PATH), exist_ok=True)
+    tmp_path = REGISTRY_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(registry, f)
+    os.replace(tmp_path, REGISTRY_PATH)
+
+
+def load_registry(force=False):
+    """
+    Return the in-memory registry, loading it from disk or rebuilding it when
+    the file is missing or older than REGISTRY_MAX_AGE. A stale copy is kept
+    if the rebuild fails.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is not None and not force:
+            return _registry
+
+        cached = None if force else _read_registry_file()
+        if cached and time.time() - cached.get("built_at", 0) < REGISTRY_MAX_AGE:
+            _registry = cached
+            return _registry
+
+        try:
+            _registry = build_registry()
+            _write_registry_file(_registry)
+        except Exception as e:
+            print(f"⚠️ Failed to rebuild instrument registry: {e}")
+            _registry = cached or _registry or {"built_at": 0, "hl": {}, "bybit": {}, "hl_to_bybit": {}, "bybit_to_hl": {}}
+        return _registry
+
+
+def use_registry(registry):
+    """Serve lookups from `registry` without touching the on-disk copy; returns the previous one."""
+    global _registry
+    with _registry_lock:
+        previous, _registry = _registry, registry
+        return previous
+
+
+def refresh_if_stale():
+    registry = load_registry()
+    if time.time() - registry.get("built_at", 0) >= REGISTRY_MAX_AGE:
+        load_registry(force=True)
+
+
+# === 🔎 Lookups
+def resolve_hl_coin(symbol):
+    """Map user input (PEPE, kPEPE, 1000PEPE, 1000PEPEUSDT) to the HL coin name."""
+    registry = load_registry()
+    raw = symbol.strip()
+    if raw in registry["hl"]:
+        return raw
+    upper = raw.upper()
+    if upper in registry["hl"]:
+        return upper
+    bybit_symbol = upper if upper.endswith("USDT") else f"{upper}USDT"
+    if bybit_symbol in registry["bybit_to_hl"]:
+        return registry["bybit_to_hl"][bybit_symbol]
+    if f"k{upper}" in registry["hl"]:
+        return f"k{upper}"
+    if upper.startswith("K") and f"k{upper[1:]}" in registry["hl"]:
+        return f"k{upper[1:]}"  # input was upper-cased (KPEPE)
+    return upper
+
+
+def bybit_symbol_for(hl_coin):
+    mapping = load_registry()["hl_to_bybit"].get(hl_coin)
+    if mapping:
+        return mapping["symbol"]
+    return hl_coin.upper() if hl_coin.upper().endswith("USDT") else f"{hl_coin.upper()}USDT"
+
+
+def hl_coin_for(bybit_symbol):
+    coin = load_registry()["bybit_to_hl"].get(bybit_symbol)
+    return coin if coin else bybit_symbol.replace("USDT", "")
+
+
+def bybit_qty_ratio(hl_coin):
+    mapping = load_registry()["hl_to_bybit"].get(hl_coin)
+    return mapping["qty_ratio"] if mapping else 1.0
+
+
+def hl_asset(coin):
+    return load_registry()["hl"].get(coin)
+
+
+def hl_asset_id(coin):
+    asset = hl_asset(coin)
+    return asset["asset_id"] if asset else None
+
+
+def hl_sz_decimals(coin, default=5):
+    asset = hl_asset(coin)
+    return asset["sz_decimals"] if asset else default
+
+
+def bybit_instrument(symbol):
+    return load_registry()["bybit"].get(symbol)
+
+
+def bybit_precision(symbol):
+    item = bybit_instrument(symbol)
+    if item is None:
+        return 0.01, 0.01, 2
+    return item["min_qty"], item["qty_step"], item["precision"]
+
+
+def bybit_funding_interval(symbol, default=None):
+    item = bybit_instrument(symbol)
+    return item["funding_interval_h"] if item else default
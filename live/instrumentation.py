@@ -0,0 +1,139 @@
+import bisect
+import functools
+import inspect
+import threading
+import time
+
+# Call counts, error counts and latency histograms per (venue, function). The
+# exchange wrappers instrument their own public functions at import time, so
+# every caller - including `from ... import *` - gets the timed versions. When
+# disabled, a wrapped call costs one flag check on top of the original call.
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300, 500, 750,
+                      1000, 1500, 2000, 3000, 5000, 10000, 30000)
+
+_state = {"enabled": True}
+_histograms = {}
+_lock = threading.Lock()
+
+
+def set_enabled(enabled):
+    _state["enabled"] = bool(enabled)
+
+
+def is_enabled():
+    return _state["enabled"]
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)  # last bucket is overflow
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = 0.0
+
+    def add(self, ms, error):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.calls += 1
+        self.errors += error
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q):
+        """Estimate the q-th percentile (0-100), interpolating inside its bucket."""
+        if self.calls == 0:
+            return 0.0
+        rank = q / 100 * self.calls
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS_MS[i - 1] if i > 0 else 0.0
+                upper = LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+                lower, upper = max(lower, self.min_ms), min(upper, self.max_ms)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max_ms
+
+    def summary(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "mean_ms": self.total_ms / self.calls if self.calls else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+        }
+
+
+def record(venue, name, ms, error=False):
+    key = (venue, name)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = LatencyHistogram()
+        histogram.add(ms, error)
+
+
+def _failed(result):
+    # The wrappers report most failures in-band rather than raising
+    if isinstance(result, dict):
+        ret_code = result.get("retCode")
+        return (ret_code is not None and ret_code != 0) or result.get("status") == "err"
+    return False
+
+
+def timed(venue, fn, name=None):
+    name = name or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _state["enabled"]:
+            return fn(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            record(venue, name, (time.perf_counter() - started) * 1000, True)
+            raise
+        record(venue, name, (time.perf_counter() - started) * 1000, _failed(result))
+        return result
+
+    wrapper.__wrapped_timed__ = True
+    return wrapper
+
+
+def instrument_module(module, venue, skip=()):
+    """Replace every public function defined in `module` with a timed version."""
+    for name, fn in list(vars(module).items()):
+        if name.startswith("_") or name in skip or not inspect.isfunction(fn):
+            continue
+        if fn.__module__ != module.__name__ or getattr(fn, "__wrapped_timed__", False):
+            continue
+        setattr(module, name, timed(venue, fn))
+
+
+def latency_stats():
+    with _lock:
+        items = list(_histograms.items())
+        return {key: histogram.summary() for key, histogram in items}
+
+
+def reset_stats():
+    with _lock:
+        _histograms.clear()
+
+
+def print_latency_stats():
+    stats = latency_stats()
+    if not stats:
+        state = "" if is_enabled() else " (instrumentation is disabled)"
+        print(f"📭 No calls recorded yet{state}.")
+        return
+    print(f"\n⏱️ {'Venue':<24}| {'Function':<34}| {'Calls':>6} | {'Errors':>6} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'Max ms':>8}")
+    print("-" * 124)
+    for (venue, name), s in sorted(stats.items(), key=lambda item: (item[0][0], -item[1]["calls"] * item[1]["mean_ms"])):
+        print(f"   {venue:<24}| {name:<34}| {s['calls']:>6} | {s['errors']:>6} | {s['p50_ms']:>8.1f} | "
+              f"{s['p95_ms']:>8.1f} | {s['p99_ms']:>8.1f} | {s['max_ms']:>8.1f}")
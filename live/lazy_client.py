@@ -0,0 +1,54 @@
+import threading
+import time
+
+# Exchange clients built on first use. The SDK imports, key derivation and
+# meta fetches behind a client cost about a second, so the wrappers expose a
+# LazyClient in their place: module-level names stay valid for every
+# `from ... import exchange` and for the paper / bench swaps, and the real
+# object is constructed the first time anything reads an attribute of it.
+_build_times = {}  # client name -> seconds its factory took
+
+
+class LazyClient:
+    __slots__ = ("_lazy_name", "_lazy_factory", "_lazy_client", "_lazy_lock")
+
+    def __init__(self, name, factory):
+        object.__setattr__(self, "_lazy_name", name)
+        object.__setattr__(self, "_lazy_factory", factory)
+        object.__setattr__(self, "_lazy_client", None)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+
+    def resolve(self):
+        client = self._lazy_client
+        if client is None:
+            with self._lazy_lock:
+                client = self._lazy_client
+                if client is None:
+                    started = time.perf_counter()
+                    client = self._lazy_factory()
+                    _build_times[self._lazy_name] = time.perf_counter() - started
+                    object.__setattr__(self, "_lazy_client", client)
+        return client
+
+    @property
+    def loaded(self):
+        return self._lazy_client is not None
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.resolve(), name, value)
+
+    def __repr__(self):
+        state = repr(self._lazy_client) if self._lazy_client is not None else "not built yet"
+        return f"<LazyClient {self._lazy_name}: {state}>"
+
+
+def resolve(client):
+    """The real object behind a LazyClient; anything else is returned as is."""
+    return client.resolve() if isinstance(client, LazyClient) else client
+
+
+def build_times():
+    return dict(_build_times)
@@ -2,213 +2,242 @@ import time
 import threading
 import sys
 import os
-import pandas as pd
-import numpy as np
+import math
 from hyperliquid_local.sdk_wrapper import *
 from bybit_local.sdk_wrapper_bybit import *
-import requests
+from instrument_registry import (
+    load_registry, refresh_if_stale, resolve_hl_coin, bybit_symbol_for, hl_coin_for, bybit_funding_interval,
+)
+from execution import prepare_pair_trade, apply_leverage, execute_pair_trade, print_execution_report
+from basket import (
+    parse_basket, prepare_basket, apply_basket_leverage, open_basket, close_all,
+    print_open_report, print_close_report,
+)
+from market_stream import start_market_streams
+from coinalyze_client import CoinalyzeClient, CALLS_PER_MINUTE
+from account_stream import start_account_streams
+from hedge_monitor import start_hedge_monitor
+from accounts import load_accounts, account_calls
+from lazy_client import resolve as resolve_client, build_times as client_build_times
+from rate_governor import GOVERNOR, PRIORITY_BACKGROUND, priority, with_priority
+from terminal_ui import SnapshotFeed, TerminalScreen, CLEAR_SCREEN
+from status_daemon import StatusServer, DEFAULT_HOST, DEFAULT_PORT
+from http_transport import transport_stats, print_transport_stats
+from instrumentation import set_enabled as set_instrumentation_enabled, latency_stats, print_latency_stats
+import argparse
 import json
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from datetime import datetime, timedelta
+from types import MappingProxyType
 
 # Initialize global variables
 open_positions_list = []
 WATCHED_TOKENS = set()  # Set to store tokens being watched
 
-# Load configuration
-def load_config():
+# Load configuration: $TRADER_CONFIG, else ./config.json, else the one at the repo root
+def config_path():
+    path = os.environ.get("TRADER_CONFIG")
+    if path:
+        return path
+    if os.path.exists("config.json"):
+        return "config.json"
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+
+def load_config(path=None):
+    path = path or config_path()
     try:
-        with open('config.json', 'r') as f:
+        with open(path, 'r') as f:
             return json.load(f)
     except FileNotFoundError:
-        print("⚠️ config.json not found. Please create it with your API keys.")
+        print(f"⚠️ {path} not found. Please create it with your API keys.")
         sys.exit(1)
     except json.JSONDecodeError:
-        print("⚠️ Error reading config.json. Please ensure it's valid JSON.")
+        print(f"⚠️ Error reading {path}. Please ensure it's valid JSON.")
         sys.exit(1)
 
 CONFIG = load_config()
 COINALYZE_API_KEY = CONFIG.get('coinalyze', {}).get('api_key')
+COINALYZE = CoinalyzeClient(COINALYZE_API_KEY, CONFIG.get('coinalyze', {}).get('calls_per_minute', CALLS_PER_MINUTE))
+CONCURRENT_LEGS = CONFIG.get('execution', {}).get('concurrent_legs', True)
+STREAMS_ENABLED = CONFIG.get('streams', {}).get('enabled', True)
+PRIVATE_STREAMS_ENABLED = CONFIG.get('streams', {}).get('private', True)
+MARKET_STREAMS = None  # set by main() when WebSocket feeds are running
+ACCOUNT_STREAMS = None  # set by main() when private account feeds are running
+HEDGE_MONITOR_CONFIG = CONFIG.get('hedge_monitor', {})
+HEDGE_MONITOR = None  # set by main() when both feeds run and the monitor is enabled
+TUI_ENABLED = CONFIG.get('ui', {}).get('tui', True)
+STATUS_REFRESH_INTERVAL = CONFIG.get('ui', {}).get('refresh_interval', 200)  # seconds between REST status fetches
+STATUS_FEED = None  # set by start_tui()
+SCREEN = None
+DAEMON_CONFIG = CONFIG.get('daemon', {})
+SUB_ACCOUNTS = load_accounts(CONFIG.get('accounts', []))  # watched next to the main account; menus trade the main one
+MAIN_ACCOUNT_NAME = "main"
+BACKTEST_CONFIG = dict(CONFIG.get('backtest', {}))
+BACKTEST_DAYS = BACKTEST_CONFIG.pop('days', 90)
+SWEEP_GRID = CONFIG.get('sweep', {}).get('grid', {})  # overrides of funding_sweep.DEFAULT_GRID
+SWEEP_WORKERS = CONFIG.get('sweep', {}).get('workers')  # None = every core
+set_instrumentation_enabled(CONFIG.get('instrumentation', {}).get('enabled', True))
+
+HOURS_7D = 168
+HOURS_30D = 720
+
+HISTORY_OVERLAP = 2 * 60 * 60  # re-fetch the last bars so a late venue bar gets filled in
+
+
+# The numpy-backed modules (history store, statistics, scanner, backtest,
+# sweep, position book) are imported where they are first needed, so none of
+# them is on the path to the first prompt.
+def _history_start(token, start_time):
+    """First timestamp to fetch: the high-water mark, unless the window reaches further back than the store."""
+    from funding_store import history_range
+    first_ts, last_ts = history_range(token)
+    if first_ts is not None and first_ts <= start_time + 3600:
+        return max(start_time, last_ts - HISTORY_OVERLAP)
+    return start_time
+
+
+def sync_funding_histories(tokens, days=30):
+    """
+    Bring the on-disk hourly history of every token up to date with as few
+    Coinalyze requests as the API allows, fetching only bars newer than each
+    token's stored high-water mark.
+    """
+    from funding_store import merge_history
 
-def analyze_historical_data(token, days=30):
+    end_time = int(time.time())
+    start_time = end_time - (days * 24 * 60 * 60)
+    token_starts = {token: _history_start(token, start_time) for token in tokens}
+
+    for token, bars in COINALYZE.fetch_token_histories(token_starts, end_time).items():
+        if not bars:
+            continue
+        timestamps = sorted(bars)
+        merge_history(
+            token, timestamps,
+            [math.nan if bars[t][0] is None else bars[t][0] for t in timestamps],
+            [math.nan if bars[t][1] is None else bars[t][1] for t in timestamps],
+        )
+
+
+def sync_funding_history(token, days=30):
+    sync_funding_histories([token], days)
+
+
+def analyze_watched_tokens(tokens, days=30):
     """
-    Analyze historical funding rate data for a given token
-    Returns a dictionary with analysis results
+    Analyze historical funding for many tokens: one batched sync, then one
+    vectorized statistics pass over all of them.
+    Returns {token: analysis dict or None}.
     """
+    from funding_store import window as history_window
+    from funding_stats import stack_histories, window_stats, token_row
+
+    tokens = list(tokens)
+    if not tokens:
+        return {}
     try:
-        # Get current time and calculate start time
-        end_time = int(time.time())
-        start_time = end_time - (days * 24 * 60 * 60)
-        
-        # Fetch funding rate history
-        symbols = [f"{token}USDT.6", f"{token}.H"]
-        interval = "1hour"
-        
-        # Fetch data from Coinalyze API
-        BASE_URL = "https://api.coinalyze.net/v1/funding-rate-history"
-        
-        params = {
-            "symbols": ",".join(symbols),
-            "interval": interval,
-            "from": start_time,
-            "to": end_time,
-            "api_key": COINALYZE_API_KEY
-        }
-        
-        response = requests.get(BASE_URL, params=params)
-        data = response.json()
-        
-        if not data:
-            return None
-            
-        # Get current funding rates
-        by_rate, _, by_interval = get_funding_info(f"{token}USDT")
-        by_rate_hourly = by_rate / by_interval if by_interval else by_rate
-        
-        hl_rate, _, hl_interval = get_predicted_funding(token)
-        hl_rate_hourly = hl_rate / hl_interval if hl_interval else hl_rate
-        
-        # Process the data
-        funding_dict = {}
-        for entry in data:
-            symbol = entry.get('symbol', 'Unknown')
-            exchange = 'Bybit' if symbol.endswith('.6') else 'Hyperliquid'
-            history = entry.get('history', [])
-            
-            for record in history:
-                timestamp = record.get('t')
-                funding_rate = record.get('c')
-                
-                # Normalize Bybit funding rate to hourly
-                if exchange == 'Bybit':
-                    funding_rate = funding_rate / by_interval  # BYBIT_HOURLY_DIVISOR
-                    
-                if timestamp not in funding_dict:
-                    funding_dict[timestamp] = {}
-                    
-                funding_dict[timestamp][exchange] = {
-                    'symbol': symbol,
-                    'funding_rate': funding_rate
-                }
-        
-        # Convert to DataFrame
-        records = []
-        for timestamp, exchanges in sorted(funding_dict.items()):
-            if 'Bybit' in exchanges and 'Hyperliquid' in exchanges:
-                bybit_data = exchanges['Bybit']
-                hyper_data = exchanges['Hyperliquid']
-                
-                # Calculate which side is better to long
-                bybit_rate = bybit_data['funding_rate']
-                hyper_rate = hyper_data['funding_rate']
-                
-                # If Bybit rate is lower, long Bybit and short Hyperliquid
-                # If Hyperliquid rate is lower, long Hyperliquid and short Bybit
-                long_side = 'Bybit' if bybit_rate < hyper_rate else 'Hyperliquid'
-                arbitrage_rate = abs(bybit_rate - hyper_rate)
-                
-                records.append({
-                    'Date': datetime.utcfromtimestamp(timestamp),
-                    'Symbol1': bybit_data['symbol'],
-                    'Exchange1': 'Bybit',
-                    'FundingRate1': bybit_rate,
-                    'Symbol2': hyper_data['symbol'],
-                    'Exchange2': 'Hyperliquid',
-                    'FundingRate2': hyper_rate,
-                    'Long': long_side,
-                    'Arbitrage Rate': arbitrage_rate
-                })
-        
-        df = pd.DataFrame(records)
-        
-        # Calculate statistics
-        HOURS_7D = 168
-        HOURS_30D = 720
-        
-        # Calculate success rates and APR for each period
-        def calculate_period_stats(df_period):
-            # Filter out zero arbitrage opportunities
-            df_period = df_period[df_period['Arbitrage Rate'] > 0]
-            
-            if len(df_period) == 0:
-                return {
-                    'bybit_success': 0,
-                    'better_side': 'None',
-                    'better_apr': 0,
-                    'max_arb': 0,
-                    'min_arb': 0,
-                    'zero_rate_pct': 100
-                }
-            
-            bybit_long_count = (df_period['Long'] == 'Bybit').sum()
-            total_count = len(df_period)
-            bybit_success_rate = (bybit_long_count / total_count) * 100 if total_count > 0 else 0
-            
-            # Calculate total funding earned when longing each side
-            bybit_total_rate = df_period[df_period['Long'] == 'Bybit'].apply(
-                lambda x: x['FundingRate2'] - x['FundingRate1'], axis=1).sum()
-            hyper_total_rate = df_period[df_period['Long'] == 'Hyperliquid'].apply(
-                lambda x: x['FundingRate1'] - x['FundingRate2'], axis=1).sum()
-            
-            # Calculate APR based on the period length (7D or 30D)
-            period_days = min(7, len(df_period)/24)  # Actual number of days in the period
-            if len(df_period) > 168:  # If it's 30D period
-                period_days = min(30, len(df_period)/24)
-            
-            bybit_apr = (bybit_total_rate / period_days) * 365
-            hyper_apr = (hyper_total_rate / period_days) * 365
-            
-            # Determine which side is more profitable
-            better_side = 'Bybit' if bybit_apr > hyper_apr else 'Hyperliquid'
-            better_apr = max(bybit_apr, hyper_apr)
-            
-            # Calculate max and min arbitrage rates for the better side
-            if better_side == 'Bybit':
-                # When long Bybit, arbitrage rate is Hyperliquid rate - Bybit rate
-                arbitrage_rates = df_period.apply(lambda x: x['FundingRate2'] - x['FundingRate1'], axis=1)
-            else:
-                # When long Hyperliquid, arbitrage rate is Bybit rate - Hyperliquid rate
-                arbitrage_rates = df_period.apply(lambda x: x['FundingRate1'] - x['FundingRate2'], axis=1)
-            
-            max_arb = arbitrage_rates.max()
-            min_arb = arbitrage_rates.min()
-            
-            # Calculate percentage of days with zero arbitrage
-            total_days = HOURS_7D if len(df_period) <= HOURS_7D else HOURS_30D
-            zero_rate_pct = ((total_days - len(df_period)) / total_days) * 100
-            
-            return {
-                'bybit_success': bybit_success_rate,
-                'better_side': better_side,
-                'better_apr': better_apr,
-                'max_arb': max_arb,
-                'min_arb': min_arb,
-                'zero_rate_pct': zero_rate_pct
-            }
-        print(df.head(HOURS_7D))
-        stats_7d = calculate_period_stats(df.head(HOURS_7D))
-        stats_30d = calculate_period_stats(df.head(HOURS_30D))
-        
-        
-        return {
-            'success_rate_7d': stats_7d['bybit_success'],
+        sync_funding_histories(tokens, days)
+    except Exception as e:
+        print(f"⚠️ Using stored funding history: {e}")
+
+    end_time = int(time.time())
+    histories = [history_window(token, end_time - days * 24 * 60 * 60) for token in tokens]
+
+    # Current funding rates (served from the bulk snapshots)
+    current = []
+    for token in tokens:
+        hl_coin = resolve_hl_coin(token)
+        by_rate, _, by_interval = get_funding_info(bybit_symbol_for(hl_coin))
+        hl_rate, _, hl_interval = get_predicted_funding(hl_coin)
+        current.append((
+            by_rate / by_interval if by_interval else by_rate,
+            hl_rate / hl_interval if hl_interval else hl_rate,
+            by_interval,
+        ))
+
+    # Align onto the hourly grid (Bybit normalized to hourly) and run the
+    # trailing-window statistics for every token at once
+    bybit_hourly, hl_hourly = stack_histories(histories, end_time, days * 24, [c[2] for c in current])
+    stats = window_stats(bybit_hourly, hl_hourly, {"7d": HOURS_7D, "30d": HOURS_30D})
+
+    results = {}
+    for i, token in enumerate(tokens):
+        if len(histories[i]) == 0:
+            results[token] = None
+            continue
+        stats_7d = token_row(stats, "7d", i)
+        stats_30d = token_row(stats, "30d", i)
+        results[token] = {
+            'success_rate_7d': stats_7d['success'],
             'better_side_7d': stats_7d['better_side'],
             'apr_7d': stats_7d['better_apr'],
-            'success_rate_30d': stats_30d['bybit_success'],
+            'success_rate_30d': stats_30d['success'],
             'better_side_30d': stats_30d['better_side'],
             'apr_30d': stats_30d['better_apr'],
-            'max_arb_7d': stats_7d['max_arb'],
-            'min_arb_7d': stats_7d['min_arb'],
-            'max_arb_30d': stats_30d['max_arb'],
-            'min_arb_30d': stats_30d['min_arb'],
-            'current_bybit_rate': by_rate_hourly,
-            'current_hl_rate': hl_rate_hourly,
-            'zero_rate_pct_7d': stats_7d['zero_rate_pct']
+            'max_arb_7d': stats_7d['max_spread'],
+            'min_arb_7d': stats_7d['min_spread'],
+            'max_arb_30d': stats_30d['max_spread'],
+            'min_arb_30d': stats_30d['min_spread'],
+            'current_bybit_rate': current[i][0],
+            'current_hl_rate': current[i][1],
+            'zero_rate_pct_7d': stats_7d['zero_pct']
         }
-        
+    return results
+
+
+def analyze_historical_data(token, days=30):
+    """
+    Analyze historical funding rate data for a given token
+    Returns a dictionary with analysis results
+    """
+    try:
+        return analyze_watched_tokens([token], days)[token]
     except Exception as e:
         print(f"⚠️ Error analyzing historical data: {e}")
         return None
 
+def backtest_arrays(tokens, days=BACKTEST_DAYS):
+    """Sync the stored history of every token and align it into (bybit, hl) hourly arrays."""
+    from funding_store import window as history_window
+    from funding_stats import stack_histories
+
+    try:
+        sync_funding_histories(tokens, days)
+    except Exception as e:
+        print(f"⚠️ Using stored funding history: {e}")
+
+    end_time = int(time.time())
+    histories = [history_window(token, end_time - days * 24 * 60 * 60) for token in tokens]
+    intervals = [bybit_funding_interval(bybit_symbol_for(resolve_hl_coin(token)), 8.0) for token in tokens]
+    return stack_histories(histories, end_time, days * 24, intervals)
+
+
+def backtest_tokens(tokens, days=BACKTEST_DAYS, params=None):
+    """Backtest the spread trade over every token at once; params default to the `backtest` config."""
+    from funding_backtest import StrategyParams, backtest, print_backtest
+
+    params = params or StrategyParams(**BACKTEST_CONFIG)
+    tokens = list(tokens)
+    if not tokens:
+        print("📭 No tokens to backtest.")
+        return None
+    result = backtest(*backtest_arrays(tokens, days), params)
+    print_backtest(tokens, result, params)
+    return result
+
+
+def sweep_tokens(tokens, days=BACKTEST_DAYS, grid=None):
+    """Sweep strategy parameters over every token on all cores; returns results best first."""
+    from funding_sweep import DEFAULT_GRID, param_grid, run_sweep
+
+    tokens = list(tokens)
+    if not tokens:
+        print("📭 No tokens to sweep.")
+        return []
+    grid = grid or param_grid(**{**DEFAULT_GRID, **SWEEP_GRID})
+    return run_sweep(*backtest_arrays(tokens, days), grid, workers=SWEEP_WORKERS)
+
 def get_account_value():
     try:
         summary = get_account_summary()
@@ -225,37 +254,6 @@ def get_meta_and_ctxs():
         return {}, []
 
 
-def calculate_asset_size(symbol, mark_px, account_value, leverage, trade_usd):
-    trade_value = min(account_value * leverage, trade_usd)
-    raw_size = trade_value / mark_px if mark_px > 0 else 0.0
-
-    sz_decimals = 5
-    try:
-        meta, _ = get_meta_and_ctxs()
-        universe = meta.get("universe", [])
-        for asset in universe:
-            if asset.get("name") == symbol:
-                sz_decimals = asset.get("szDecimals", 5)
-                break
-    except:
-        pass
-
-    min_step = 10 ** (-sz_decimals)
-    size = math.floor(raw_size / min_step) * min_step
-    return round(size, sz_decimals) if size >= min_step else 0.0
-
-def resolve_asset_id(symbol):
-    symbol = symbol.upper()
-    try:
-        meta, _ = get_meta_and_ctxs()
-        universe = meta.get("universe", [])
-        for i, asset in enumerate(universe):
-            if asset.get("name") == symbol:
-                return i, symbol
-    except Exception as e:
-        print(f"⚠️ Error resolving asset ID: {e}")
-    return None, symbol
-
 def safe_float(val, default=0.0):
     try:
         return float(val or 0)
@@ -268,13 +266,25 @@ def get_safe_float(value):
     except (ValueError, TypeError):
         return 0.0
     
+# === 📒 Account state
+# Read from the private-stream book while it is live, REST otherwise.
+def current_hl_summary():
+    if ACCOUNT_STREAMS is not None:
+        return ACCOUNT_STREAMS.hl_summary()
+    return get_account_summary()
+
+def current_bybit_positions():
+    if ACCOUNT_STREAMS is not None:
+        return ACCOUNT_STREAMS.bybit_positions()
+    return get_positions()
+
 def close_position_menu():
     # Hyperliquid positions
-    hl_summary = get_account_summary()
+    hl_summary = current_hl_summary()
     hl_positions = hl_summary.get("assetPositions", [])
     
     # Bybit positions
-    bybit_positions_data = get_positions()
+    bybit_positions_data = current_bybit_positions()
     open_positions_list = []
     if bybit_positions_data.get("retCode") == 0:
         for idx, pos in enumerate(bybit_positions_data.get("result", {}).get("list", []), 1):
@@ -315,9 +325,12 @@ def close_position_menu():
 
     try:
         # Step 1: Ask user for which position to close
-        sel = input("\nEnter position number to close (or 'cancel'): ").strip().lower()
+        sel = input("\nEnter position number to close ('all' to flatten everything, or 'cancel'): ").strip().lower()
         if sel == "cancel":
             return
+        if sel == "all":
+            print_close_report(close_all(hl_summary, bybit_positions_data))
+            return
         idx = int(sel) - 1  # Convert to 0-indexed
 
         # Step 2: Close Hyperliquid position (if any)
@@ -355,17 +368,6 @@ def close_position_menu():
         print(f"⚠️ Error closing position: {e}")
 
 
-def calculate_qty(symbol, usd_value):
-    price = get_price(symbol)
-    print(price)
-    if price <= 0:
-        return 0.0
-
-    min_qty, step, precision = get_symbol_precision(symbol)
-    raw_qty = usd_value / price
-    rounded_qty = math.floor(raw_qty / step) * step
-    return round(max(rounded_qty, min_qty), precision)
-
 def place_trade_both_exchanges():
     # Step 1: Ask for the exchange(s) to trade on
     exchange_choice = input("Select exchange to long (1. Bybit, 2. Hyperliquid): ").strip()
@@ -374,10 +376,7 @@ def place_trade_both_exchanges():
         print("❌ Invalid exchange choice.")
         return
 
-    # Step 2: Ask for long/short and trade size
-    side = "long"
-    side_bybit = 'Buy'
-
+    # Step 2: Ask for trade size, leverage and symbol
     try:
         trade_usd = float(input("💵 Trade size in USD (e.g., 50): ").strip())
     except ValueError:
@@ -390,276 +389,450 @@ def place_trade_both_exchanges():
     except ValueError:
         leverage = 5
         print("⚠️ Invalid leverage. Using default = 5x.")
-    
 
-    if exchange_choice == '1':  # Bybit
-        # Ask for symbol
-        symbol_input = input("🔍 Symbol (e.g. BTC): ").strip().upper()
-        symbol_bybit = symbol_input if symbol_input.endswith("USDT") else f"{symbol_input}USDT"
+    symbol_input = input("🔍 Symbol (e.g. BTC): ").strip().upper()
+    hl_coin = resolve_hl_coin(symbol_input)
+    long_venue = "bybit" if exchange_choice == '1' else "hl"
 
-        leveraged_usd = trade_usd 
-        qty = calculate_qty(symbol_bybit, leveraged_usd)
-        
-        if qty <= 0:
-            print("❌ Invalid quantity, cannot proceed.")
-            return
+    # Step 3: Size both legs and set leverage before anything is sent
+    plan = prepare_pair_trade(hl_coin, long_venue, trade_usd, leverage)
+    if plan is None:
+        return
 
-        print(f"⚙️ Setting leverage {leverage}x for {symbol_bybit}...")
-        set_leverage(symbol_bybit, buy_leverage=leverage, sell_leverage=leverage)
+    long_label = "Bybit" if long_venue == "bybit" else "Hyperliquid"
+    short_label = "Hyperliquid" if long_venue == "bybit" else "Bybit"
+    print(f"⚙️ Setting leverage {plan['leverage']}x for {hl_coin} / {plan['symbol_bybit']}...")
+    apply_leverage(plan)
 
-        print(f"📤 Placing {side_bybit.upper()} order on {symbol_bybit} with quantity: {qty}")
-        result = place_market_order_bybit(symbol_bybit, side_bybit, qty)
-        pretty_print(result)
+    # Step 4: Fire both legs
+    print(f"📤 LONG {long_label} / SHORT {short_label}: HL {plan['hl_size']} {hl_coin}, "
+          f"Bybit {plan['bybit_qty']} {plan['symbol_bybit']}")
+    report = execute_pair_trade(plan, concurrent=CONCURRENT_LEGS)
+    print_execution_report(plan, report)
 
-        # If trading on Bybit, take opposite side (short if long on Bybit, long if short on Bybit) on Hyperliquid
-        opposite_side = 'short' if side == 'long' else 'long'
+def basket_menu():
+    text = input("🧺 Pairs as COIN:long_venue:usd[:leverage], comma-separated, or a JSON file ('close' = close all): ").strip()
+    if not text:
+        return
+    if text.lower() in ("close", "close all"):
+        print_close_report(close_all(current_hl_summary(), current_bybit_positions()))
+        return
+    try:
+        entries = parse_basket(text)
+    except (ValueError, OSError) as e:
+        print(f"❌ {e}")
+        return
+
+    plans = prepare_basket(entries)
+    if not plans:
+        print("❌ Nothing to trade.")
+        return
+    print(f"⚙️ Setting leverage on {len(plans)} pairs...")
+    apply_basket_leverage(plans)
+    print_open_report(open_basket(plans))
+
+# === 📡 Status snapshot
+# The refresh is split into a concurrent fetch stage, which builds an
+# immutable StatusSnapshot, and a render stage that only reads from it.
+STATUS_FETCH_WORKERS = 8
+STATUS_CALL_TIMEOUT = 10  # seconds any single call may take before it is dropped
+
+# Every sub-account adds up to four account calls to the same fetch round
+_status_pool = ThreadPoolExecutor(max_workers=STATUS_FETCH_WORKERS + 4 * len(SUB_ACCOUNTS), thread_name_prefix="status")
+
+AccountSnapshot = namedtuple("AccountSnapshot", [
+    "name",
+    "hl_account_value",
+    "bybit_account_value",
+    "positions",            # PositionBook of this account's open positions
+])
+
+StatusSnapshot = namedtuple("StatusSnapshot", [
+    "taken_at",
+    "hl_account_value",
+    "bybit_account_value",
+    "hl_mids",
+    "positions",            # PositionBook of both venues' open positions
+    "hl_funding",           # HL coin -> (rate %, next funding ms, interval h)
+    "bybit_funding",        # HL coin -> (rate %, next funding ms, interval h)
+    "watched_analysis",     # token -> analyze_historical_data() result
+    "errors",               # call name -> error message
+    "sub_accounts",         # AccountSnapshot per configured sub-account; the fields above are the main account
+])
+
+
+def _gather(calls, timeout=STATUS_CALL_TIMEOUT):
+    """
+    Run {name: (fn, default)} on the status pool and wait at most `timeout`
+    seconds overall. Calls that fail or time out yield their default.
+    """
+    # Pool threads inherit the caller's priority, so an auto refresh stays background work
+    futures = {name: _status_pool.submit(with_priority(fn)) for name, (fn, _) in calls.items()}
+    deadline = time.monotonic() + timeout
+    results, errors = {}, {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FuturesTimeout:
+            errors[name] = f"timed out after {timeout}s"
+            results[name] = calls[name][1]
+        except Exception as e:
+            errors[name] = str(e)
+            results[name] = calls[name][1]
+    return results, errors
+
+
+def _position_book(hl_summary, bybit_positions_data):
+    from position_book import PositionBook
+
+    hl_positions = [p.get("position", {}) for p in hl_summary.get("assetPositions", [])]
+    bybit_positions = []
+    if bybit_positions_data.get("retCode") == 0:
+        bybit_positions = bybit_positions_data.get("result", {}).get("list", [])
+    return PositionBook(hl_positions, bybit_positions, hl_coin_for)
 
-        # Proceed with Hyperliquid
-        is_buy = False
-        print(f"Now placing {opposite_side.upper()} position on Hyperliquid for {symbol_input}")
-        result = place_market_order_hl(asset = symbol_input, is_buy=is_buy, size = qty*leverage, slippage=0.01)
-        pretty_print(result)
-        
-    elif exchange_choice == '2':  # Hyperliquid
-        # Proceed with Hyperliquid first
-        symbol_input = input("🔍 Symbol (e.g. BTC): ").strip().upper()
-        asset_id, resolved_symbol = resolve_asset_id(symbol_input)
-        
-        mids = get_all_mids()
-        mark_px = float(mids.get(symbol_input, 0))
-        account_value = get_account_value()
-        size = calculate_asset_size(resolved_symbol, mark_px, account_value, leverage, trade_usd)
-        is_buy = True
-        result = place_market_order_hl(asset=symbol_input, is_buy=is_buy, size=size, slippage=0.01)
-        pretty_print(result)
-
-        # If trading on Hyperliquid, take opposite side (short if long on Hyperliquid, long if short on Hyperliquid) on Bybit
-        opposite_side = 'Sell'
-        symbol = symbol_input if symbol_input.endswith("USDT") else f"{symbol_input}USDT"
-
-        # Proceed with Bybit
-        print(f"Now placing {opposite_side.upper()} position on Bybit for {symbol}")
-        size = round(size, 3)
-        result = place_market_order_bybit(symbol, opposite_side, size)
-        pretty_print(result)
-            
-def display_status_fixed():
-    hl_summary = get_account_summary()
-    hl_account_value = safe_float(hl_summary.get("marginSummary", {}).get("accountValue"))
-    hl_positions = hl_summary.get("assetPositions", [])
-    hl_mids = get_all_mids()
 
-    bybit_positions_data = get_positions()
-    bybit_positions = bybit_positions_data.get("result", {}).get("list", []) if bybit_positions_data.get("retCode", -1) == 0 else []
-    bybit_balances = get_wallet_balances()
-    bybit_account_value = sum(
+def _bybit_equity(balances):
+    """USDT equity summed over Bybit wallet balance responses."""
+    return sum(
         safe_float(coin.get("equity"))
-        for acc in bybit_balances.values()
+        for acc in balances.values()
         if acc.get("retCode") == 0
         for item in acc["result"]["list"]
         for coin in item.get("coin", [])
         if coin.get("coin") == "USDT"
     )
 
-    hl_pnls = {}
-    hl_position_map = {}
-    for p in hl_positions:
-        pos_data = p.get("position", {})
-        symbol = pos_data.get("coin")
-        szi = safe_float(pos_data.get("szi"))
-        entry_px = safe_float(pos_data.get("entryPx"))
-        mark_px = float(hl_mids.get(symbol, 0))
-        unrealized_pnl = szi * (mark_px - entry_px)
-        realized_pnl = safe_float(pos_data.get("realizedPnl", 0))
-        hl_pnls[symbol] = unrealized_pnl + realized_pnl  # Net PnL
-        hl_position_map[symbol] = pos_data
-
-    bybit_pnls = {}
-    bybit_position_map = {}
-    if bybit_positions_data.get("retCode") == 0:
-        for pos in bybit_positions:
-            size = safe_float(pos.get("size", 0))
-            if size == 0:
-                continue
-            symbol = pos.get("symbol", "").replace("USDT", "")
-            unrealized_pnl = safe_float(pos.get("unrealisedPnl", 0))
-            realized_pnl = safe_float(pos.get("cumRealisedPnl", 0))
-            bybit_pnls[symbol] = unrealized_pnl + realized_pnl  # Net PnL
-            bybit_position_map[symbol] = pos
-
-    all_symbols = sorted(set(list(hl_pnls.keys()) + list(bybit_pnls.keys())))
-
-    print("\n📊 Combined Trade Table")
-    print("=================================================================================================================================")
-    print(f"{'Symbol':<10}| {'HL Side':<8}| {'HL USD Size':<12}| {'HL Entry':<10}| {'HL Net PnL':<8}|| {'BY Side':<8}| {'BY USD Size':<12}| {'BY Entry':<10}| {'BY Net PnL':<8}|| {'Total Net PnL':<8}")
-    print("---------------------------------------------------------------------------------------------------------------------------------")
-
-    for symbol in all_symbols:
-        hl = hl_position_map.get(symbol, {})
-        hl_sz = safe_float(hl.get("szi"))
-        hl_entry = safe_float(hl.get("entryPx"))
-        hl_side = "LONG" if hl_sz > 0 else "SHORT" if hl_sz < 0 else "-"
-        hl_net_pnl_val = hl_pnls.get(symbol, 0.0)
-        hl_net_pnl = f"{hl_net_pnl_val:+.2f}"
-        hl_usd_size = hl_sz * safe_float(hl_mids.get(symbol, 0))  # USD size for HL position
-
-        by = bybit_position_map.get(symbol, {})
-        by_sz = safe_float(by.get("size", 0))
-        by_entry = safe_float(by.get("avgEntryPrice", 0))
-        if by_entry == 0 and by_sz > 0:
-            by_entry = safe_float(by.get("positionValue", 0)) / by_sz
-        by_side = by.get("side", "-") if by else "-"
-        by_net_pnl_val = bybit_pnls.get(symbol, 0.0)
-        by_net_pnl = f"{by_net_pnl_val:+.2f}"
-        by_usd_size = by_sz * safe_float(bybit_position_map.get(symbol, {}).get("markPrice", 0))  # USD size for Bybit position
-
-        total_net_pnl = hl_net_pnl_val + by_net_pnl_val
-
-        # === Funding Arbitrage Analysis ===
-        hl_rate, _, hl_interval = get_predicted_funding(symbol)
-        hl_rate_hourly = hl_rate / hl_interval if hl_interval else hl_rate
-
-        by_rate, _, by_interval = get_funding_info(f"{symbol}USDT")
-        by_rate_hourly = by_rate / by_interval if by_interval else by_rate
-
-        hl_receives = hl_sz < 0
-        by_receives = by_side.upper() == "SELL"
-
-        net_rate_hourly = 0.0
-        if hl_receives and not by_receives:
-            net_rate_hourly = hl_rate_hourly - by_rate_hourly
-        elif not hl_receives and by_receives:
-            net_rate_hourly = by_rate_hourly - hl_rate_hourly
-        elif hl_receives and by_receives:
-            net_rate_hourly = hl_rate_hourly + by_rate_hourly
-        else:
-            net_rate_hourly = - (hl_rate_hourly + by_rate_hourly)
-
-        hedged_notional = min(abs(hl_sz * safe_float(hl_mids.get(symbol, 0))), abs(by_sz * safe_float(by.get("markPrice", 0))))
-        arb_pnl_hourly = net_rate_hourly / 100 * hedged_notional if hedged_notional > 0 else 0
-        arb_pnl_display = f"{arb_pnl_hourly:+.4f}/h" if hedged_notional > 0 else "-"
-
-        # === Print line with added arbitrage insight
-        print(f"{symbol:<10}| {hl_side:<8}| {hl_usd_size:<12.2f}| {hl_entry:<10.4f}| {hl_net_pnl:<8}  || "
-            f"{by_side:<8}| {by_usd_size:<12.2f}| {by_entry:<10.4f}| {by_net_pnl:<8}  || "
-            f"{total_net_pnl:+.2f}")
-
-    total_net_pnl = sum(hl_pnls.get(sym, 0.0) + bybit_pnls.get(sym, 0.0) for sym in all_symbols)
-
-    print("---------------------------------------------------------------------------------------------------------------------------------")
-    print(f"💰 HL Account Value: {hl_account_value:.2f} USD | BYBIT Account Value: {bybit_account_value:.2f} USD | Total Value: {hl_account_value + bybit_account_value:.2f} USD")
-    print(f"💸 Total Net PnL: {total_net_pnl:+.2f} USD")
-
-    print("\n📈 Current Funding Rates (Hourly) & Estimated Funding PnL")
-    print("=" * 95)
-    print(f"{'Symbol':<10}| {'HL Rate/h':<10}| {'BY Rate/h':<10}| {'HL Next Funding':<20}| {'BY Next Funding':<20}| {'Est. Funding/h'}")
-    print("-" * 95)
-
-    for symbol in all_symbols:
-        # === Fetch normalized rates & funding times
-        hl_rate, hl_next, hl_interval = get_predicted_funding(symbol)
-        hl_rate_hourly = hl_rate / hl_interval if hl_interval else hl_rate
-
-        by_rate, by_next, by_interval = get_funding_info(f"{symbol}USDT")
-        by_rate_hourly = by_rate / by_interval if by_interval else by_rate
-
-        # === Fetch positions and mark prices
-        hl_sz = safe_float(hl_position_map.get(symbol, {}).get("szi", 0))
-        by_pos = bybit_position_map.get(symbol, {})
-        by_sz = safe_float(by_pos.get("size", 0))
-        by_side = by_pos.get("side", "-").upper()
-
-        if by_side == "SELL":
-            by_sz = -by_sz  # treat short as negative size
-
-        hl_mark = float(hl_mids.get(symbol, 0))
-        by_mark = safe_float(by_pos.get("markPrice", 0))
-        if by_mark == 0:
-            by_mark = hl_mark  # fallback to HL if Bybit mid is missing
-
-        # === Determine effective hedged notional size
-        hl_usd = abs(hl_sz * hl_mark)
-        by_usd = abs(by_sz * by_mark)
-        hedged_notional = min(hl_usd, by_usd)
-
-        # === Determine who pays/receives
-        hl_receives = hl_sz < 0  # HL SHORT → receives if rate > 0
-        by_receives = by_side == "SELL"
-
-        if hl_receives and not by_receives:
-            net_rate_hourly = hl_rate_hourly - by_rate_hourly
-        elif not hl_receives and by_receives:
-            net_rate_hourly = by_rate_hourly - hl_rate_hourly
-        elif hl_receives and by_receives:
-            net_rate_hourly = hl_rate_hourly + by_rate_hourly
-        else:
-            net_rate_hourly = - (hl_rate_hourly + by_rate_hourly)
-
-        # === Estimate funding arbitrage PnL
-        arb_pnl = net_rate_hourly / 100 * hedged_notional if hedged_notional > 0 else 0
-        arb_pct = (arb_pnl / hedged_notional * 100) if hedged_notional > 0 else 0
 
-        # === Format for display
-        hl_rate_str = f"{hl_rate_hourly:+.5f}%"
-        by_rate_str = f"{by_rate_hourly:+.5f}%"
-        hl_next_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(hl_next / 1000)) if hl_next else "-"
-        by_next_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(by_next / 1000)) if by_next else "-"
-        arb_str = f"{arb_pnl:+.5f} USD ({arb_pct:+.5f}%/h)" if hedged_notional > 0 else "-"
+def _sub_account_snapshot(account, results):
+    name = account.name
+    hl_summary = results.get(f"{name}.hl_summary") or {}
+    positions = _position_book(hl_summary, results.get(f"{name}.bybit_positions") or {})
+    bybit_balances = {"UNIFIED": results.get(f"{name}.bybit_unified") or {},
+                      "CONTRACT": results.get(f"{name}.bybit_contract") or {}}
+    return AccountSnapshot(
+        name=name,
+        hl_account_value=safe_float(hl_summary.get("marginSummary", {}).get("accountValue")),
+        bybit_account_value=_bybit_equity(bybit_balances),
+        positions=positions,
+    )
+
+
+def with_live_state(snapshot):
+    """
+    Overlay the latest streamed mids and account positions on a snapshot.
+    Memory-only, so the terminal UI can call it on every frame.
+    """
+    changes = {}
+    if MARKET_STREAMS is not None and MARKET_STREAMS.store.is_fresh("hl"):
+        changes["hl_mids"] = MappingProxyType(MARKET_STREAMS.store.get_hl_mids())
+    if ACCOUNT_STREAMS is not None and ACCOUNT_STREAMS.book.is_live("hl") and ACCOUNT_STREAMS.book.is_live("bybit"):
+        hl_summary = ACCOUNT_STREAMS.book.hl_summary()
+        changes["positions"] = _position_book(hl_summary, ACCOUNT_STREAMS.book.bybit_positions_response())
+        changes["hl_account_value"] = safe_float(hl_summary.get("marginSummary", {}).get("accountValue"))
+    return snapshot._replace(**changes) if changes else snapshot
+
+
+def fetch_status_snapshot(watched_tokens=()):
+    calls = {
+        "hl_summary": (current_hl_summary, {}),
+        "hl_mids": (get_all_mids, {}),
+        "bybit_positions": (current_bybit_positions, {"retCode": -1}),
+        # Bulk funding snapshots; per-symbol lookups below are then local
+        "hl_funding": (get_predicted_fundings_snapshot, {}),
+        "bybit_tickers": (get_ticker_snapshot, {}),
+        "bybit_instruments": (get_instruments_table, {}),
+    }
+    if ACCOUNT_STREAMS is not None and ACCOUNT_STREAMS.book.is_live("bybit"):
+        calls["bybit_balances"] = (ACCOUNT_STREAMS.bybit_balances, {})
+    else:
+        calls["bybit_unified"] = (lambda: get_wallet_balance("UNIFIED"), {"retCode": -1})
+        calls["bybit_contract"] = (lambda: get_wallet_balance("CONTRACT"), {"retCode": -1})
+    if watched_tokens:
+        calls["watched_analysis"] = (lambda: analyze_watched_tokens(watched_tokens), {})
+    # Sub-account state joins the same round; market data above is shared by all accounts
+    for account in SUB_ACCOUNTS:
+        calls.update(account_calls(account))
+
+    results, errors = _gather(calls)
+
+    hl_summary = results["hl_summary"] or {}
+    positions = _position_book(hl_summary, results["bybit_positions"])
+
+    bybit_balances = results.get("bybit_balances") or {
+        "UNIFIED": results.get("bybit_unified", {}), "CONTRACT": results.get("bybit_contract", {})
+    }
+    bybit_account_value = _bybit_equity(bybit_balances)
+    sub_accounts = tuple(_sub_account_snapshot(account, results) for account in SUB_ACCOUNTS)
+
+    # Skip lookups whose snapshot timed out; with nothing cached yet they would wait for that first fetch
+    symbols = sorted(set(positions.symbols).union(*(sub.positions.symbols for sub in sub_accounts)))
+    if MARKET_STREAMS is not None:
+        MARKET_STREAMS.ensure_subscribed(symbols, [bybit_symbol_for(symbol) for symbol in symbols])
+    hl_funding, bybit_funding = {}, {}
+    if "hl_funding" not in errors:
+        hl_funding = {symbol: get_predicted_funding(symbol) for symbol in symbols}
+    if "bybit_tickers" not in errors and "bybit_instruments" not in errors:
+        bybit_funding = {symbol: get_funding_info(bybit_symbol_for(symbol)) for symbol in symbols}
+
+    return StatusSnapshot(
+        taken_at=time.time(),
+        hl_account_value=safe_float(hl_summary.get("marginSummary", {}).get("accountValue")),
+        bybit_account_value=bybit_account_value,
+        hl_mids=MappingProxyType(results["hl_mids"] or {}),
+        positions=positions,
+        hl_funding=MappingProxyType(hl_funding),
+        bybit_funding=MappingProxyType(bybit_funding),
+        watched_analysis=MappingProxyType(results.get("watched_analysis") or {}),
+        errors=MappingProxyType(errors),
+        sub_accounts=sub_accounts,
+    )
+
+
+def display_status_fixed():
+    refresh_if_stale()
+    render_status(fetch_status_snapshot(sorted(WATCHED_TOKENS)))
+
+
+def position_columns(snapshot):
+    """
+    Per-symbol view of a snapshot as aligned arrays: sizes, entries and net
+    PnL on both venues, hourly funding on both venues, hedged notional and
+    the estimated funding PnL per hour. See position_book.PositionBook.
+    """
+    return snapshot.positions.evaluate(snapshot.hl_mids, snapshot.hl_funding, snapshot.bybit_funding)
+
+
+def account_views(snapshot):
+    """(name, HL value, Bybit value, columns) for the main account and then each sub-account."""
+    views = [(MAIN_ACCOUNT_NAME, snapshot.hl_account_value, snapshot.bybit_account_value, position_columns(snapshot))]
+    for sub in snapshot.sub_accounts:
+        columns = sub.positions.evaluate(snapshot.hl_mids, snapshot.hl_funding, snapshot.bybit_funding)
+        views.append((sub.name, sub.hl_account_value, sub.bybit_account_value, columns))
+    return views
+
+
+def aggregate_view(views):
+    """account_views() folded into one (name, HL value, Bybit value, columns) across all accounts."""
+    from position_book import aggregate
+
+    return ("all accounts", sum(v[1] for v in views), sum(v[2] for v in views), aggregate([v[3] for v in views]))
+
+
+def position_rows(snapshot):
+    """position_columns() as one dict per symbol; shared by the terminal view and the daemon endpoints."""
+    from position_book import rows as book_rows
 
-        print(f"{symbol:<10}| {hl_rate_str:<10}| {by_rate_str:<10}| {hl_next_str:<20}| {by_next_str:<20}| {arb_str}")
+    return book_rows(position_columns(snapshot))
 
-    print("-" * 95)
+
+def status_lines(snapshot):
+    """Build the status view as a list of lines; reads only the snapshot."""
+    lines = []
+    emit = lines.append
+
+    for name, error in snapshot.errors.items():
+        emit(f"⚠️ {name}: {error}")
+
+    views = account_views(snapshot)
+    if len(views) == 1:
+        _emit_account_tables(emit, None, *views[0][1:])
+    else:
+        # One block per account, then the same tables netted across all of them
+        for view in views + [aggregate_view(views)]:
+            _emit_account_tables(emit, *view)
 
     # Display historical analysis for watched tokens
-    if WATCHED_TOKENS:
-        print("\n📊 Historical Analysis for Watched Tokens")
-        print("=" * 120)
-        print(f"{'Token':<8} | {'7D Success':^10} | {'7D Long':^12} | {'7D APR':^8} | {'30D Success':^10} | {'30D Long':^12} | {'30D APR':^8} | {'7D Max/Min':^14} | {'30D Max/Min':^14} | {'Current Long':^20} | {'Zero Rate %':^10}")
-        print("-" * 120)
+    if snapshot.watched_analysis:
+        emit("\n📊 Historical Analysis for Watched Tokens")
+        emit("=" * 120)
+        emit(f"{'Token':<8} | {'7D Success':^10} | {'7D Long':^12} | {'7D APR':^8} | {'30D Success':^10} | {'30D Long':^12} | {'30D APR':^8} | {'7D Max/Min':^14} | {'30D Max/Min':^14} | {'Current Long':^20} | {'Zero Rate %':^10}")
+        emit("-" * 120)
         
-        for token in WATCHED_TOKENS:
-            analysis = analyze_historical_data(token)
+        for token, analysis in snapshot.watched_analysis.items():
             if analysis:
                 # Determine current long side based on current rates
                 current_long = 'Bybit' if analysis['current_bybit_rate'] < analysis['current_hl_rate'] else 'Hyperliquid'
                 current_apr = abs(analysis['current_bybit_rate'] - analysis['current_hl_rate']) * 24 * 365
                 
-                print(f"{token:<8} | {analysis['success_rate_7d']:^10.2f}% | {analysis['better_side_7d']:^12} | "
+                emit(f"{token:<8} | {analysis['success_rate_7d']:^10.2f}% | {analysis['better_side_7d']:^12} | "
                       f"{analysis['apr_7d']:^8.2f}% | {analysis['success_rate_30d']:^10.2f}% | "
                       f"{analysis['better_side_30d']:^12} | {analysis['apr_30d']:^8.2f}% | "
                       f"{analysis['max_arb_7d']:^6.4f}/{analysis['min_arb_7d']:<6.4f} | "
                       f"{analysis['max_arb_30d']:^6.4f}/{analysis['min_arb_30d']:<6.4f} | "
                       f"{current_long:^10} ({current_apr:>6.2f}%) | {analysis['zero_rate_pct_7d']:^10.2f}%")
         
-        print("-" * 120)
+        emit("-" * 120)
+
+    emit("---------------------------------------------------------------------------------------------------------------------------------")
+    emit(f"⏱️ Rate budget: {GOVERNOR.summary_line()}")
+    return lines
+
+
+def _emit_account_tables(emit, account_name, hl_account_value, bybit_account_value, columns):
+    """Trade and funding tables of one account (or of the aggregate); account_name None leaves titles bare."""
+    from position_book import rows as book_rows, totals as book_totals
+
+    rows = book_rows(columns)
+    suffix = f" — {account_name}" if account_name else ""
+
+    emit(f"\n📊 Combined Trade Table{suffix}")
+    emit("=================================================================================================================================")
+    emit(f"{'Symbol':<10}| {'HL Side':<8}| {'HL USD Size':<12}| {'HL Entry':<10}| {'HL Net PnL':<8}|| {'BY Side':<8}| {'BY USD Size':<12}| {'BY Entry':<10}| {'BY Net PnL':<8}|| {'Total Net PnL':<8}")
+    emit("---------------------------------------------------------------------------------------------------------------------------------")
+
+    for row in rows:
+        hl_net_pnl = f"{row['hl_net_pnl']:+.2f}"
+        by_net_pnl = f"{row['by_net_pnl']:+.2f}"
+        emit(f"{row['symbol']:<10}| {row['hl_side']:<8}| {row['hl_usd_size']:<12.2f}| {row['hl_entry']:<10.4f}| {hl_net_pnl:<8}  || "
+            f"{row['by_side']:<8}| {row['by_usd_size']:<12.2f}| {row['by_entry']:<10.4f}| {by_net_pnl:<8}  || "
+            f"{row['total_net_pnl']:+.2f}")
+
+    total_net_pnl = book_totals(columns)["total_net_pnl"]
+
+    emit("---------------------------------------------------------------------------------------------------------------------------------")
+    emit(f"💰 HL Account Value: {hl_account_value:.2f} USD | BYBIT Account Value: {bybit_account_value:.2f} USD | Total Value: {hl_account_value + bybit_account_value:.2f} USD")
+    emit(f"💸 Total Net PnL: {total_net_pnl:+.2f} USD")
+
+    emit("\n📈 Current Funding Rates (Hourly) & Estimated Funding PnL")
+    emit("=" * 95)
+    emit(f"{'Symbol':<10}| {'HL Rate/h':<10}| {'BY Rate/h':<10}| {'HL Next Funding':<20}| {'BY Next Funding':<20}| {'Est. Funding/h'}")
+    emit("-" * 95)
+
+    for row in rows:
+        hl_next, by_next = row["hl_next_funding"], row["by_next_funding"]
+        # === Format for display
+        hl_rate_str = f"{row['hl_rate_h']:+.5f}%"
+        by_rate_str = f"{row['by_rate_h']:+.5f}%"
+        hl_next_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(hl_next / 1000)) if hl_next else "-"
+        by_next_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(by_next / 1000)) if by_next else "-"
+        arb_str = f"{row['est_funding_h']:+.5f} USD ({row['est_funding_pct_h']:+.5f}%/h)" if row["hedged_notional"] > 0 else "-"
+
+        emit(f"{row['symbol']:<10}| {hl_rate_str:<10}| {by_rate_str:<10}| {hl_next_str:<20}| {by_next_str:<20}| {arb_str}")
+
+    emit("-" * 95)
+
 
-    print("---------------------------------------------------------------------------------------------------------------------------------")
+def render_status(snapshot):
+    print("\n".join(status_lines(snapshot)))
+    print_commands()
+
+
+def print_commands():
     print("\n💡 Available Commands:")
     print("1. open  - Open new positions")
     print("2. close - Close positions")
     print("3. refresh - Refresh status")
     print("4. watch <token> - Add token to watch list")
     print("5. quit  - Exit program")
+    print("6. scan  - Rank funding spreads across all common pairs")
+    print("7. stats - Call latency, HTTP pool and rate budget stats")
+    print("8. backtest - Backtest the spread trade on watched tokens")
+    print("9. sweep - Rank strategy parameters on watched tokens across all cores")
+    print("10. basket - Open many pairs (or close all) with batch orders")
+
+
+
+def warm_up():
+    """
+    Everything startup used to block on: the exchange clients (SDK imports,
+    key derivation, meta), the instrument registry and the HL rate budget.
+    Runs behind the first prompt; a trade issued meanwhile just waits on the
+    client or registry it needs.
+    """
+    for client in (info, session, exchange):
+        try:
+            resolve_client(client)
+        except Exception as e:
+            print(f"⚠️ Failed to build {client!r}: {e}")
+    load_registry()
+    refresh_hl_rate_limit()
+
+
+def refresh_hl_rate_limit():
+    try:
+        get_user_rate_limit()
+    except Exception as e:
+        print(f"⚠️ Failed to refresh HL user rate limit: {e}")
+
 
+def print_stats():
+    print_latency_stats()
+    print_transport_stats()
+    print(f"\n⏱️ Rate budget: {GOVERNOR.summary_line()}")
+    built = client_build_times()
+    if built:
+        print("🔌 Clients built: " + " | ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in sorted(built.items())))
+    if HEDGE_MONITOR is not None:
+        print(f"⚖️ Hedge monitor: {HEDGE_MONITOR.summary_line()}")
 
 
 def auto_refresh():
+    # Plain fallback when the terminal UI is off or stdout is not a terminal
     while True:
-        os.system("cls" if os.name == "nt" else "clear")
+        print(CLEAR_SCREEN, end="")
+        # Deferred when the rate budget is low so trades keep their headroom
+        with priority(PRIORITY_BACKGROUND):
+            refresh_hl_rate_limit()
+            display_status_fixed()
+        time.sleep(STATUS_REFRESH_INTERVAL)
+
+
+def fetch_feed_snapshot():
+    refresh_hl_rate_limit()
+    refresh_if_stale()
+    return fetch_status_snapshot(sorted(WATCHED_TOKENS))
+
+
+def tui_lines():
+    snapshot = STATUS_FEED.latest
+    if snapshot is None:
+        return ["⏳ Loading status..."]
+    lines = status_lines(with_live_state(snapshot))
+    age = time.time() - STATUS_FEED.updated_at
+    lines.append(f"🕒 REST data {age:.0f}s old | live prices {'on' if MARKET_STREAMS is not None else 'off'}")
+    if STATUS_FEED.last_error:
+        lines.append(f"⚠️ Last refresh failed: {STATUS_FEED.last_error}")
+    return lines
+
+
+def start_tui():
+    global STATUS_FEED, SCREEN
+    SCREEN = TerminalScreen(tui_lines)
+    STATUS_FEED = SnapshotFeed(fetch_feed_snapshot, STATUS_REFRESH_INTERVAL, on_update=SCREEN.invalidate)
+    if MARKET_STREAMS is not None:
+        MARKET_STREAMS.store.add_listener(SCREEN.invalidate)
+    if ACCOUNT_STREAMS is not None:
+        ACCOUNT_STREAMS.book.add_listener(SCREEN.invalidate)
+    STATUS_FEED.start()
+    SCREEN.start()
+
+
+def refresh_status():
+    if STATUS_FEED is not None:
+        STATUS_FEED.refresh_now()
+        print("🔄 Refreshing status...")
+    else:
         display_status_fixed()
-        time.sleep(200)
-        
+
+
 def main():
      print("📟 Combined Trader v2")
-     threading.Thread(target=auto_refresh, daemon=True).start()
+     global MARKET_STREAMS, ACCOUNT_STREAMS, HEDGE_MONITOR
+     threading.Thread(target=warm_up, daemon=True, name="warm-up").start()
+     if STREAMS_ENABLED:
+         MARKET_STREAMS = start_market_streams()
+     if PRIVATE_STREAMS_ENABLED:
+         ACCOUNT_STREAMS = start_account_streams()
+     if HEDGE_MONITOR_CONFIG.get('enabled') and MARKET_STREAMS is not None and ACCOUNT_STREAMS is not None:
+         HEDGE_MONITOR = start_hedge_monitor(MARKET_STREAMS.store, ACCOUNT_STREAMS.book, HEDGE_MONITOR_CONFIG)
+     if TUI_ENABLED and sys.stdout.isatty():
+         start_tui()
+     else:
+         threading.Thread(target=auto_refresh, daemon=True).start()
  
      while True:
-         print("\n💡 Available Commands:")
-         print("1. open  - Open new positions")
-         print("2. close - Close positions")
-         print("3. refresh - Refresh status")
-         print("4. watch <token> - Add token to watch list")
-         print("5. quit  - Exit program")
+         print_commands()
          cmd = input("🎯 Enter command: ").strip().lower()
  
          if cmd == "1":
@@ -667,23 +840,186 @@ def main():
          elif cmd == "2":
              close_position_menu()
          elif cmd == "3":
-             display_status_fixed()
+             refresh_status()
          elif cmd == "4":
              token = input("Enter token to watch: ").strip().upper()
              if token:
                  WATCHED_TOKENS.add(token)
                  print(f"✅ Added {token} to watch list")
+                 if STATUS_FEED is not None:
+                     STATUS_FEED.refresh_now()
              else:
                  print("❌ Invalid token.")
          elif cmd == "5":
+             if SCREEN is not None:
+                 SCREEN.stop()
              print("👋 Exiting.")
              break
+         elif cmd in ("6", "scan"):
+             from funding_scanner import scan_funding_spreads, print_scan
+             print_scan(scan_funding_spreads())
+         elif cmd in ("7", "stats"):
+             print_stats()
+         elif cmd in ("8", "backtest"):
+             tokens = input("Tokens (comma-separated, blank = watch list): ").strip().upper()
+             tokens = [t.strip() for t in tokens.split(",") if t.strip()] or sorted(WATCHED_TOKENS)
+             backtest_tokens(tokens)
+         elif cmd in ("9", "sweep"):
+             tokens = input("Tokens (comma-separated, blank = watch list): ").strip().upper()
+             tokens = [t.strip() for t in tokens.split(",") if t.strip()] or sorted(WATCHED_TOKENS)
+             sweep_tokens(tokens)
+         elif cmd in ("10", "basket"):
+             basket_menu()
          else:
              print("❌ Invalid command.")
  
 
 
+# === 🛰️ Headless daemon
+# One process runs the refresh pipeline and serves the latest snapshot on
+# localhost, so dashboards and scripts share a single feed.
+def snapshot_payload(snapshot):
+    from position_book import rows as book_rows, totals as book_totals
+
+    columns = position_columns(snapshot)
+    payload = {
+        "taken_at": snapshot.taken_at,
+        "accounts": {
+            "hl_value": snapshot.hl_account_value,
+            "bybit_value": snapshot.bybit_account_value,
+            "total_value": snapshot.hl_account_value + snapshot.bybit_account_value,
+        },
+        **book_totals(columns),
+        "positions": book_rows(columns),
+        "watched_analysis": dict(snapshot.watched_analysis),
+        "errors": dict(snapshot.errors),
+    }
+    if snapshot.sub_accounts:
+        views = account_views(snapshot)
+        payload["sub_accounts"] = [_account_payload(*view) for view in views[1:]]
+        payload["all_accounts"] = _account_payload(*aggregate_view(views))
+    return payload
+
+
+def _account_payload(name, hl_account_value, bybit_account_value, columns):
+    from position_book import rows as book_rows, totals as book_totals
+
+    return {
+        "name": name,
+        "hl_value": hl_account_value,
+        "bybit_value": bybit_account_value,
+        "total_value": hl_account_value + bybit_account_value,
+        **book_totals(columns),
+        "positions": book_rows(columns),
+    }
+
+
+def daemon_snapshot():
+    snapshot = STATUS_FEED.latest
+    if snapshot is None:
+        return {"status": "loading", "last_error": STATUS_FEED.last_error}
+    payload = snapshot_payload(with_live_state(snapshot))
+    payload["updated_at"] = STATUS_FEED.updated_at
+    payload["age_s"] = time.time() - STATUS_FEED.updated_at
+    payload["last_error"] = STATUS_FEED.last_error
+    payload["streams"] = {
+        "market": {venue: MARKET_STREAMS.store.is_fresh(venue) for venue in ("hl", "bybit")} if MARKET_STREAMS else None,
+        "account": {venue: ACCOUNT_STREAMS.book.is_live(venue) for venue in ("hl", "bybit")} if ACCOUNT_STREAMS else None,
+    }
+    payload["rate_budget"] = GOVERNOR.snapshot()
+    return payload
+
+
+def daemon_metrics():
+    payload = daemon_snapshot()
+    if "positions" not in payload:
+        return [("up", "gauge", "1 once the first snapshot is available", [({}, 0)])]
+    rows = payload["positions"]
+    accounts = payload["accounts"]
+    sub_accounts = payload.get("sub_accounts", [])
+    budget = payload["rate_budget"]
+    latency = latency_stats()
+    return [
+        ("up", "gauge", "1 once the first snapshot is available", [({}, 1)]),
+        ("snapshot_age_seconds", "gauge", "Seconds since the last REST refresh", [({}, payload["age_s"])]),
+        ("account_value_usd", "gauge", "Account value per venue",
+         [({"venue": "hyperliquid"}, accounts["hl_value"]), ({"venue": "bybit"}, accounts["bybit_value"])]),
+        ("sub_account_value_usd", "gauge", "Account value per venue of each sub-account",
+         [({"account": a["name"], "venue": "hyperliquid"}, a["hl_value"]) for a in sub_accounts]
+         + [({"account": a["name"], "venue": "bybit"}, a["bybit_value"]) for a in sub_accounts]),
+        ("sub_account_net_pnl_usd", "gauge", "Net PnL across the positions of each sub-account",
+         [({"account": a["name"]}, a["total_net_pnl"]) for a in sub_accounts]),
+        ("total_net_pnl_usd", "gauge", "Net PnL across all positions", [({}, payload["total_net_pnl"])]),
+        ("total_est_funding_usd_per_hour", "gauge", "Estimated funding PnL per hour across all pairs",
+         [({}, payload["total_est_funding_h"])]),
+        ("position_usd_size", "gauge", "Signed HL / unsigned Bybit position size in USD",
+         [({"symbol": r["symbol"], "venue": "hyperliquid"}, r["hl_usd_size"]) for r in rows]
+         + [({"symbol": r["symbol"], "venue": "bybit"}, r["by_usd_size"]) for r in rows]),
+        ("position_net_pnl_usd", "gauge", "Realized plus unrealized PnL per position",
+         [({"symbol": r["symbol"], "venue": "hyperliquid"}, r["hl_net_pnl"]) for r in rows]
+         + [({"symbol": r["symbol"], "venue": "bybit"}, r["by_net_pnl"]) for r in rows]),
+        ("funding_rate_pct_per_hour", "gauge", "Current funding rate normalized to one hour (%)",
+         [({"symbol": r["symbol"], "venue": "hyperliquid"}, r["hl_rate_h"]) for r in rows]
+         + [({"symbol": r["symbol"], "venue": "bybit"}, r["by_rate_h"]) for r in rows]),
+        ("hedged_notional_usd", "gauge", "Notional covered on both venues",
+         [({"symbol": r["symbol"]}, r["hedged_notional"]) for r in rows]),
+        ("est_funding_usd_per_hour", "gauge", "Estimated funding PnL per hour for the pair",
+         [({"symbol": r["symbol"]}, r["est_funding_h"]) for r in rows]),
+        ("rate_budget_remaining", "gauge", "Request weight left in the current rate-limit window",
+         [({"venue": venue}, v["remaining"]) for venue, v in budget["venues"].items()]),
+        ("rate_deferred_total", "counter", "Background requests deferred by the rate governor",
+         [({}, budget["stats"]["deferred"])]),
+        ("http_requests_total", "counter", "HTTP request attempts per host",
+         [({"host": host}, stats["requests"]) for host, stats in transport_stats().items()]),
+        ("calls_total", "counter", "Calls per wrapper function or HTTP endpoint",
+         [({"venue": venue, "function": name}, s["calls"]) for (venue, name), s in latency.items()]),
+        ("call_errors_total", "counter", "Failed calls per wrapper function or HTTP endpoint",
+         [({"venue": venue, "function": name}, s["errors"]) for (venue, name), s in latency.items()]),
+        ("call_latency_p95_ms", "gauge", "Estimated 95th percentile call latency",
+         [({"venue": venue, "function": name}, s["p95_ms"]) for (venue, name), s in latency.items()]),
+    ]
+
+
+def daemon_health():
+    return {
+        "ok": STATUS_FEED.latest is not None,
+        "age_s": time.time() - STATUS_FEED.updated_at if STATUS_FEED.latest is not None else None,
+        "last_error": STATUS_FEED.last_error,
+    }
+
+
+def run_daemon(host=None, port=None):
+    global MARKET_STREAMS, ACCOUNT_STREAMS, STATUS_FEED
+    host = host or DAEMON_CONFIG.get('host', DEFAULT_HOST)
+    port = port if port is not None else DAEMON_CONFIG.get('port', DEFAULT_PORT)
+    print("🛰️ Combined Trader daemon")
+    load_registry()
+    refresh_hl_rate_limit()
+    if STREAMS_ENABLED:
+        MARKET_STREAMS = start_market_streams()
+    if PRIVATE_STREAMS_ENABLED:
+        ACCOUNT_STREAMS = start_account_streams()
+    STATUS_FEED = SnapshotFeed(fetch_feed_snapshot, DAEMON_CONFIG.get('refresh_interval', STATUS_REFRESH_INTERVAL)).start()
+    server = StatusServer(daemon_snapshot, daemon_metrics, daemon_health, host, port).start()
+    print(f"📡 Serving {server.url}/snapshot and {server.url}/metrics (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print("👋 Stopping daemon.")
+    finally:
+        server.stop()
+        STATUS_FEED.stop()
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Hyperliquid / Bybit funding arbitrage trader")
+    parser.add_argument("--daemon", action="store_true", help="run headless and serve the snapshot on localhost")
+    parser.add_argument("--host", default=None, help=f"daemon bind address (default {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=None, help=f"daemon port (default {DEFAULT_PORT})")
+    args = parser.parse_args()
+    if args.daemon:
+        run_daemon(args.host, args.port)
+    else:
+        main()
 
 
@@ -0,0 +1,321 @@
+import json
+import random
+import threading
+import time
+
+import websocket  # websocket-client, already a dependency of pybit and the HL SDK
+
+import hyperliquid_local.sdk_wrapper as hl_wrapper
+import bybit_local.sdk_wrapper_bybit as bybit_wrapper
+from rate_governor import PRIORITY_BACKGROUND, RequestDeferred, with_priority
+
+# Background WebSocket feeds for mids, funding and mark prices on both venues.
+# Every message lands in a lock-protected MarketDataStore; the wrapper getters
+# read from the store once it is attached and fall back to REST when it is not
+# fresh.
+HL_WS_URL = "wss://api.hyperliquid.xyz/ws"
+BYBIT_WS_URL = "wss://stream.bybit.com/v5/public/linear"
+
+STREAM_MAX_AGE = 30  # seconds without a message before a venue counts as stale
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+BYBIT_SUBSCRIBE_CHUNK = 10  # Bybit caps args per subscribe request
+
+
+class MarketDataStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hl_mids = {}
+        self.hl_ctx = {}
+        self.bybit_tickers = {}
+        self.last_message = {"hl": 0.0, "bybit": 0.0}
+        self.connected = {"hl": False, "bybit": False}
+        self._listeners = []
+
+    # === Listeners
+    def add_listener(self, fn):
+        """fn(venue, keys) is called after every update, outside the lock."""
+        self._listeners.append(fn)
+
+    def _notify(self, venue, keys):
+        for fn in self._listeners:
+            try:
+                fn(venue, keys)
+            except Exception as e:
+                print(f"⚠️ Market store listener failed: {e}")
+
+    # === Writers
+    def set_connected(self, venue, connected):
+        with self._lock:
+            self.connected[venue] = connected
+
+    def update_hl_mids(self, mids):
+        parsed = {coin: float(px) for coin, px in mids.items()}
+        with self._lock:
+            self.hl_mids.update(parsed)
+            self.last_message["hl"] = time.time()
+        self._notify("hl", parsed.keys())
+
+    def update_hl_ctx(self, coin, ctx):
+        with self._lock:
+            self.hl_ctx[coin] = ctx
+            self.last_message["hl"] = time.time()
+        self._notify("hl", (coin,))
+
+    def update_bybit_ticker(self, symbol, fields, replace=False):
+        """Snapshots replace the entry; deltas only carry the changed fields."""
+        parsed = {}
+        for key in ("fundingRate", "markPrice", "lastPrice"):
+            if fields.get(key) not in (None, ""):
+                parsed[key] = float(fields[key])
+        if fields.get("nextFundingTime") not in (None, ""):
+            parsed["nextFundingTime"] = int(fields["nextFundingTime"])
+        with self._lock:
+            if replace or symbol not in self.bybit_tickers:
+                self.bybit_tickers[symbol] = {"fundingRate": 0.0, "nextFundingTime": None,
+                                              "markPrice": 0.0, "lastPrice": 0.0}
+            self.bybit_tickers[symbol].update(parsed)
+            self.last_message["bybit"] = time.time()
+        self._notify("bybit", (symbol,))
+
+    # === Readers
+    def is_fresh(self, venue, max_age=STREAM_MAX_AGE):
+        with self._lock:
+            return self.connected[venue] and time.time() - self.last_message[venue] < max_age
+
+    def get_hl_mids(self):
+        with self._lock:
+            return dict(self.hl_mids)
+
+    def get_hl_mid(self, coin):
+        with self._lock:
+            return self.hl_mids.get(coin)
+
+    def get_hl_ctx(self, coin):
+        with self._lock:
+            ctx = self.hl_ctx.get(coin)
+            return dict(ctx) if ctx else None
+
+    def get_bybit_ticker(self, symbol):
+        with self._lock:
+            ticker = self.bybit_tickers.get(symbol)
+            return dict(ticker) if ticker else None
+
+
+class _StreamWorker(threading.Thread):
+    """
+    Keeps one WebSocket connection alive: (re)subscribes on open, sends an
+    application-level heartbeat, reconnects with jittered exponential backoff
+    and resyncs from REST after every (re)connect so no gap is left behind.
+    """
+    venue = None
+    heartbeat_interval = 20
+
+    def __init__(self, store, url):
+        super().__init__(daemon=True, name=f"{self.venue}-stream")
+        self.store = store
+        self.url = url
+        self.ws = None
+        self._stop_event = threading.Event()
+        self._subs_lock = threading.Lock()
+        self.reconnects = 0
+
+    # Subclass hooks
+    def subscribe_messages(self):
+        return []
+
+    def heartbeat_message(self):
+        return None
+
+    def handle(self, msg):
+        pass
+
+    def resync(self):
+        pass
+
+    def send(self, payload):
+        ws = self.ws
+        if ws is None or not self.store.connected[self.venue]:
+            return False
+        try:
+            ws.send(json.dumps(payload))
+            return True
+        except Exception:
+            return False
+
+    def _on_open(self, ws):
+        self.store.set_connected(self.venue, True)
+        for payload in self.subscribe_messages():
+            ws.send(json.dumps(payload))
+        # The stream itself fills any gap, so the REST resync is background work
+        threading.Thread(target=with_priority(self.resync, PRIORITY_BACKGROUND), daemon=True).start()
+
+    def _on_message(self, ws, raw):
+        try:
+            self.handle(json.loads(raw))
+        except Exception as e:
+            print(f"⚠️ {self.venue} stream message error: {e}")
+
+    def _on_close(self, ws, *args):
+        self.store.set_connected(self.venue, False)
+
+    def _heartbeat(self, ws):
+        while not self._stop_event.is_set() and self.ws is ws:
+            self._stop_event.wait(self.heartbeat_interval)
+            message = self.heartbeat_message()
+            if message is not None:
+                self.send(message)
+
+    def run(self):
+        delay = RECONNECT_MIN_DELAY
+        while not self._stop_event.is_set():
+            ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_close=self._on_close,
+            )
+            self.ws = ws
+            threading.Thread(target=self._heartbeat, args=(ws,), daemon=True).start()
+            started = time.time()
+            try:
+                ws.run_forever()
+            except Exception as e:
+                print(f"⚠️ {self.venue} stream error: {e}")
+            self.store.set_connected(self.venue, False)
+            self.ws = None
+            if self._stop_event.is_set():
+                break
+
+            if time.time() - started > RECONNECT_MAX_DELAY:
+                delay = RECONNECT_MIN_DELAY  # connection was healthy for a while
+            self.reconnects += 1
+            self._stop_event.wait(delay * (0.5 + random.random()))
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    def stop(self):
+        self._stop_event.set()
+        ws = self.ws
+        if ws is not None:
+            ws.close()
+
+
+class HyperliquidMarketStream(_StreamWorker):
+    venue = "hl"
+    heartbeat_interval = 50  # HL drops connections idle for 60s
+
+    def __init__(self, store, coins=(), url=HL_WS_URL):
+        super().__init__(store, url)
+        self.coins = set(coins)
+
+    def _ctx_subscription(self, coin):
+        return {"method": "subscribe", "subscription": {"type": "activeAssetCtx", "coin": coin}}
+
+    def subscribe_messages(self):
+        with self._subs_lock:
+            coins = sorted(self.coins)
+        return ([{"method": "subscribe", "subscription": {"type": "allMids"}}]
+                + [self._ctx_subscription(coin) for coin in coins])
+
+    def add_coins(self, coins):
+        with self._subs_lock:
+            new = set(coins) - self.coins
+            self.coins |= new
+        for coin in sorted(new):
+            self.send(self._ctx_subscription(coin))
+
+    def heartbeat_message(self):
+        return {"method": "ping"}
+
+    def handle(self, msg):
+        channel = msg.get("channel")
+        if channel == "allMids":
+            self.store.update_hl_mids(msg["data"]["mids"])
+        elif channel == "activeAssetCtx":
+            data = msg["data"]
+            self.store.update_hl_ctx(data["coin"], data["ctx"])
+
+    def resync(self):
+        try:
+            mids = hl_wrapper.fetch_all_mids_rest()
+        except RequestDeferred:
+            return  # the next allMids push fills the store anyway
+        if mids:
+            self.store.update_hl_mids(mids)
+
+
+class BybitTickerStream(_StreamWorker):
+    venue = "bybit"
+    heartbeat_interval = 20
+
+    def __init__(self, store, symbols=(), url=BYBIT_WS_URL):
+        super().__init__(store, url)
+        self.symbols = set(symbols)
+
+    def _subscribe_payloads(self, symbols):
+        topics = [f"tickers.{symbol}" for symbol in sorted(symbols)]
+        return [{"op": "subscribe", "args": topics[i:i + BYBIT_SUBSCRIBE_CHUNK]}
+                for i in range(0, len(topics), BYBIT_SUBSCRIBE_CHUNK)]
+
+    def subscribe_messages(self):
+        with self._subs_lock:
+            symbols = set(self.symbols)
+        return self._subscribe_payloads(symbols)
+
+    def add_symbols(self, symbols):
+        with self._subs_lock:
+            new = set(symbols) - self.symbols
+            self.symbols |= new
+        for payload in self._subscribe_payloads(new):
+            self.send(payload)
+
+    def heartbeat_message(self):
+        return {"op": "ping"}
+
+    def handle(self, msg):
+        topic = msg.get("topic", "")
+        if not topic.startswith("tickers."):
+            return
+        data = msg["data"]
+        self.store.update_bybit_ticker(data.get("symbol", topic[8:]), data, replace=msg.get("type") == "snapshot")
+
+    def resync(self):
+        tickers = bybit_wrapper.get_ticker_snapshot(force=True)
+        with self._subs_lock:
+            symbols = set(self.symbols)
+        for symbol in symbols:
+            if symbol in tickers:
+                self.store.update_bybit_ticker(symbol, tickers[symbol], replace=True)
+
+
+class MarketStreams:
+    def __init__(self, store, hl_stream, bybit_stream):
+        self.store = store
+        self.hl = hl_stream
+        self.bybit = bybit_stream
+
+    def ensure_subscribed(self, hl_coins=(), bybit_symbols=()):
+        self.hl.add_coins(hl_coins)
+        self.bybit.add_symbols(bybit_symbols)
+
+    def stop(self):
+        self.hl.stop()
+        self.bybit.stop()
+        hl_wrapper.attach_stream_store(None)
+        bybit_wrapper.attach_stream_store(None)
+
+
+def start_market_streams(hl_coins=(), bybit_symbols=(), hl_url=HL_WS_URL, bybit_url=BYBIT_WS_URL):
+    """Start both public feeds and point the wrapper getters at their store."""
+    store = MarketDataStore()
+    streams = MarketStreams(
+        store,
+        HyperliquidMarketStream(store, hl_coins, url=hl_url),
+        BybitTickerStream(store, bybit_symbols, url=bybit_url),
+    )
+    streams.hl.start()
+    streams.bybit.start()
+    hl_wrapper.attach_stream_store(store)
+    bybit_wrapper.attach_stream_store(store)
+    return streams
+
@@ -0,0 +1,796 @@
+import argparse
+import itertools
+import math
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# In-process paper trading for both venues. A PaperExchange owns a price tape
+# and one simulated account per venue, and exposes stand-ins for the pybit
+# session and the Hyperliquid Exchange / Info clients. install() swaps them in
+# behind the wrappers, so execution.py and the menu run unmodified: orders fill
+# against the tape, funding accrues at each venue's interval as the tape
+# advances, and margin and leverage are enforced per account.
+#
+#   paper = PaperExchange(PriceTape.random_walk({"BTC": 65000, "ETH": 3200}, steps=86400))
+#   with paper:
+#       execute_pair_trade(prepare_pair_trade("ETH", "bybit", 1000, 5))
+#       paper.advance(ts=paper.tape.now() + 8 * MS_PER_HOUR)
+#
+#   python paper_exchange.py --trades 5000 --coins 20
+VENUE_HL = "hl"
+VENUE_BYBIT = "bybit"
+MS_PER_HOUR = 60 * 60 * 1000
+
+HL_TAKER_FEE = 0.00045
+BYBIT_TAKER_FEE = 0.00055
+HL_FUNDING_INTERVAL_H = 1
+BYBIT_FUNDING_INTERVAL_H = 8  # default; per-symbol intervals come from the instrument specs
+
+DEFAULT_LEVERAGE = 10
+DEFAULT_MAX_LEVERAGE = 50
+DEFAULT_HALF_SPREAD_BPS = 1.0
+DEFAULT_DEPTH_USD = 250_000  # notional resting at the touch
+IMPACT_BPS_PER_DEPTH = 10.0  # extra slippage per multiple of the touch consumed
+MAINTENANCE_SHARE = 0.5      # maintenance margin as a share of initial margin
+FILL_LOG_SIZE = 1000
+BYBIT_BATCH_LIMIT = 20       # linear orders per place_batch_order request
+
+PAPER_ADDRESS = "0x" + "0" * 40
+
+
+class PaperReject(Exception):
+    """An order or leverage change the simulated venue refuses."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class PaperRequestError(Exception):
+    """Raised by the paper Bybit session on a non-zero retCode, like pybit does."""
+
+    def __init__(self, code, message):
+        super().__init__(f"{message} (ErrCode: {code})")
+        self.status_code = code
+        self.message = message
+
+
+# === 📼 Tape
+class PriceTape:
+    """
+    Mids per coin on a shared millisecond clock. Quotes are the mid +/- a
+    half-spread (or explicit bid/ask arrays when a book was recorded) plus
+    linear impact once an order exceeds the notional resting at the touch.
+    """
+
+    def __init__(self, timestamps, mids, bids=None, asks=None, half_spread_bps=None, depth_usd=None):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.coins = list(mids)
+        self._column = {coin: i for i, coin in enumerate(self.coins)}
+        self.mids = np.column_stack([np.asarray(mids[c], dtype=float) for c in self.coins])
+        self.bids = np.column_stack([np.asarray(bids[c], dtype=float) for c in self.coins]) if bids else None
+        self.asks = np.column_stack([np.asarray(asks[c], dtype=float) for c in self.coins]) if asks else None
+        half_spread_bps = half_spread_bps or {}
+        depth_usd = depth_usd or {}
+        self.half_spread = {c: half_spread_bps.get(c, DEFAULT_HALF_SPREAD_BPS) / 10_000 for c in self.coins}
+        self.depth_usd = {c: depth_usd.get(c, DEFAULT_DEPTH_USD) for c in self.coins}
+        self.cursor = 0
+
+    @classmethod
+    def random_walk(cls, prices, steps, step_ms=1000, vol_bps=2.0, start_ms=None, seed=0, **kwargs):
+        """Geometric random walk from `prices` ({coin: price}), one row per step."""
+        rng = np.random.default_rng(seed)
+        if start_ms is None:
+            start_ms = int(time.time() // 3600) * MS_PER_HOUR
+        timestamps = start_ms + np.arange(steps, dtype=np.int64) * step_ms
+        shocks = rng.normal(0.0, vol_bps / 10_000, size=(steps, len(prices)))
+        shocks[0] = 0.0
+        paths = np.exp(np.cumsum(shocks, axis=0)) * np.asarray(list(prices.values()), dtype=float)
+        return cls(timestamps, {coin: paths[:, i] for i, coin in enumerate(prices)}, **kwargs)
+
+    def now(self):
+        return int(self.timestamps[self.cursor])
+
+    def seek(self, ts):
+        """Move to the last row at or before ts (never past the end of the tape)."""
+        index = int(np.searchsorted(self.timestamps, ts, side="right")) - 1
+        self.cursor = min(max(index, 0), len(self.timestamps) - 1)
+
+    def step(self, rows=1):
+        self.cursor = min(self.cursor + rows, len(self.timestamps) - 1)
+
+    def has(self, coin):
+        return coin in self._column
+
+    def mid(self, coin):
+        return float(self.mids[self.cursor, self._column[coin]])
+
+    def mid_at(self, coin, ts):
+        index = max(int(np.searchsorted(self.timestamps, ts, side="right")) - 1, 0)
+        return float(self.mids[index, self._column[coin]])
+
+    def all_mids(self):
+        return dict(zip(self.coins, self.mids[self.cursor].tolist()))
+
+    def quote(self, coin, is_buy, size):
+        """Average fill price for `size` units taken at the current row."""
+        column = self._column[coin]
+        mid = self.mids[self.cursor, column]
+        if is_buy:
+            touch = self.asks[self.cursor, column] if self.asks is not None else mid * (1 + self.half_spread[coin])
+        else:
+            touch = self.bids[self.cursor, column] if self.bids is not None else mid * (1 - self.half_spread[coin])
+        impact = IMPACT_BPS_PER_DEPTH / 10_000 * size * mid / self.depth_usd[coin]
+        return float(touch * (1 + impact if is_buy else 1 - impact))
+
+
+# === 💼 Accounts
+class PaperAccount:
+    """
+    One cross-margin account on one venue. Positions are [size, entry_px]
+    keyed by HL coin; sizes are signed (short < 0). Marked value and margin
+    are cached per tape row and patched on every fill, so an order costs
+    O(1) however many positions are open.
+    """
+
+    def __init__(self, venue, tape, balance, taker_fee, funding_rate, interval_h, max_leverage,
+                 default_leverage=DEFAULT_LEVERAGE):
+        self.venue = venue
+        self.tape = tape
+        self.cash = float(balance)
+        self.taker_fee = taker_fee
+        self.funding_rate = funding_rate  # (coin, ts_ms) -> rate per funding interval
+        self.interval_h = interval_h      # coin -> funding interval in hours
+        self.max_leverage = max_leverage  # coin -> max leverage
+        self.default_leverage = default_leverage
+        self.positions = {}
+        self.leverage = {}
+        self.funded_through = {}
+        self.stats = {"fills": 0, "rejects": 0, "liquidations": 0,
+                      "fees": 0.0, "funding": 0.0, "realized": 0.0, "volume": 0.0}
+        self.fills = deque(maxlen=FILL_LOG_SIZE)
+        self._order_ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._cost = 0.0    # sum of size * entry
+        self._marked = None  # (tape row, sum of size * mid, initial margin)
+
+    # --- Marking
+    def _mark(self):
+        cursor = self.tape.cursor
+        if self._marked is None or self._marked[0] != cursor:
+            value = margin = 0.0
+            for coin, (size, _) in self.positions.items():
+                notional = size * self.tape.mid(coin)
+                value += notional
+                margin += abs(notional) / self.leverage_for(coin)
+            self._marked = (cursor, value, margin)
+        return self._marked
+
+    def leverage_for(self, coin):
+        return self.leverage.get(coin, self.default_leverage)
+
+    def equity(self):
+        with self._lock:
+            _, value, _ = self._mark()
+            return self.cash + value - self._cost
+
+    def margin_used(self):
+        with self._lock:
+            return self._mark()[2]
+
+    def unrealized(self, coin):
+        size, entry = self.positions.get(coin, (0.0, 0.0))
+        return size * (self.tape.mid(coin) - entry)
+
+    # --- Orders
+    def set_leverage(self, coin, leverage):
+        leverage = int(leverage)
+        with self._lock:
+            if not 1 <= leverage <= self.max_leverage(coin):
+                raise PaperReject("leverage", f"Invalid leverage value {leverage} for {coin}")
+            _, value, margin = self._mark()
+            size = self.positions.get(coin, (0.0, 0.0))[0]
+            notional = abs(size) * self.tape.mid(coin)
+            margin += notional / leverage - notional / self.leverage_for(coin)
+            if margin > self.cash + value - self._cost:
+                raise PaperReject("margin", f"Insufficient margin to change leverage for {coin}")
+            self.leverage[coin] = leverage
+            self._marked = None
+
+    def fill(self, coin, is_buy, size, limit_px=None, reduce_only=False):
+        """
+        Take `size` from the tape. Returns (filled size, average price, order
+        id) or raises PaperReject for an unknown coin, a fill through limit_px or an
+        order the account cannot margin. Reduce-only orders are clipped to
+        the open position.
+        """
+        if not self.tape.has(coin):
+            raise PaperReject("symbol", f"Unknown asset {coin}")
+        with self._lock:
+            held, entry = self.positions.get(coin, (0.0, 0.0))
+            if reduce_only:
+                if held == 0 or (held > 0) == is_buy:
+                    self.stats["rejects"] += 1
+                    raise PaperReject("reduce_only", f"Reduce only order would increase position on {coin}")
+                size = min(size, abs(held))
+            if size <= 0:
+                self.stats["rejects"] += 1
+                raise PaperReject("size", f"Order size must be positive on {coin}")
+
+            px = self.tape.quote(coin, is_buy, size)
+            if limit_px is not None and (px > limit_px if is_buy else px < limit_px):
+                self.stats["rejects"] += 1
+                raise PaperReject("slippage", f"Order could not immediately match against any resting orders. asset={coin}")
+
+            delta = size if is_buy else -size
+            new = held + delta
+            mid = self.tape.mid(coin)
+            fee = size * px * self.taker_fee
+            _, value, margin = self._mark()
+            leverage = self.leverage_for(coin)
+            new_margin = margin + (abs(new) - abs(held)) * mid / leverage
+            if abs(new) > abs(held) and new_margin > self.cash + value - self._cost - fee:
+                self.stats["rejects"] += 1
+                raise PaperReject("margin", f"Insufficient margin to place order. asset={coin}")
+
+            realized = 0.0
+            if held != 0 and (held > 0) != is_buy:
+                closed = min(size, abs(held))
+                realized = closed * (px - entry) * (1 if held > 0 else -1)
+            if new == 0:
+                new_entry = 0.0
+            elif held == 0 or (held > 0) != (new > 0):
+                new_entry = px  # opened or flipped
+            elif abs(new) > abs(held):
+                new_entry = (held * entry + delta * px) / new
+            else:
+                new_entry = entry
+
+            if held == 0:
+                self.funded_through[coin] = self.tape.now()
+            if new == 0:
+                self.positions.pop(coin, None)
+            else:
+                self.positions[coin] = [new, new_entry]
+            self._cost += new * new_entry - held * entry
+            self.cash += realized - fee
+            self._marked = (self._marked[0], value + delta * mid, new_margin)
+
+            self.stats["fills"] += 1
+            self.stats["fees"] += fee
+            self.stats["realized"] += realized
+            self.stats["volume"] += size * px
+            oid = next(self._order_ids)
+            self.fills.append({"coin": coin, "side": "B" if is_buy else "A", "sz": size, "px": px,
+                               "fee": fee, "closedPnl": realized, "oid": oid, "time": self.tape.now()})
+            return size, px, oid
+
+    # --- Funding and liquidation
+    def accrue_funding(self, now):
+        """Settle every funding boundary crossed since the last call. Longs pay positive rates."""
+        with self._lock:
+            paid = 0.0
+            for coin, (size, _) in self.positions.items():
+                interval = int(self.interval_h(coin) * MS_PER_HOUR)
+                boundary = (self.funded_through.get(coin, now) // interval + 1) * interval
+                while boundary <= now:
+                    paid += size * self.tape.mid_at(coin, boundary) * self.funding_rate(coin, boundary)
+                    boundary += interval
+                self.funded_through[coin] = now
+            self.cash -= paid
+            self.stats["funding"] -= paid
+            return -paid
+
+    def liquidate_if_needed(self):
+        """Close everything at market once equity falls below maintenance margin."""
+        with self._lock:
+            if not self.positions or self.equity() >= self.margin_used() * MAINTENANCE_SHARE:
+                return False
+            for coin, (size, _) in list(self.positions.items()):
+                self.fill(coin, size < 0, abs(size), reduce_only=True)
+            self.stats["liquidations"] += 1
+            return True
+
+
+# === 🏦 Venue stand-ins
+def _envelope(result, now_ms):
+    return {"retCode": 0, "retMsg": "OK", "result": result, "retExtInfo": {}, "time": now_ms}
+
+
+class PaperBybitSession:
+    """The subset of pybit's unified_trading.HTTP the wrappers call."""
+
+    def __init__(self, paper):
+        self.paper = paper
+        self.account = paper.bybit
+
+    def _coin(self, symbol):
+        coin = self.paper.coin_for_symbol.get(symbol)
+        if coin is None:
+            raise PaperRequestError(10001, f"params error: symbol invalid {symbol}")
+        return coin
+
+    def _place(self, symbol, side, orderType, qty, price, reduceOnly):
+        coin = self._coin(symbol)
+        spec = self.paper.specs[coin]
+        size = float(qty)
+        steps = size / spec["qty_step"]
+        if size < spec["qty_step"] or abs(steps - round(steps)) > 1e-6:
+            raise PaperRequestError(10001, f"params error: Qty invalid {qty}")
+        limit_px = float(price) if orderType == "Limit" and price is not None else None
+        try:
+            _, _, oid = self.account.fill(coin, side == "Buy", size, limit_px, bool(reduceOnly))
+        except PaperReject as e:
+            code = {"margin": 110007, "reduce_only": 110017, "slippage": 110001}.get(e.code, 10001)
+            raise PaperRequestError(code, e.message)
+        return {"orderId": f"paper-{oid}", "orderLinkId": ""}
+
+    def place_order(self, category="linear", symbol=None, side=None, orderType="Market", qty=None,
+                    price=None, reduceOnly=None, **kwargs):
+        return _envelope(self._place(symbol, side, orderType, qty, price, reduceOnly), self.paper.tape.now())
+
+    def place_batch_order(self, category="linear", request=None, **kwargs):
+        # Per-order outcomes go in retExtInfo.list, aligned with result.list
+        if not request or len(request) > BYBIT_BATCH_LIMIT:
+            raise PaperRequestError(10001, f"params error: batch holds 1 to {BYBIT_BATCH_LIMIT} orders")
+        acks, infos = [], []
+        for item in request:
+            try:
+                acks.append(self._place(item.get("symbol"), item.get("side"), item.get("orderType", "Market"),
+                                        item.get("qty"), item.get("price"), item.get("reduceOnly")))
+                infos.append({"code": 0, "msg": "OK"})
+            except PaperRequestError as e:
+                acks.append({"orderId": "", "orderLinkId": ""})
+                infos.append({"code": e.status_code, "msg": e.message})
+        result = _envelope({"list": acks}, self.paper.tape.now())
+        result["retExtInfo"] = {"list": infos}
+        return result
+
+    def set_leverage(self, category="linear", symbol=None, buyLeverage=None, sellLeverage=None, **kwargs):
+        coin = self._coin(symbol)
+        leverage = int(float(buyLeverage))
+        if leverage == self.account.leverage_for(coin):
+            raise PaperRequestError(110043, "leverage not modified")
+        try:
+            self.account.set_leverage(coin, leverage)
+        except PaperReject as e:
+            raise PaperRequestError(110012 if e.code == "margin" else 10001, e.message)
+        return _envelope({}, self.paper.tape.now())
+
+    def get_positions(self, category="linear", symbol=None, settleCoin=None, **kwargs):
+        rows = []
+        with self.account._lock:
+            for coin, (size, entry) in self.account.positions.items():
+                spec = self.paper.specs[coin]
+                if symbol and spec["symbol"] != symbol:
+                    continue
+                mark = self.paper.tape.mid(coin)
+                rows.append({
+                    "symbol": spec["symbol"], "side": "Buy" if size > 0 else "Sell", "size": str(abs(size)),
+                    "avgPrice": f"{entry:.8g}", "markPrice": f"{mark:.8g}",
+                    "positionValue": f"{abs(size) * entry:.4f}", "leverage": str(self.account.leverage_for(coin)),
+                    "unrealisedPnl": f"{size * (mark - entry):.4f}", "positionIdx": 0, "tradeMode": 0,
+                    "positionStatus": "Normal",
+                })
+        return _envelope({"category": "linear", "list": rows, "nextPageCursor": ""}, self.paper.tape.now())
+
+    def get_wallet_balance(self, accountType="UNIFIED", **kwargs):
+        equity = self.account.equity() if accountType == "UNIFIED" else 0.0
+        available = max(0.0, equity - self.account.margin_used()) if accountType == "UNIFIED" else 0.0
+        return _envelope({"list": [{
+            "accountType": accountType, "totalEquity": f"{equity:.4f}",
+            "totalAvailableBalance": f"{available:.4f}",
+            "coin": [{"coin": "USDT", "equity": f"{equity:.4f}", "walletBalance": f"{self.account.cash:.4f}"}],
+        }]}, self.paper.tape.now())
+
+    def get_tickers(self, category="linear", symbol=None, **kwargs):
+        now = self.paper.tape.now()
+        rows = []
+        for coin, spec in self.paper.specs.items():
+            if symbol and spec["symbol"] != symbol:
+                continue
+            ticker = self.paper.bybit_ticker(coin)
+            rows.append({"symbol": spec["symbol"], "lastPrice": f"{ticker['lastPrice']:.8g}",
+                         "markPrice": f"{ticker['markPrice']:.8g}",
+                         "fundingRate": f"{ticker['fundingRate']:.8f}",
+                         "nextFundingTime": str(ticker["nextFundingTime"]), "turnover24h": "0"})
+        return _envelope({"category": "linear", "list": rows}, now)
+
+    def get_instruments_info(self, category="linear", limit=1000, cursor=None, **kwargs):
+        return _envelope({"category": "linear", "list": list(self.paper.instruments_table().values()),
+                          "nextPageCursor": ""}, self.paper.tape.now())
+
+    def __getattr__(self, name):
+        raise AttributeError(f"the paper Bybit session does not simulate {name}()")
+
+
+def _hl_statuses(statuses):
+    return {"status": "ok", "response": {"type": "order", "data": {"statuses": statuses}}}
+
+
+class PaperHyperliquidInfo:
+    """The subset of hyperliquid.info.Info the wrappers and the menu call."""
+
+    def __init__(self, paper):
+        self.paper = paper
+        self.account = paper.hl
+
+    def meta(self, dex=""):
+        return {"universe": [{"name": coin, "szDecimals": spec["sz_decimals"], "maxLeverage": spec["max_leverage"]}
+                             for coin, spec in self.paper.specs.items()]}
+
+    def spot_meta(self):
+        return {"universe": [], "tokens": []}
+
+    def all_mids(self, dex=""):
+        return {coin: f"{px:.8g}" for coin, px in self.paper.tape.all_mids().items()}
+
+    def meta_and_asset_ctxs(self):
+        ctxs = []
+        for coin in self.paper.specs:
+            mid = self.paper.tape.mid(coin)
+            ctxs.append({"funding": f"{self.paper.funding_rate(VENUE_HL, coin, self.paper.tape.now()):.8f}",
+                         "markPx": f"{mid:.8g}", "midPx": f"{mid:.8g}", "oraclePx": f"{mid:.8g}",
+                         "openInterest": "0", "dayNtlVlm": "0", "premium": "0.0", "prevDayPx": f"{mid:.8g}"})
+        return [self.meta(), ctxs]
+
+    def user_state(self, address=None, dex=""):
+        account = self.account
+        with account._lock:
+            equity, margin = account.equity(), account.margin_used()
+            positions, notional = [], 0.0
+            for coin, (size, entry) in account.positions.items():
+                mark = self.paper.tape.mid(coin)
+                leverage = account.leverage_for(coin)
+                notional += abs(size) * mark
+                positions.append({"type": "oneWay", "position": {
+                    "coin": coin, "szi": str(size), "entryPx": f"{entry:.8g}",
+                    "positionValue": f"{abs(size) * mark:.4f}", "unrealizedPnl": f"{size * (mark - entry):.4f}",
+                    "leverage": {"type": "cross", "value": leverage},
+                    "marginUsed": f"{abs(size) * mark / leverage:.4f}",
+                    "maxLeverage": self.paper.specs[coin]["max_leverage"],
+                }})
+        summary = {"accountValue": f"{equity:.4f}", "totalNtlPos": f"{notional:.4f}",
+                   "totalRawUsd": f"{account.cash:.4f}", "totalMarginUsed": f"{margin:.4f}"}
+        return {"marginSummary": summary, "crossMarginSummary": dict(summary),
+                "crossMaintenanceMarginUsed": f"{margin * MAINTENANCE_SHARE:.4f}",
+                "withdrawable": f"{max(0.0, equity - margin):.4f}",
+                "assetPositions": positions, "time": self.paper.tape.now()}
+
+    def user_rate_limit(self, address=None):
+        return {"cumVlm": f"{self.account.stats['volume']:.2f}", "nRequestsUsed": self.account.stats["fills"],
+                "nRequestsCap": 10_000 + int(self.account.stats["volume"])}
+
+    def open_orders(self, address=None, dex=""):
+        return []
+
+    def user_fills(self, address=None):
+        return [{**f, "sz": str(f["sz"]), "px": f"{f['px']:.8g}", "fee": f"{f['fee']:.6f}",
+                 "closedPnl": f"{f['closedPnl']:.6f}"} for f in reversed(self.account.fills)]
+
+    def __getattr__(self, name):
+        raise AttributeError(f"the paper Hyperliquid Info does not simulate {name}()")
+
+
+class PaperHyperliquidExchange:
+    """The subset of hyperliquid.exchange.Exchange the wrappers and the menu call."""
+
+    def __init__(self, paper):
+        self.paper = paper
+        self.account = paper.hl
+        self.info = paper.hl_info
+        self.account_address = PAPER_ADDRESS
+
+    def _fill(self, coin, is_buy, sz, limit_px, reduce_only=False):
+        try:
+            size, px, oid = self.account.fill(coin, is_buy, float(sz), limit_px, reduce_only)
+        except PaperReject as e:
+            return _hl_statuses([{"error": e.message}])
+        return _hl_statuses([{"filled": {"totalSz": str(size), "avgPx": f"{px:.8g}", "oid": oid}}])
+
+    def _slippage_price(self, name, is_buy, slippage, px=None):
+        # Same rounding as the SDK: 5 significant figures, then 6 - szDecimals places
+        px = px if px is not None else self.paper.tape.mid(name)
+        px = px * (1 + slippage) if is_buy else px * (1 - slippage)
+        return round(float(f"{px:.5g}"), 6 - self.paper.specs[name]["sz_decimals"])
+
+    def market_open(self, name, is_buy, sz, px=None, slippage=0.05, cloid=None, builder=None):
+        if not self.paper.tape.has(name):
+            raise KeyError(name)  # the SDK fails its name -> asset lookup the same way
+        return self._fill(name, is_buy, sz, self._slippage_price(name, is_buy, slippage, px))
+
+    def market_close(self, coin, sz=None, px=None, slippage=0.05, cloid=None, builder=None):
+        held = self.account.positions.get(coin, (0.0, 0.0))[0]
+        if held == 0:
+            return None  # the SDK returns nothing when there is no position to close
+        is_buy = held < 0
+        size = abs(held) if sz is None else float(sz)
+        return self._fill(coin, is_buy, size, self._slippage_price(coin, is_buy, slippage, px), reduce_only=True)
+
+    def order(self, name, is_buy, sz, limit_px, order_type, reduce_only=False, cloid=None, builder=None):
+        if not self.paper.tape.has(name):
+            raise KeyError(name)
+        result = self._fill(name, is_buy, sz, float(limit_px), reduce_only)
+        statuses = result["response"]["data"]["statuses"]
+        if "error" in statuses[0] and order_type.get("limit", {}).get("tif") != "Ioc":
+            statuses[0] = {"error": "Resting orders are not simulated; only marketable orders fill"}
+        return result
+
+    def bulk_orders(self, order_requests, builder=None, grouping="na"):
+        statuses = []
+        for request in order_requests:
+            if not self.paper.tape.has(request["coin"]):
+                return {"status": "err", "response": f"Unknown coin {request['coin']}"}
+        for request in order_requests:
+            result = self.order(request["coin"], request["is_buy"], request["sz"], request["limit_px"],
+                                request["order_type"], request.get("reduce_only", False))
+            statuses.extend(result["response"]["data"]["statuses"])
+        return _hl_statuses(statuses)
+
+    def update_leverage(self, leverage, name, is_cross=True):
+        try:
+            self.account.set_leverage(name, leverage)
+        except PaperReject as e:
+            return {"status": "err", "response": e.message}
+        return {"status": "ok", "response": {"type": "default"}}
+
+    def __getattr__(self, name):
+        raise AttributeError(f"the paper Hyperliquid Exchange does not simulate {name}()")
+
+
+class TapeStore:
+    """Read side of market_stream.MarketDataStore, answered straight from the tape."""
+
+    def __init__(self, paper):
+        self.paper = paper
+
+    def is_fresh(self, venue, max_age=None):
+        return True
+
+    def get_hl_mids(self):
+        return self.paper.tape.all_mids()
+
+    def get_hl_mid(self, coin):
+        return self.paper.tape.mid(coin) if self.paper.tape.has(coin) else None
+
+    def get_hl_ctx(self, coin):
+        if not self.paper.tape.has(coin):
+            return None
+        return {"funding": self.paper.funding_rate(VENUE_HL, coin, self.paper.tape.now()),
+                "markPx": self.paper.tape.mid(coin)}
+
+    def get_bybit_ticker(self, symbol):
+        coin = self.paper.coin_for_symbol.get(symbol)
+        return self.paper.bybit_ticker(coin) if coin else None
+
+
+# === 🧪 Paper exchange
+def default_spec(coin, price):
+    """Lot sizes in line with what both venues list for a coin at this price."""
+    sz_decimals = min(5, max(0, math.ceil(math.log10(price)))) if price > 0 else 0
+    multiplier = "1000" if coin.startswith("k") else ""
+    return {
+        "symbol": f"{multiplier}{coin.lstrip('k').upper()}USDT",
+        "sz_decimals": sz_decimals,
+        "qty_step": 10 ** -max(0, sz_decimals - 2),
+        "bybit_interval_h": BYBIT_FUNDING_INTERVAL_H,
+        "max_leverage": DEFAULT_MAX_LEVERAGE,
+    }
+
+
+def _funding_source(funding):
+    """Normalise `funding` to (venue, coin, ts_ms) -> rate per that venue's interval."""
+    if callable(funding):
+        return funding
+    rates = funding or {}
+    return lambda venue, coin, ts: rates.get(coin, {}).get(venue, 0.0)
+
+
+class PaperExchange:
+    def __init__(self, tape, hl_balance=10_000.0, bybit_balance=10_000.0, funding=None, specs=None,
+                 hl_fee=HL_TAKER_FEE, bybit_fee=BYBIT_TAKER_FEE, default_leverage=DEFAULT_LEVERAGE):
+        """
+        tape: a PriceTape keyed by HL coin. funding: {coin: {"hl": rate, "bybit": rate}} or
+        fn(venue, coin, ts_ms), rates per funding interval. specs: per-coin overrides of
+        default_spec() (symbol, sz_decimals, qty_step, bybit_interval_h, max_leverage).
+        """
+        self.tape = tape
+        self.funding_rate = _funding_source(funding)
+        self.specs = {coin: {**default_spec(coin, tape.mid(coin)), **(specs or {}).get(coin, {})}
+                      for coin in tape.coins}
+        self.coin_for_symbol = {spec["symbol"]: coin for coin, spec in self.specs.items()}
+        max_leverage = lambda coin: self.specs[coin]["max_leverage"]
+        self.hl = PaperAccount(
+            VENUE_HL, tape, hl_balance, hl_fee, lambda coin, ts: self.funding_rate(VENUE_HL, coin, ts),
+            lambda coin: HL_FUNDING_INTERVAL_H, max_leverage, default_leverage)
+        self.bybit = PaperAccount(
+            VENUE_BYBIT, tape, bybit_balance, bybit_fee, lambda coin, ts: self.funding_rate(VENUE_BYBIT, coin, ts),
+            lambda coin: self.specs[coin]["bybit_interval_h"], max_leverage, default_leverage)
+        self.hl_info = PaperHyperliquidInfo(self)
+        self.hl_exchange = PaperHyperliquidExchange(self)
+        self.bybit_session = PaperBybitSession(self)
+        self.store = TapeStore(self)
+        self._saved = None
+
+    # --- Market data
+    def instruments_table(self):
+        return {spec["symbol"]: {
+            "symbol": spec["symbol"], "contractType": "LinearPerpetual", "status": "Trading",
+            "baseCoin": spec["symbol"][:-4], "quoteCoin": "USDT", "settleCoin": "USDT",
+            "fundingInterval": int(spec["bybit_interval_h"] * 60),
+            "leverageFilter": {"minLeverage": "1", "maxLeverage": str(spec["max_leverage"]), "leverageStep": "0.01"},
+            "lotSizeFilter": {"minOrderQty": str(spec["qty_step"]), "qtyStep": str(spec["qty_step"])},
+        } for spec in self.specs.values()}
+
+    def bybit_ticker(self, coin):
+        now = self.tape.now()
+        interval = int(self.specs[coin]["bybit_interval_h"] * MS_PER_HOUR)
+        mid = self.tape.mid(coin)
+        return {"fundingRate": self.funding_rate(VENUE_BYBIT, coin, now),
+                "nextFundingTime": (now // interval + 1) * interval, "markPrice": mid, "lastPrice": mid}
+
+    # --- Clock
+    def advance(self, ts=None, rows=1):
+        """
+        Move the tape to ts (or forward by `rows`), settle funding on both
+        venues and liquidate any account below maintenance margin. Returns
+        the funding received per venue.
+        """
+        if ts is not None:
+            self.tape.seek(ts)
+        else:
+            self.tape.step(rows)
+        now = self.tape.now()
+        received = {VENUE_HL: self.hl.accrue_funding(now), VENUE_BYBIT: self.bybit.accrue_funding(now)}
+        for account in (self.hl, self.bybit):
+            if account.liquidate_if_needed():
+                print(f"🚨 Paper {account.venue} account liquidated at {now}")
+        return received
+
+    # --- Wiring
+    def install(self):
+        """Route the exchange wrappers (and every module holding their clients) to this simulator."""
+        if self._saved is not None:
+            return self
+        import bybit_local.sdk_wrapper_bybit as bybit_wrapper
+        import hyperliquid_local.sdk_wrapper as hl_wrapper
+        import instrument_registry
+
+        swaps = {id(hl_wrapper.exchange): self.hl_exchange, id(hl_wrapper.info): self.hl_info,
+                 id(bybit_wrapper.session): self.bybit_session}
+        saved = []
+        for module in list(sys.modules.values()):
+            for name in ("exchange", "info", "session"):
+                current = getattr(module, name, None) if module is not None else None
+                if current is not None and id(current) in swaps:
+                    saved.append((module, name, current))
+                    setattr(module, name, swaps[id(current)])
+        saved.append((hl_wrapper, "_stream_store", hl_wrapper._stream_store))
+        saved.append((bybit_wrapper, "_stream_store", bybit_wrapper._stream_store))
+        hl_wrapper.attach_stream_store(self.store)
+        bybit_wrapper.attach_stream_store(self.store)
+
+        registry = instrument_registry.build_registry(self.hl_info.meta(), self.instruments_table())
+        self._saved = (saved, instrument_registry.use_registry(registry))
+        self._reset_wrapper_caches()
+        return self
+
+    def uninstall(self):
+        if self._saved is None:
+            return
+        import instrument_registry
+
+        saved, registry = self._saved
+        for module, name, value in saved:
+            setattr(module, name, value)
+        instrument_registry.use_registry(registry)
+        self._saved = None
+        self._reset_wrapper_caches()
+
+    def _reset_wrapper_caches(self):
+        # Expire only: the next caller refetches from whichever session is in place,
+        # so leaving the simulator never builds or calls the real clients
+        import bybit_local.sdk_wrapper_bybit as bybit_wrapper
+        import hyperliquid_local.sdk_wrapper as hl_wrapper
+
+        bybit_wrapper.invalidate_instruments_table()
+        bybit_wrapper.invalidate_funding_snapshot()
+        hl_wrapper.invalidate_predicted_funding_cache()
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    # --- Reporting
+    def summary(self):
+        out = {}
+        for account in (self.hl, self.bybit):
+            out[account.venue] = {
+                **account.stats,
+                "equity": account.equity(),
+                "cash": account.cash,
+                "margin_used": account.margin_used(),
+                "positions": len(account.positions),
+            }
+        return out
+
+    def print_summary(self):
+        print(f"\n🧪 {'Venue':<8}| {'Equity':>12} | {'Margin':>10} | {'Pos':>4} | {'Fills':>7} | {'Rejects':>7} | "
+              f"{'Fees':>9} | {'Funding':>9} | {'Realized':>10}")
+        print("-" * 100)
+        for venue, s in self.summary().items():
+            print(f"   {venue:<8}| {s['equity']:>12.2f} | {s['margin_used']:>10.2f} | {s['positions']:>4} | "
+                  f"{s['fills']:>7} | {s['rejects']:>7} | {s['fees']:>9.2f} | {s['funding']:>9.2f} | "
+                  f"{s['realized']:>10.2f}")
+
+
+# === 🏋️ Load test
+def load_test(paper, trades, trade_usd=1000, leverage=5, concurrent=False, hold_rows=60):
+    """
+    Open and close `trades` pair trades through execution.py, cycling through
+    the tape's coins and stepping the tape `hold_rows` between open and close.
+    Returns trades per second and how many legs failed.
+    """
+    from execution import prepare_pair_trade, execute_pair_trade
+    from bybit_local.sdk_wrapper_bybit import close_position
+    from hyperliquid_local.sdk_wrapper import close_market_order_hl
+
+    coins = paper.tape.coins
+    failed = 0
+    started = time.perf_counter()
+    for i in range(trades):
+        coin = coins[i % len(coins)]
+        plan = prepare_pair_trade(coin, "bybit" if i % 2 else "hl", trade_usd, leverage)
+        if plan is None:
+            failed += 2
+            continue
+        report = execute_pair_trade(plan, concurrent=concurrent)
+        failed += (not report["hl_ok"]) + (not report["bybit_ok"])
+        paper.advance(rows=hold_rows)
+        if report["hl_ok"] and report["bybit_ok"]:
+            close_market_order_hl(coin, size=plan["hl_size"], slippage=plan["slippage"])
+            side = "Buy" if plan["bybit_side"] == "Sell" else "Sell"
+            close_position(plan["symbol_bybit"], side, plan["bybit_qty"], reduce_only=True)
+    elapsed = time.perf_counter() - started
+    return {"trades": trades, "seconds": elapsed, "trades_per_s": trades / elapsed if elapsed else 0.0,
+            "failed_legs": failed}
+
+
+DEFAULT_LOAD_PRICES = {"BTC": 65000.0, "ETH": 3200.0, "SOL": 150.0, "kPEPE": 0.012, "DOGE": 0.15}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Push simulated pair trades through execution.py")
+    parser.add_argument("--trades", type=int, default=2000)
+    parser.add_argument("--coins", type=int, default=len(DEFAULT_LOAD_PRICES),
+                        help="coins on the tape; extra ones are synthetic")
+    parser.add_argument("--trade-usd", type=float, default=1000)
+    parser.add_argument("--leverage", type=int, default=5)
+    parser.add_argument("--concurrent", action="store_true", help="send both legs from the leg pool")
+    args = parser.parse_args(argv)
+
+    prices = dict(list(DEFAULT_LOAD_PRICES.items())[:args.coins])
+    for i in range(len(prices), args.coins):
+        prices[f"SYN{i:03d}"] = 10.0 * (1 + i % 50)
+    hours = max(1, args.trades * 60 // 3600 + 2)
+    tape = PriceTape.random_walk(prices, steps=hours * 3600)
+    funding = {coin: {VENUE_HL: 0.0000125, VENUE_BYBIT: 0.0001} for coin in prices}
+    paper = PaperExchange(tape, hl_balance=1_000_000, bybit_balance=1_000_000, funding=funding)
+
+    with paper:
+        result = load_test(paper, args.trades, args.trade_usd, args.leverage, args.concurrent)
+    print(f"🏋️ {result['trades']} pair trades in {result['seconds']:.2f}s "
+          f"({result['trades_per_s']:.0f}/s), {result['failed_legs']} failed legs")
+    paper.print_summary()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import numpy as np
+
+# Columnar book of the open pairs. Raw position JSON from both venues is parsed
+# once, when positions change, into float arrays indexed by HL coin (sorted).
+# Marks and funding are gathered per evaluation, and net funding, hedged
+# notional, PnL and funding per hour for every pair come out of one pass of
+# array arithmetic. rows() turns the result back into the per-symbol dicts
+# the status view and the daemon serve.
+HL_FUNDING_DEFAULT = (0.0, None, 1.0)     # (rate %, next funding ms, interval h)
+BYBIT_FUNDING_DEFAULT = (0.0, None, 0.0)
+
+
+def _num(value):
+    try:
+        return float(value) if value not in (None, "") else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _column(records, key):
+    return np.fromiter((_num(r.get(key)) for r in records), dtype=float, count=len(records))
+
+
+def _per_hour(rate, interval):
+    return np.divide(rate, interval, out=rate.copy(), where=interval != 0)
+
+
+class PositionBook:
+    __slots__ = (
+        "symbols", "index",
+        "hl_size", "hl_entry", "hl_realized",
+        "by_size", "by_short", "by_side", "by_entry", "by_mark", "by_upnl", "by_realized",
+    )
+
+    def __init__(self, hl_positions=(), bybit_positions=(), hl_coin_for=lambda symbol: symbol):
+        """
+        hl_positions: the `position` dicts of an HL clearinghouse state.
+        bybit_positions: Bybit linear position dicts; zero sizes are dropped.
+        hl_coin_for maps a Bybit symbol to its HL coin.
+        """
+        hl = [p for p in hl_positions if p.get("coin")]
+        by = [p for p in bybit_positions if _num(p.get("size")) != 0]
+        by_coins = [hl_coin_for(p.get("symbol", "")) for p in by]
+
+        self.symbols = sorted({p["coin"] for p in hl} | set(by_coins))
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        n = len(self.symbols)
+
+        # Duplicates (shouldn't happen) resolve like a dict: the last record wins
+        hl_idx = np.fromiter((self.index[p["coin"]] for p in hl), dtype=np.intp, count=len(hl))
+        self.hl_size, self.hl_entry, self.hl_realized = np.zeros(n), np.zeros(n), np.zeros(n)
+        self.hl_size[hl_idx] = _column(hl, "szi")
+        self.hl_entry[hl_idx] = _column(hl, "entryPx")
+        self.hl_realized[hl_idx] = _column(hl, "realizedPnl")
+
+        by_idx = np.fromiter((self.index[c] for c in by_coins), dtype=np.intp, count=len(by))
+        size, value = _column(by, "size"), _column(by, "positionValue")
+        entry = _column(by, "avgEntryPrice")
+        entry = np.where((entry == 0) & (size > 0), np.divide(value, size, out=np.zeros(len(by)), where=size > 0), entry)
+        self.by_side = ["-"] * n
+        for i, p in zip(by_idx.tolist(), by):
+            self.by_side[i] = p.get("side", "-")
+        self.by_short = np.array([side.upper() == "SELL" for side in self.by_side], dtype=bool)
+        self.by_size, self.by_entry, self.by_mark = np.zeros(n), np.zeros(n), np.zeros(n)
+        self.by_upnl, self.by_realized = np.zeros(n), np.zeros(n)
+        self.by_size[by_idx] = size
+        self.by_entry[by_idx] = entry
+        self.by_mark[by_idx] = _column(by, "markPrice")
+        self.by_upnl[by_idx] = _column(by, "unrealisedPnl")
+        self.by_realized[by_idx] = _column(by, "cumRealisedPnl")
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def _gather(self, mapping, default):
+        # Funding tuples -> (rates, next funding times, intervals)
+        values = [mapping.get(symbol, default) for symbol in self.symbols]
+        rate = np.fromiter((v[0] for v in values), dtype=float, count=len(values))
+        interval = np.fromiter((v[2] for v in values), dtype=float, count=len(values))
+        return rate, [v[1] for v in values], interval
+
+    def evaluate(self, hl_mids, hl_funding, bybit_funding):
+        """
+        Every per-pair figure as arrays aligned with self.symbols. Funding maps
+        are HL coin -> (rate %, next funding ms, interval h).
+        """
+        n = len(self.symbols)
+        hl_mark = np.fromiter((_num(hl_mids.get(symbol)) for symbol in self.symbols), dtype=float, count=n)
+        hl_rate, hl_next, hl_interval = self._gather(hl_funding, HL_FUNDING_DEFAULT)
+        by_rate, by_next, by_interval = self._gather(bybit_funding, BYBIT_FUNDING_DEFAULT)
+        hl_rate_h = _per_hour(hl_rate, hl_interval)
+        by_rate_h = _per_hour(by_rate, by_interval)
+
+        hl_usd = self.hl_size * hl_mark
+        hl_net_pnl = self.hl_size * (hl_mark - self.hl_entry) + self.hl_realized
+        by_net_pnl = self.by_upnl + self.by_realized
+        by_signed = np.where(self.by_short, -self.by_size, self.by_size)
+        by_mark = np.where(self.by_mark == 0, hl_mark, self.by_mark)  # fall back to HL when Bybit has no mark
+
+        hedged = np.minimum(np.abs(hl_usd), np.abs(by_signed * by_mark))
+        # A short leg receives the venue's rate, a long (or missing) leg pays it
+        net_rate_h = (np.where(self.hl_size < 0, hl_rate_h, -hl_rate_h)
+                      + np.where(self.by_short, by_rate_h, -by_rate_h))
+        hedged_any = hedged > 0
+        est_funding_h = np.where(hedged_any, net_rate_h / 100 * hedged, 0.0)
+        est_funding_pct_h = np.divide(est_funding_h, hedged, out=np.zeros(n), where=hedged_any) * 100
+
+        return {
+            "symbol": self.symbols,
+            "hl_size": self.hl_size,
+            "hl_usd_size": hl_usd,
+            "hl_entry": self.hl_entry,
+            "hl_net_pnl": hl_net_pnl,
+            "by_side": self.by_side,
+            "by_size": self.by_size,
+            "by_signed_size": by_signed,
+            "by_usd_size": self.by_size * self.by_mark,
+            "by_entry": self.by_entry,
+            "by_net_pnl": by_net_pnl,
+            "total_net_pnl": hl_net_pnl + by_net_pnl,
+            "hl_rate_h": hl_rate_h,
+            "by_rate_h": by_rate_h,
+            "hl_next_funding": hl_next,
+            "by_next_funding": by_next,
+            "hedged_notional": hedged,
+            "net_rate_h": net_rate_h,
+            "est_funding_h": est_funding_h,
+            "est_funding_pct_h": est_funding_pct_h,
+        }
+
+
+def aggregate(columns_list):
+    """
+    evaluate() results of several accounts folded into one set of columns per
+    symbol. Sizes, PnL, hedged notional and funding net out across accounts,
+    entries become size-weighted averages and the funding rates (market data,
+    the same for every account) are carried over. "accounts" counts the
+    accounts holding each symbol.
+    """
+    symbols = sorted({symbol for columns in columns_list for symbol in columns["symbol"]})
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    n = len(symbols)
+    summed = {key: np.zeros(n) for key in (
+        "hl_size", "hl_usd_size", "hl_net_pnl", "by_signed_size", "by_net_pnl", "total_net_pnl",
+        "hedged_notional", "est_funding_h")}
+    hl_cost, by_cost, by_signed_usd = np.zeros(n), np.zeros(n), np.zeros(n)
+    hl_rate_h, by_rate_h = np.zeros(n), np.zeros(n)
+    hl_next, by_next = [None] * n, [None] * n
+    accounts = np.zeros(n, dtype=int)
+
+    for columns in columns_list:
+        idx = np.fromiter((index[symbol] for symbol in columns["symbol"]), dtype=np.intp, count=len(columns["symbol"]))
+        for key, total in summed.items():
+            np.add.at(total, idx, columns[key])
+        np.add.at(hl_cost, idx, columns["hl_size"] * columns["hl_entry"])
+        np.add.at(by_cost, idx, columns["by_signed_size"] * columns["by_entry"])
+        np.add.at(by_signed_usd, idx, np.sign(columns["by_signed_size"]) * columns["by_usd_size"])
+        np.add.at(accounts, idx, (columns["hl_size"] != 0) | (columns["by_size"] != 0))
+        hl_rate_h[idx] = columns["hl_rate_h"]
+        by_rate_h[idx] = columns["by_rate_h"]
+        for i, hl_ts, by_ts in zip(idx.tolist(), columns["hl_next_funding"], columns["by_next_funding"]):
+            hl_next[i], by_next[i] = hl_ts, by_ts
+
+    hl_size, by_signed, hedged = summed["hl_size"], summed["by_signed_size"], summed["hedged_notional"]
+    hedged_any = hedged > 0
+    # Hedge-weighted net rate, so accounts holding a pair the opposite way offset each other
+    net_rate_h = np.divide(summed["est_funding_h"], hedged, out=np.zeros(n), where=hedged_any) * 100
+    return {
+        **summed,
+        "symbol": symbols,
+        "hl_entry": np.divide(hl_cost, hl_size, out=np.zeros(n), where=hl_size != 0),
+        "by_side": np.where(by_signed > 0, "Buy", np.where(by_signed < 0, "Sell", "-")).tolist(),
+        "by_size": np.abs(by_signed),
+        "by_usd_size": np.abs(by_signed_usd),
+        "by_entry": np.divide(by_cost, by_signed, out=np.zeros(n), where=by_signed != 0),
+        "hl_rate_h": hl_rate_h,
+        "by_rate_h": by_rate_h,
+        "hl_next_funding": hl_next,
+        "by_next_funding": by_next,
+        "net_rate_h": net_rate_h,
+        "est_funding_pct_h": net_rate_h.copy(),
+        "accounts": accounts,
+    }
+
+
+def totals(columns):
+    return {
+        "total_net_pnl": float(columns["total_net_pnl"].sum()),
+        "total_hedged_notional": float(columns["hedged_notional"].sum()),
+        "total_est_funding_h": float(columns["est_funding_h"].sum()),
+    }
+
+
+def rows(columns):
+    """Columns from PositionBook.evaluate() as one dict per symbol, with plain Python values."""
+    hl_size = columns["hl_size"]
+    hl_side = np.where(hl_size > 0, "LONG", np.where(hl_size < 0, "SHORT", "-")).tolist()
+    lists = {key: value.tolist() if isinstance(value, np.ndarray) else value for key, value in columns.items()}
+    lists["hl_side"] = hl_side
+    keys = ["symbol", "hl_side", "hl_size", "hl_usd_size", "hl_entry", "hl_net_pnl", "by_side", "by_size",
+            "by_usd_size", "by_entry", "by_net_pnl", "total_net_pnl", "hl_rate_h", "by_rate_h",
+            "hl_next_funding", "by_next_funding", "hedged_notional", "net_rate_h", "est_funding_h",
+            "est_funding_pct_h"]
+    return [dict(zip(keys, values)) for values in zip(*(lists[key] for key in keys))]
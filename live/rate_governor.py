@@ -0,0 +1,339 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# One rate-limit governor for every request that leaves through the shared
+# HTTP transport. Each venue has a local sliding-window budget (HL weights per
+# IP, Bybit requests per IP) plus whatever the venue reports back: HL's
+# user_rate_limit for address-based actions and Bybit's X-Bapi-Limit-* headers
+# per endpoint. Orders always go first; interactive reads wait briefly for
+# headroom; background refresh work is deferred while the budget is low.
+PRIORITY_ORDER, PRIORITY_READ, PRIORITY_BACKGROUND = 0, 1, 2
+PRIORITY_NAMES = {PRIORITY_ORDER: "order", PRIORITY_READ: "read", PRIORITY_BACKGROUND: "background"}
+
+VENUE_HL = "hyperliquid"
+VENUE_BYBIT = "bybit"
+
+# Hyperliquid: 1200 weight per minute per IP
+HL_IP_WEIGHT = 1200
+HL_IP_WINDOW = 60
+HL_INFO_WEIGHTS = {
+    "l2Book": 2, "allMids": 2, "clearinghouseState": 2, "orderStatus": 2,
+    "spotClearinghouseState": 2, "exchangeStatus": 2, "userRole": 60,
+}
+HL_INFO_DEFAULT_WEIGHT = 20
+HL_ORDERS_PER_WEIGHT = 40  # an action weighs 1 + floor(batch length / 40)
+# Address budget: actions count against user_rate_limit's nRequestsCap, which
+# grows with traded volume; once it is spent HL allows one action per 10 s.
+# Only these action types get the last of it, leverage changes and the like
+# keep the read / background reserve.
+HL_ORDER_ACTIONS = {"order", "cancel", "cancelByCloid", "modify", "batchModify", "scheduleCancel"}
+HL_USER_SPENT_INTERVAL = 10.0
+
+# Bybit: 600 requests per 5 s per IP, endpoint limits arrive in headers
+BYBIT_IP_LIMIT = 600
+BYBIT_IP_WINDOW = 5
+
+BACKGROUND_RESERVE = 0.30  # background work stops below this share of a budget
+READ_RESERVE = 0.10        # interactive reads wait below this share, leaving it to orders
+READ_MAX_WAIT = 5.0        # seconds a read may wait for headroom before going anyway
+ORDER_MAX_WAIT = 1.0
+THROTTLED_BACKOFF = 10.0   # seconds to treat a venue as exhausted after a 429
+
+
+class RequestDeferred(Exception):
+    """Raised instead of sending a background request the budget cannot afford."""
+
+    def __init__(self, venue, endpoint, retry_in):
+        super().__init__(f"{venue} {endpoint} deferred, rate budget low (retry in {retry_in:.1f}s)")
+        self.venue = venue
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+_local = threading.local()
+
+
+def current_priority():
+    return getattr(_local, "priority", PRIORITY_READ)
+
+
+@contextmanager
+def priority(level):
+    """Tag every request made by this thread inside the block with `level`."""
+    previous = current_priority()
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def with_priority(fn, level=None):
+    """Wrap fn to run under `level` (default: the caller's priority) on any thread."""
+    if level is None:
+        level = current_priority()
+
+    def run(*args, **kwargs):
+        with priority(level):
+            return fn(*args, **kwargs)
+    return run
+
+
+class SlidingWindow:
+    def __init__(self, capacity, seconds):
+        self.capacity = capacity
+        self.seconds = seconds
+        self._events = deque()
+        self.used = 0
+
+    def _expire(self, now):
+        while self._events and self._events[0][0] <= now - self.seconds:
+            self.used -= self._events.popleft()[1]
+
+    def remaining(self, now):
+        self._expire(now)
+        return self.capacity - self.used
+
+    def wait_for(self, weight, floor, now):
+        """Seconds until `weight` fits while leaving `floor` unused."""
+        self._expire(now)
+        excess = self.used + weight + floor - self.capacity
+        if excess <= 0:
+            return 0.0
+        freed = 0
+        for ts, w in self._events:
+            freed += w
+            if freed >= excess:
+                return ts + self.seconds - now
+        return self.seconds
+
+    def add(self, weight, now):
+        self._events.append((now, weight))
+        self.used += weight
+
+
+class RateGovernor:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._windows = {
+            VENUE_HL: SlidingWindow(HL_IP_WEIGHT, HL_IP_WINDOW),
+            VENUE_BYBIT: SlidingWindow(BYBIT_IP_LIMIT, BYBIT_IP_WINDOW),
+        }
+        self._endpoints = {}  # (venue, path) -> {"remaining", "limit", "reset_at"}
+        self._blocked_until = {VENUE_HL: 0.0, VENUE_BYBIT: 0.0}
+        self.hl_user = {"used": None, "cap": None, "updated": 0.0}
+        self._last_hl_action = float("-inf")
+        self.stats = {
+            "admitted": {name: 0 for name in PRIORITY_NAMES.values()},
+            "deferred": 0,
+            "waited_s": 0.0,
+            "throttled": 0,
+        }
+
+    def reset_budgets(self):
+        """Forget local usage and venue-reported limits (offline benchmarks, tests)."""
+        with self._lock:
+            for window in self._windows.values():
+                window._events.clear()
+                window.used = 0
+            self._endpoints.clear()
+            for venue in self._blocked_until:
+                self._blocked_until[venue] = 0.0
+
+    def register_host(self, host, venue):
+        with self._lock:
+            self._hosts[host] = venue
+
+    def venue_for(self, url):
+        return self._hosts.get(urlparse(url).netloc)
+
+    # === Request classification
+    def _classify(self, venue, request):
+        """Return (endpoint key, weight, is_action, is_order)."""
+        path = urlparse(request.url).path
+        if venue == VENUE_HL:
+            try:
+                body = json.loads(request.body or b"{}")
+            except (TypeError, ValueError):
+                body = {}
+            if path == "/exchange":
+                action = body.get("action", {})
+                orders = action.get("orders", [])
+                return "exchange", 1 + len(orders) // HL_ORDERS_PER_WEIGHT, True, action.get("type") in HL_ORDER_ACTIONS
+            info_type = body.get("type", "")
+            return f"info:{info_type}", HL_INFO_WEIGHTS.get(info_type, HL_INFO_DEFAULT_WEIGHT), False, False
+        is_action = request.method == "POST"
+        return path, 1, is_action, is_action
+
+    def _endpoint_wait(self, venue, endpoint, level, now):
+        state = self._endpoints.get((venue, endpoint))
+        if state is None or now >= state["reset_at"]:
+            return 0.0
+        floor = 0
+        if level == PRIORITY_BACKGROUND:
+            floor = state["limit"] * BACKGROUND_RESERVE
+        elif level == PRIORITY_READ:
+            floor = state["limit"] * READ_RESERVE
+        if state["remaining"] > floor:
+            return 0.0
+        return state["reset_at"] - now
+
+    def _hl_actions_left(self):
+        if self.hl_user["cap"] is None:
+            return None
+        return self.hl_user["cap"] - self.hl_user["used"]
+
+    def _hl_user_wait(self, level, now):
+        left = self._hl_actions_left()
+        if left is None:
+            return 0.0
+        floor = 0
+        if level == PRIORITY_BACKGROUND:
+            floor = self.hl_user["cap"] * BACKGROUND_RESERVE
+        elif level == PRIORITY_READ:
+            floor = self.hl_user["cap"] * READ_RESERVE
+        if left > floor:
+            return 0.0
+        if level != PRIORITY_ORDER:
+            # What is left belongs to orders; only a refresh showing more volume frees it
+            return HL_USER_SPENT_INTERVAL
+        return max(0.0, self._last_hl_action + HL_USER_SPENT_INTERVAL - now)
+
+    def _wait_time(self, venue, endpoint, weight, level, now, is_action=False):
+        window = self._windows[venue]
+        if level == PRIORITY_BACKGROUND:
+            floor = window.capacity * BACKGROUND_RESERVE
+        elif level == PRIORITY_READ:
+            floor = window.capacity * READ_RESERVE
+        else:
+            floor = 0
+        return max(
+            window.wait_for(weight, floor, now),
+            self._endpoint_wait(venue, endpoint, level, now),
+            self._blocked_until[venue] - now,
+            self._hl_user_wait(level, now) if is_action and venue == VENUE_HL else 0.0,
+        )
+
+    # === Admission
+    def admit(self, request):
+        """
+        Block, defer or pass a request before it is sent. Orders (HL order and
+        cancel actions, Bybit POSTs) always count as orders, whatever the calling
+        thread says; other HL actions keep the caller's priority.
+        """
+        venue = self.venue_for(request.url)
+        if venue is None:
+            return
+        endpoint, weight, is_action, is_order = self._classify(venue, request)
+        level = PRIORITY_ORDER if is_order else current_priority()
+        max_wait = ORDER_MAX_WAIT if level == PRIORITY_ORDER else READ_MAX_WAIT
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._wait_time(venue, endpoint, weight, level, now, is_action)
+                if wait > 0 and level == PRIORITY_BACKGROUND:
+                    self.stats["deferred"] += 1
+                    raise RequestDeferred(venue, endpoint, wait)
+                if wait <= 0 or waited >= max_wait:
+                    self._windows[venue].add(weight, now)
+                    state = self._endpoints.get((venue, endpoint))
+                    if state is not None and now < state["reset_at"]:
+                        state["remaining"] -= 1
+                    if is_action and venue == VENUE_HL:
+                        self._last_hl_action = now
+                        if self.hl_user["used"] is not None:
+                            self.hl_user["used"] += 1
+                    self.stats["admitted"][PRIORITY_NAMES[level]] += 1
+                    self.stats["waited_s"] += waited
+                    return
+            step = min(wait, max_wait - waited)
+            time.sleep(step)
+            waited += step
+
+    def observe(self, request, response):
+        """Fold venue-reported limits from a response back into the budget."""
+        venue = self.venue_for(request.url)
+        if venue is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if response.status_code == 429:
+                self.stats["throttled"] += 1
+                self._blocked_until[venue] = max(self._blocked_until[venue], now + THROTTLED_BACKOFF)
+            if venue != VENUE_BYBIT:
+                return
+            remaining = response.headers.get("X-Bapi-Limit-Status")
+            limit = response.headers.get("X-Bapi-Limit")
+            reset_ms = response.headers.get("X-Bapi-Limit-Reset-Timestamp")
+            if remaining is None or limit is None or reset_ms is None:
+                return
+            # Convert the wall-clock reset into our monotonic clock
+            reset_at = now + max(0.0, int(reset_ms) / 1000 - time.time())
+            self._endpoints[(venue, urlparse(request.url).path)] = {
+                "remaining": int(remaining), "limit": int(limit), "reset_at": reset_at,
+            }
+
+    def update_hl_user_limit(self, data):
+        """Take a user_rate_limit response ({nRequestsUsed, nRequestsCap, ...})."""
+        if not isinstance(data, dict) or "nRequestsCap" not in data:
+            return
+        with self._lock:
+            self.hl_user["used"] = int(data.get("nRequestsUsed", 0))
+            self.hl_user["cap"] = int(data["nRequestsCap"])
+            self.hl_user["updated"] = time.time()
+
+    def hl_actions_left(self):
+        with self._lock:
+            return self._hl_actions_left()
+
+    # === Reporting
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            venues = {
+                venue: {
+                    "remaining": window.remaining(now),
+                    "capacity": window.capacity,
+                    "blocked_for": max(0.0, self._blocked_until[venue] - now),
+                }
+                for venue, window in self._windows.items()
+            }
+            endpoints = {
+                f"{venue} {path}": dict(state)
+                for (venue, path), state in self._endpoints.items()
+                if now < state["reset_at"]
+            }
+            return {
+                "venues": venues,
+                "endpoints": endpoints,
+                "hl_user": dict(self.hl_user),
+                "stats": {**self.stats, "admitted": dict(self.stats["admitted"])},
+            }
+
+    def summary_line(self):
+        snap = self.snapshot()
+        parts = []
+        for venue, v in snap["venues"].items():
+            text = f"{venue} {v['remaining']}/{v['capacity']}"
+            if v["blocked_for"] > 0:
+                text += f" (throttled {v['blocked_for']:.0f}s)"
+            parts.append(text)
+        actions_left = self.hl_actions_left()
+        if actions_left is not None:
+            parts.append(f"HL actions {actions_left} left")
+        tight = [f"{name} {s['remaining']}/{s['limit']}" for name, s in snap["endpoints"].items()
+                 if s["remaining"] <= s["limit"] * BACKGROUND_RESERVE]
+        if tight:
+            parts.append("low: " + ", ".join(tight))
+        parts.append(f"deferred {snap['stats']['deferred']}")
+        return " | ".join(parts)
+
+
+GOVERNOR = RateGovernor()
@@ -0,0 +1,40 @@
+import threading
+import time
+
+# Cached snapshots refreshed by one caller at a time. A snapshot is a dict with
+# "index", "fetched_at", "expires_at" and "refreshing" keys guarded by its own
+# lock; the lock is held only to read or swap those, never across the fetch,
+# so a slow refresh never holds up readers of the cached index.
+
+
+def begin_refresh(snapshot, lock, force):
+    """
+    Return (index, None) to serve the cached index, or (None, done) when this
+    caller should fetch and hand the result to end_refresh. One fetch runs per
+    snapshot; meanwhile other callers get the last index, and only wait when
+    there is none yet or they forced a refresh.
+    """
+    while True:
+        with lock:
+            if not force and time.time() < snapshot["expires_at"]:
+                return snapshot["index"], None
+            in_flight = snapshot["refreshing"]
+            if in_flight is None:
+                done = snapshot["refreshing"] = threading.Event()
+                return None, done
+            if snapshot["fetched_at"] and not force:
+                return snapshot["index"], None
+        in_flight.wait()
+        force = False  # the fetch just waited on is as fresh as a forced one
+
+
+def end_refresh(snapshot, lock, done, index, fetched_at, expires_at):
+    """Store a fetched index (None keeps the previous one) and release the waiters."""
+    with lock:
+        if index is not None:
+            snapshot["index"] = index
+            snapshot["fetched_at"] = fetched_at
+        snapshot["expires_at"] = expires_at
+        snapshot["refreshing"] = None
+        done.set()
+        return snapshot["index"]
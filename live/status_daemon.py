@@ -0,0 +1,98 @@
+import json
+import math
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Localhost endpoint for the headless service mode. One process runs the
+# refresh pipeline; dashboards and scripts read its latest snapshot here
+# instead of each polling the venues themselves.
+#   GET /snapshot  combined snapshot as JSON
+#   GET /metrics   the same numbers in Prometheus text format
+#   GET /health    liveness and snapshot age
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+METRIC_PREFIX = "fund_arb_"
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def prometheus_text(metrics):
+    """
+    Render [(name, type, help, [(labels dict, value), ...]), ...] in the
+    Prometheus text exposition format. Samples with a None value are skipped.
+    """
+    out = []
+    for name, kind, help_text, samples in metrics:
+        full_name = METRIC_PREFIX + name
+        out.append(f"# HELP {full_name} {help_text}")
+        out.append(f"# TYPE {full_name} {kind}")
+        for labels, value in samples:
+            if value is None:
+                continue
+            label_text = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+            value_text = _format_value(value)
+            out.append(f"{full_name}{{{label_text}}} {value_text}" if label_text else f"{full_name} {value_text}")
+    return "\n".join(out) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "fund-arb-daemon"
+
+    def _send(self, status, body, content_type):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        try:
+            if path == "/snapshot":
+                self._send(200, json.dumps(self.server.snapshot_fn(), default=str), "application/json")
+            elif path == "/metrics":
+                self._send(200, prometheus_text(self.server.metrics_fn()), "text/plain; version=0.0.4")
+            elif path in ("", "/health"):
+                self._send(200, json.dumps(self.server.health_fn()), "application/json")
+            else:
+                self._send(404, json.dumps({"error": f"unknown path {path}"}), "application/json")
+        except Exception as e:
+            self._send(500, json.dumps({"error": str(e)}), "application/json")
+
+    def log_message(self, format, *args):
+        pass  # keep the daemon log for refresh errors only
+
+
+class StatusServer:
+    def __init__(self, snapshot_fn, metrics_fn, health_fn, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.snapshot_fn = snapshot_fn
+        self.httpd.metrics_fn = metrics_fn
+        self.httpd.health_fn = health_fn
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True, name="status-server").start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
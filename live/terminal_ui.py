@@ -0,0 +1,174 @@
+import shutil
+import sys
+import threading
+import time
+import unicodedata
+
+from rate_governor import PRIORITY_BACKGROUND, PRIORITY_READ, priority
+
+# Event-driven terminal UI. Background fetchers keep the latest snapshot in a
+# SnapshotFeed; a TerminalScreen thread renders from memory only, rewrites just
+# the rows that changed and caps the frame rate. The top of the terminal holds
+# the status panel and the bottom rows are a scrolling region for the command
+# prompt, so redraws never land on what the user is typing.
+CSI = "\x1b["
+SAVE_CURSOR = "\x1b7"
+RESTORE_CURSOR = "\x1b8"
+CLEAR_SCREEN = f"{CSI}2J{CSI}H"
+
+MAX_FPS = 4
+INPUT_ROWS = 12  # rows kept below the panel for prompts and command output
+
+
+def display_width(text):
+    return sum(2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1 for ch in text)
+
+
+def clip(text, cols):
+    """Cut text to at most `cols` terminal cells so a row never wraps."""
+    if len(text) < cols // 2 or display_width(text) <= cols:
+        return text
+    width = 0
+    for i, ch in enumerate(text):
+        width += 2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1
+        if width > cols:
+            return text[:i]
+    return text
+
+
+class SnapshotFeed:
+    """
+    In-memory state store filled by a background fetcher. Timed refreshes run
+    as background work for the rate governor; refresh_now() runs as a read.
+    """
+
+    def __init__(self, fetch_fn, interval, on_update=None):
+        self.fetch_fn = fetch_fn
+        self.interval = interval
+        self.on_update = on_update
+        self.latest = None
+        self.updated_at = 0.0
+        self.last_error = None
+        self._wake = threading.Event()
+        self._manual = False
+        self._stop_event = threading.Event()
+
+    def refresh_now(self):
+        self._manual = True
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            level = PRIORITY_READ if self._manual or self.latest is None else PRIORITY_BACKGROUND
+            self._manual = False
+            try:
+                with priority(level):
+                    self.latest = self.fetch_fn()
+                self.updated_at = time.time()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            if self.on_update is not None:
+                self.on_update()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True, name="status-feed").start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+
+
+class TerminalScreen:
+    """
+    Diff renderer for a fixed status panel. render_fn() returns the panel lines
+    and must only read memory; invalidate() is cheap enough to be a store
+    listener called from stream threads.
+    """
+
+    def __init__(self, render_fn, max_fps=MAX_FPS, input_rows=INPUT_ROWS, stream=None):
+        self.render_fn = render_fn
+        self.min_frame_interval = 1.0 / max_fps
+        self.input_rows = input_rows
+        self.stream = stream or sys.stdout
+        self.frames = 0
+        self.rows_written = 0
+        self.last_frame_ms = 0.0
+        self._size = None
+        self._panel_rows = 0
+        self._drawn = []
+        self._dirty = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def invalidate(self, *args):
+        self._dirty.set()
+
+    def _write(self, data):
+        self.stream.write(data)
+        self.stream.flush()
+
+    def _setup(self, size):
+        cols, rows = size
+        self._size = size
+        self._panel_rows = max(1, rows - self.input_rows)
+        self._drawn = [None] * self._panel_rows
+        # Scrolling region below the panel; park the cursor at its bottom line
+        self._write(f"{CLEAR_SCREEN}{CSI}{self._panel_rows + 1};{rows}r{CSI}{rows};1H")
+
+    def _frame(self):
+        size = tuple(shutil.get_terminal_size())
+        if size != self._size:
+            self._setup(size)
+        cols = self._size[0] - 1
+
+        lines = "\n".join(self.render_fn()).split("\n")
+        panel = self._panel_rows
+        if len(lines) > panel:
+            hidden = len(lines) - panel + 1
+            lines = lines[:panel - 1] + [f"… {hidden} more rows (enlarge the terminal to see them)"]
+        lines += [""] * (panel - len(lines))
+
+        out = []
+        for row, text in enumerate(lines):
+            text = clip(text, cols)
+            if self._drawn[row] != text:
+                out.append(f"{CSI}{row + 1};1H{text}{CSI}K")
+                self._drawn[row] = text
+        if out:
+            self._write(SAVE_CURSOR + "".join(out) + RESTORE_CURSOR)
+            self.rows_written += len(out)
+        self.frames += 1
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._dirty.wait()
+            if self._stop_event.is_set():
+                break
+            self._dirty.clear()
+            started = time.monotonic()
+            try:
+                self._frame()
+            except Exception as e:
+                self._write(f"\n⚠️ Status render failed: {e}\n")
+            elapsed = time.monotonic() - started
+            self.last_frame_ms = elapsed * 1000
+            # Changes that arrive while we wait are coalesced into the next frame
+            self._stop_event.wait(max(0.0, self.min_frame_interval - elapsed))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="terminal-ui")
+        self._thread.start()
+        self.invalidate()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        self._dirty.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        if self._size is not None:
+            self._write(f"{CSI}r{CSI}{self._size[1]};1H\n")  # release the scrolling region
@@ -0,0 +1,27 @@
+import os
+import sys
+
+LIVE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if LIVE_DIR not in sys.path:
+    sys.path.insert(0, LIVE_DIR)
+
+# REST calls answer from the bench stand-ins, so nothing here reaches a venue.
+# install() has to run before anything imports the exchange wrappers.
+from bench import standins  # noqa: E402
+from bench.fixtures import Scenario  # noqa: E402
+
+standins.install(Scenario(5, 0))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _tmp_caches(tmp_path, monkeypatch):
+    # Keep synthetic registry / meta / history files out of live/.cache
+    import funding_store
+    import instrument_registry
+    import hyperliquid_local.sdk_wrapper as hl_wrapper
+
+    monkeypatch.setattr(instrument_registry, "REGISTRY_PATH", str(tmp_path / "instrument_registry.json"))
+    monkeypatch.setattr(hl_wrapper, "META_CACHE_PATH", str(tmp_path / "hl_meta.json"))
+    monkeypatch.setattr(funding_store, "STORE_DIR", str(tmp_path / "funding"))
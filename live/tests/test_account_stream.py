@@ -0,0 +1,37 @@
+import time
+
+from account_stream import AccountBook, BOOK_MAX_AGE
+
+
+def _position(symbol, size="1", **extra):
+    return {"symbol": symbol, "side": "Buy", "size": size, **extra}
+
+
+def _live_book():
+    book = AccountBook()
+    book.set_connected("bybit", True)
+    book.replace_bybit_positions([_position("BTCUSDT")])
+    book.apply_bybit_wallets([{"accountType": "UNIFIED", "coin": []}])
+    return book
+
+
+def test_stale_book_is_not_live():
+    book = _live_book()
+    assert book.is_live("bybit")
+    book.last_update["bybit"] = time.time() - BOOK_MAX_AGE - 1
+    assert not book.is_live("bybit")
+    book.set_connected("bybit", False)
+    book.apply_bybit_positions([])
+    assert not book.is_live("bybit")
+
+
+def test_only_usdt_linear_positions_are_kept():
+    book = _live_book()
+    book.apply_bybit_positions([
+        _position("ETHUSDT", category="linear"),
+        _position("ETHPERP", category="linear"),                    # USDC perpetual
+        _position("BTCUSD", category="inverse"),
+        _position("SOLUSDT", category="linear", settleCoin="USDC"),
+    ])
+    book.replace_bybit_positions(book.bybit_positions_response()["result"]["list"] + [_position("BTC-27DEC24")])
+    assert sorted(p["symbol"] for p in book.bybit_positions_response()["result"]["list"]) == ["BTCUSDT", "ETHUSDT"]
@@ -0,0 +1,28 @@
+import instrumentation
+from accounts import load_accounts
+from rate_governor import VENUE_BYBIT, VENUE_HL
+
+
+def _calls(venue, name):
+    return instrumentation.latency_stats().get((venue, name), {}).get("calls", 0)
+
+
+def test_sub_account_calls_are_timed():
+    (account,) = load_accounts([{
+        "name": "sub1",
+        "hyperliquid": {"account_address": "0x" + "11" * 20, "secret_key": "0x" + "22" * 32},
+        "bybit": {"api_key": "key", "api_secret": "secret"},
+    }])
+    before = {
+        "summary": _calls(VENUE_HL, "get_account_summary"),
+        "positions": _calls(VENUE_BYBIT, "get_positions"),
+        "wallet": _calls(VENUE_BYBIT, "get_wallet_balance"),
+    }
+
+    account.hl.get_account_summary()
+    account.bybit.get_positions()
+    account.bybit.get_wallet_balance("UNIFIED")
+
+    assert _calls(VENUE_HL, "get_account_summary") == before["summary"] + 1
+    assert _calls(VENUE_BYBIT, "get_positions") == before["positions"] + 1
+    assert _calls(VENUE_BYBIT, "get_wallet_balance") == before["wallet"] + 1
@@ -0,0 +1,30 @@
+import threading
+
+import execution
+from execution import execute_pair_trade, prepare_pair_trade
+from paper_exchange import PaperExchange, PriceTape
+
+
+def test_overlapping_pair_trades_all_complete():
+    with PaperExchange(PriceTape.random_walk({"ETH": 3200.0, "BTC": 65000.0}, steps=3600)):
+        plans = [prepare_pair_trade(coin, "bybit", 1000, 5) for coin in ("ETH", "BTC", "ETH", "BTC")]
+        reports = [None] * len(plans)
+
+        def run(i):
+            reports[i] = execute_pair_trade(plans[i])
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(plans))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        assert not any(thread.is_alive() for thread in threads)
+        assert all(report["hl_ok"] and report["bybit_ok"] for report in reports)
+
+
+def test_leg_left_alone_at_the_barrier_is_not_sent(monkeypatch):
+    monkeypatch.setattr(execution, "LEG_BARRIER_TIMEOUT", 0.05)
+    sent = []
+    leg = execution._timed_leg(threading.Barrier(2), lambda: sent.append(True))
+    assert leg["error"] is not None and leg["result"] is None
+    assert not sent
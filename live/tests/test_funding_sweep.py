@@ -0,0 +1,18 @@
+import numpy as np
+
+from funding_backtest import backtest
+from funding_sweep import _mp_context, param_grid, sweep
+
+
+def test_workers_are_not_forked_from_the_caller():
+    assert _mp_context().get_start_method() in ("forkserver", "spawn")
+
+
+def test_sweep_matches_a_direct_backtest():
+    rng = np.random.default_rng(7)
+    hl, bybit = rng.normal(0.001, 0.004, (6, 400)), rng.normal(0.0, 0.003, (6, 400))
+    grid = param_grid(entry_apr=(10.0, 30.0), exit_apr=(0.0,), signal_hours=(8, 24))
+    results = dict(sweep(bybit, hl, grid, workers=2))
+    assert set(results) == set(grid)
+    for params, metrics in results.items():
+        assert np.isclose(metrics["apr"], backtest(bybit, hl, params)["summary"]["portfolio_apr"])
@@ -0,0 +1,57 @@
+import time
+
+import bybit_local.sdk_wrapper_bybit as bybit_wrapper
+import hyperliquid_local.sdk_wrapper as hl_wrapper
+from account_stream import AccountBook
+from hedge_monitor import HedgeMonitor, MODE_REDUCE
+from market_stream import MarketDataStore
+from paper_exchange import PaperExchange, PriceTape
+
+
+def _drifted(paper):
+    """Book and store for HL short 1.0 ETH against Bybit long 0.9, both venues live."""
+    hl_wrapper.place_market_order_hl("ETH", False, 1.0, px=3200.0)
+    bybit_wrapper.place_market_order_bybit("ETHUSDT", "Buy", 0.9)
+    store, book = MarketDataStore(), AccountBook()
+    store.set_connected("hl", True)
+    store.update_hl_mids(paper.tape.all_mids())
+    for venue in ("hl", "bybit"):
+        book.set_connected(venue, True)
+    book.replace_hl_state(paper.hl_info.user_state())
+    book.replace_bybit_positions(paper.bybit_session.get_positions()["result"]["list"])
+    book.apply_bybit_wallets([{"accountType": "UNIFIED", "coin": []}])
+    return store, book
+
+
+def _monitor(store, book, tmp_path, **kwargs):
+    return HedgeMonitor(store, book, threshold_usd=25, threshold_pct=0, mode=MODE_REDUCE,
+                        log_path=str(tmp_path / "hedge.jsonl"), **kwargs)
+
+
+def test_lagging_book_does_not_repeat_a_correction(tmp_path):
+    with PaperExchange(PriceTape.random_walk({"ETH": 3200.0}, steps=3600)) as paper:
+        store, book = _drifted(paper)
+        mon = _monitor(store, book, tmp_path, cooldown=0.2)
+        # The book never shows the fill, as when the private feed lags
+        for _ in range(8):
+            mon.check("ETH")
+            time.sleep(0.05)
+        assert mon.stats["corrections"] == 1
+        assert float(paper.hl_info.user_state()["assetPositions"][0]["position"]["szi"]) == -0.9
+
+        # Once the book catches up the pair is balanced and nothing is in flight
+        book.replace_hl_state(paper.hl_info.user_state())
+        assert mon.check("ETH") is None
+        assert not mon._pending
+
+
+def test_stale_or_disconnected_book_is_not_acted_on(tmp_path):
+    with PaperExchange(PriceTape.random_walk({"ETH": 3200.0}, steps=3600)) as paper:
+        store, book = _drifted(paper)
+        mon = _monitor(store, book, tmp_path, cooldown=0, max_book_age=30)
+        book.last_update["bybit"] = time.time() - 31
+        assert mon.check("ETH") is None
+        book.last_update["bybit"] = time.time()
+        book.set_connected("hl", False)
+        assert mon.check("ETH") is None
+        assert mon.stats["skipped_stale"] == 2 and mon.stats["corrections"] == 0
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+import market_stream
+from bench import standins
+from market_stream import start_market_streams
+from ws_standin import StandInServer
+
+HL_COINS = ["BTC", "ETH", "SYN000"]
+BYBIT_SYMBOLS = ["BTCUSDT", "SYN000USDT"]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def feeds(monkeypatch):
+    monkeypatch.setattr(market_stream, "RECONNECT_MIN_DELAY", 0.05)
+    hl_server = StandInServer("hl", interval=0.05).start()
+    bybit_server = StandInServer("bybit", interval=0.05).start()
+    streams = start_market_streams(HL_COINS, BYBIT_SYMBOLS, hl_url=hl_server.url, bybit_url=bybit_server.url)
+    yield streams, hl_server, bybit_server
+    streams.stop()
+    hl_server.stop()
+    bybit_server.stop()
+
+
+def _filled(store):
+    return (store.is_fresh("hl") and store.is_fresh("bybit")
+            and store.get_hl_mid("BTC") is not None and store.get_hl_ctx("ETH") is not None
+            and store.get_bybit_ticker("BTCUSDT") is not None)
+
+
+def test_streams_fill_the_store(feeds):
+    streams, _, _ = feeds
+    store = streams.store
+    assert wait_for(lambda: _filled(store))
+
+    ticker = store.get_bybit_ticker("BTCUSDT")
+    assert ticker["markPrice"] > 0 and ticker["nextFundingTime"]
+    assert float(store.get_hl_ctx("ETH")["markPx"]) > 0
+    # The REST resync after connecting fills what the feed itself does not carry
+    assert wait_for(lambda: store.get_hl_mid("SYN000") is not None)
+    assert wait_for(lambda: (store.get_bybit_ticker("SYN000USDT") or {}).get("fundingRate"))
+
+
+def test_drop_clients_reconnects_and_resyncs(feeds):
+    streams, hl_server, bybit_server = feeds
+    store = streams.store
+    assert wait_for(lambda: _filled(store) and hl_server.clients() and bybit_server.clients())
+    assert wait_for(lambda: store.get_hl_mid("SYN000") is not None)
+
+    standins.reset_call_counts()
+    hl_server.messages_received.clear()
+    bybit_server.messages_received.clear()
+    hl_server.drop_clients()
+    bybit_server.drop_clients()
+
+    assert wait_for(lambda: streams.hl.reconnects >= 1 and streams.bybit.reconnects >= 1)
+    assert wait_for(lambda: _filled(store) and hl_server.clients() and bybit_server.clients())
+
+    # Subscriptions are replayed on the new connections...
+    def hl_subs():
+        return [m["subscription"] for m in list(hl_server.messages_received) if m.get("method") == "subscribe"]
+
+    def bybit_topics():
+        return {t for m in list(bybit_server.messages_received) if m.get("op") == "subscribe" for t in m["args"]}
+
+    assert wait_for(lambda: {"type": "allMids"} in hl_subs()
+                    and {s["coin"] for s in hl_subs() if s["type"] == "activeAssetCtx"} == set(HL_COINS))
+    assert wait_for(lambda: bybit_topics() == {f"tickers.{symbol}" for symbol in BYBIT_SYMBOLS})
+
+    # ...and each venue resyncs from REST once it is back
+    assert wait_for(lambda: standins.call_counts().get("http.info.allMids", 0) >= 1)
+    assert wait_for(lambda: standins.call_counts().get("bybit.get_tickers", 0) >= 1)
+
+
+def test_wrappers_read_from_the_live_store(feeds):
+    import hyperliquid_local.sdk_wrapper as hl_wrapper
+
+    streams, _, _ = feeds
+    assert wait_for(lambda: _filled(streams.store))
+    standins.reset_call_counts()
+    assert set(HL_COINS) <= set(hl_wrapper.get_all_mids())
+    assert "http.info.allMids" not in standins.call_counts()
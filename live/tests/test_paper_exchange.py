@@ -0,0 +1,26 @@
+import bybit_local.sdk_wrapper_bybit as bybit_wrapper
+import hyperliquid_local.sdk_wrapper as hl_wrapper
+from lazy_client import LazyClient
+from paper_exchange import PaperExchange, PriceTape
+
+
+def _paper():
+    return PaperExchange(PriceTape.random_walk({"ETH": 3200.0}, steps=3600))
+
+
+def test_leaving_the_simulator_does_not_build_the_real_clients(monkeypatch):
+    # Unbuilt clients, whatever earlier tests resolved
+    monkeypatch.setattr(bybit_wrapper, "session", LazyClient("bybit.session", bybit_wrapper._build_session))
+    monkeypatch.setattr(hl_wrapper, "info", LazyClient("hl.info", hl_wrapper._build_info))
+    monkeypatch.setattr(hl_wrapper, "exchange", LazyClient("hl.exchange", hl_wrapper._build_exchange))
+    assert not bybit_wrapper.session.loaded and not hl_wrapper.exchange.loaded
+    with _paper():
+        assert "ETHUSDT" in bybit_wrapper.get_instruments_table()
+    assert not bybit_wrapper.session.loaded and not hl_wrapper.exchange.loaded
+
+
+def test_unsimulated_calls_raise_attribute_error():
+    paper = _paper()
+    for client in (paper.bybit_session, paper.hl_info, paper.hl_exchange):
+        assert not hasattr(client, "no_such_call")
+        assert getattr(client, "no_such_call", None) is None
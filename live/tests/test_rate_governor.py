@@ -0,0 +1,65 @@
+import json
+
+import pytest
+import requests
+
+import http_transport
+from rate_governor import (
+    RateGovernor, RequestDeferred, VENUE_BYBIT, VENUE_HL, PRIORITY_BACKGROUND, PRIORITY_READ, priority,
+)
+
+HL_EXCHANGE = "https://api.hyperliquid.xyz/exchange"
+
+
+def _hl_action(action_type):
+    body = {"action": {"type": action_type, "orders": []}}
+    return requests.Request("POST", HL_EXCHANGE, data=json.dumps(body)).prepare()
+
+
+@pytest.fixture
+def governor():
+    governor = RateGovernor()
+    governor.register_host("api.hyperliquid.xyz", VENUE_HL)
+    return governor
+
+
+def test_address_budget_is_counted(governor):
+    governor.update_hl_user_limit({"nRequestsUsed": 10, "nRequestsCap": 1000})
+    governor.admit(_hl_action("order"))
+    governor.admit(_hl_action("updateLeverage"))
+    assert governor.hl_actions_left() == 988
+    assert "HL actions 988 left" in governor.summary_line()
+
+
+def test_background_actions_keep_off_the_reserve(governor):
+    governor.update_hl_user_limit({"nRequestsUsed": 750, "nRequestsCap": 1000})
+    with priority(PRIORITY_BACKGROUND):
+        with pytest.raises(RequestDeferred):
+            governor.admit(_hl_action("updateLeverage"))
+        # Orders may still use it, whatever the thread's priority
+        governor.admit(_hl_action("order"))
+    with priority(PRIORITY_READ):
+        governor.admit(_hl_action("updateLeverage"))
+    assert governor.stats["deferred"] == 1
+
+
+def test_spent_budget_spaces_orders(governor, monkeypatch):
+    monkeypatch.setattr("rate_governor.ORDER_MAX_WAIT", 0.05)
+    governor.update_hl_user_limit({"nRequestsUsed": 1000, "nRequestsCap": 1000})
+    governor.admit(_hl_action("order"))
+    governor.admit(_hl_action("order"))
+    assert governor.stats["waited_s"] >= 0.05
+
+
+def test_deferred_status_calls_are_reported_not_empty(governor, monkeypatch):
+    import main_gui_combined as app
+
+    governor.register_host("api.bybit.com", VENUE_BYBIT)
+    monkeypatch.setattr(http_transport, "GOVERNOR", governor)
+    throttled = requests.Response()
+    throttled.status_code = 429
+    governor.observe(requests.Request("POST", "https://api.hyperliquid.xyz/info").prepare(), throttled)
+
+    with priority(PRIORITY_BACKGROUND):
+        snapshot = app.fetch_status_snapshot()
+    assert "deferred" in snapshot.errors["hl_mids"]
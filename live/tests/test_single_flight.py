@@ -0,0 +1,46 @@
+import threading
+import time
+
+import pytest
+
+import bybit_local.sdk_wrapper_bybit as bybit_wrapper
+from bench import standins
+
+
+@pytest.fixture
+def slow_bybit():
+    bybit_wrapper.get_instruments_table(force=True)
+    bybit_wrapper.get_ticker_snapshot(force=True)
+    standins.set_latency(300, jitter=0)
+    yield
+    standins.set_latency(0)
+
+
+def test_slow_refresh_does_not_hold_up_cached_reads(slow_bybit):
+    bybit_wrapper.invalidate_funding_snapshot()
+    standins.reset_call_counts()
+    refreshes = [threading.Thread(target=bybit_wrapper.get_ticker_snapshot) for _ in range(2)]
+    for thread in refreshes:
+        thread.start()
+    time.sleep(0.05)
+
+    started = time.perf_counter()
+    assert "SYN000USDT" in bybit_wrapper.get_instruments_table()
+    assert "SYN000USDT" in bybit_wrapper.get_ticker_snapshot()  # the last index while the fetch runs
+    assert time.perf_counter() - started < 0.1
+
+    for thread in refreshes:
+        thread.join()
+    assert standins.call_counts().get("bybit.get_tickers") == 1
+
+
+def test_forced_refresh_waits_for_the_fetch_in_flight(slow_bybit):
+    bybit_wrapper.invalidate_funding_snapshot()
+    standins.reset_call_counts()
+    refresh = threading.Thread(target=bybit_wrapper.get_ticker_snapshot)
+    refresh.start()
+    time.sleep(0.05)
+    bybit_wrapper.get_ticker_snapshot(force=True)
+    assert bybit_wrapper._ticker_snapshot["fetched_at"] > time.time() - 1
+    refresh.join()
+    assert standins.call_counts().get("bybit.get_tickers") == 1
@@ -0,0 +1,13 @@
+from status_daemon import prometheus_text
+
+
+def test_non_finite_values_use_the_spec_spellings():
+    text = prometheus_text([("x", "gauge", "help", [
+        ({"k": "nan"}, float("nan")), ({"k": "pos"}, float("inf")), ({"k": "neg"}, float("-inf")),
+        ({"k": "num"}, 1.5), ({"k": "none"}, None),
+    ])])
+    assert 'fund_arb_x{k="nan"} NaN' in text
+    assert 'fund_arb_x{k="pos"} +Inf' in text
+    assert 'fund_arb_x{k="neg"} -Inf' in text
+    assert 'fund_arb_x{k="num"} 1.5' in text
+    assert 'k="none"' not in text
@@ -0,0 +1,255 @@
+import argparse
+import base64
+import hashlib
+import json
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+# Minimal local stand-in for the Hyperliquid and Bybit public WebSocket feeds.
+# It speaks just enough RFC 6455 to drive market_stream.py without network
+# access: subscribe acks, pongs, and a random walk of mids / tickers. Call
+# drop_clients() to exercise the reconnect and REST resync path.
+#
+#   python ws_standin.py --venue hl --port 8765
+#   start_market_streams(hl_url="ws://127.0.0.1:8765", ...)
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+DEFAULT_PRICES = {"BTC": 65000.0, "ETH": 3200.0, "SOL": 150.0, "kPEPE": 0.012, "DOGE": 0.15}
+
+
+def _recv_exact(sock, n):
+    buf = b""
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("client closed")
+        buf += chunk
+    return buf
+
+
+def read_frame(sock):
+    """Return (opcode, payload) for one client frame; client frames are always masked."""
+    first, second = _recv_exact(sock, 2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", _recv_exact(sock, 2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", _recv_exact(sock, 8))[0]
+    mask = _recv_exact(sock, 4) if second & 0x80 else b"\x00\x00\x00\x00"
+    payload = bytearray(_recv_exact(sock, length))
+    for i in range(length):
+        payload[i] ^= mask[i % 4]
+    return opcode, bytes(payload)
+
+
+def encode_frame(payload, opcode=0x1):
+    header = bytearray([0x80 | opcode])
+    if len(payload) < 126:
+        header.append(len(payload))
+    elif len(payload) < 1 << 16:
+        header.append(126)
+        header += struct.pack("!H", len(payload))
+    else:
+        header.append(127)
+        header += struct.pack("!Q", len(payload))
+    return bytes(header) + payload
+
+
+class _Client:
+    def __init__(self, sock):
+        self.sock = sock
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+
+    def send_json(self, message):
+        data = encode_frame(json.dumps(message).encode())
+        with self.lock:
+            self.sock.sendall(data)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server.standin
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+        headers = {}
+        for line in request.decode().split("\r\n")[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + _WS_GUID).encode()).digest())
+        self.request.sendall(
+            b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+        )
+
+        client = _Client(self.request)
+        server.add_client(client)
+        try:
+            while True:
+                opcode, payload = read_frame(self.request)
+                if opcode == 0x8:  # close
+                    break
+                if opcode == 0x9:  # protocol ping
+                    with client.lock:
+                        self.request.sendall(encode_frame(payload, opcode=0xA))
+                    continue
+                if opcode == 0x1:
+                    server.on_message(client, json.loads(payload))
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            server.remove_client(client)
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class StandInServer:
+    def __init__(self, venue="hl", host="127.0.0.1", port=0, interval=0.5, prices=None):
+        self.venue = venue
+        self.interval = interval
+        self.prices = dict(prices or DEFAULT_PRICES)
+        self._clients = []
+        self._clients_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._tcp = _TCPServer((host, port), _Handler)
+        self._tcp.standin = self
+        self.messages_received = []
+
+    @property
+    def url(self):
+        host, port = self._tcp.server_address
+        return f"ws://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self._tcp.serve_forever, daemon=True).start()
+        threading.Thread(target=self._publish_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        self.drop_clients()
+        self._tcp.shutdown()
+        self._tcp.server_close()
+
+    # === Clients
+    def add_client(self, client):
+        with self._clients_lock:
+            self._clients.append(client)
+
+    def remove_client(self, client):
+        with self._clients_lock:
+            if client in self._clients:
+                self._clients.remove(client)
+
+    def clients(self):
+        with self._clients_lock:
+            return list(self._clients)
+
+    def drop_clients(self):
+        """Hard-close every connection, as a venue-side disconnect would."""
+        for client in self.clients():
+            try:
+                client.sock.shutdown(socket.SHUT_RDWR)
+                client.sock.close()
+            except OSError:
+                pass
+
+    def push(self, message, topic=None):
+        for client in self.clients():
+            if topic is None or topic in client.subscriptions:
+                try:
+                    client.send_json(message)
+                except OSError:
+                    self.remove_client(client)
+
+    # === Protocol
+    def on_message(self, client, msg):
+        self.messages_received.append(msg)
+        if self.venue == "hl":
+            self._on_hl_message(client, msg)
+        else:
+            self._on_bybit_message(client, msg)
+
+    def _on_hl_message(self, client, msg):
+        if msg.get("method") == "ping":
+            client.send_json({"channel": "pong"})
+        elif msg.get("method") == "subscribe":
+            sub = msg["subscription"]
+            client.subscriptions.add(sub["type"] if sub["type"] == "allMids" else f"ctx:{sub['coin']}")
+            client.send_json({"channel": "subscriptionResponse", "data": msg})
+
+    def _on_bybit_message(self, client, msg):
+        if msg.get("op") == "ping":
+            client.send_json({"op": "pong", "success": True, "ret_msg": "pong"})
+        elif msg.get("op") == "subscribe":
+            for topic in msg["args"]:
+                client.subscriptions.add(topic)
+            client.send_json({"op": "subscribe", "success": True, "ret_msg": ""})
+            for topic in msg["args"]:
+                client.send_json(self._bybit_ticker(topic, "snapshot"))
+
+    # === Synthetic market
+    def _coin(self, symbol):
+        coin = symbol.replace("USDT", "")
+        return "k" + coin[4:] if coin.startswith("1000") else coin
+
+    def _bybit_ticker(self, topic, kind):
+        symbol = topic.split(".", 1)[1]
+        px = self.prices.setdefault(self._coin(symbol), 1.0)
+        data = {"symbol": symbol, "markPrice": f"{px:.6g}", "lastPrice": f"{px:.6g}",
+                "fundingRate": f"{random.uniform(-0.0005, 0.0005):.6f}"}
+        if kind == "snapshot":
+            data["nextFundingTime"] = str((int(time.time() // 28800) + 1) * 28800 * 1000)
+        return {"topic": topic, "type": kind, "ts": int(time.time() * 1000), "data": data}
+
+    def _step_prices(self):
+        for coin, px in self.prices.items():
+            self.prices[coin] = px * (1 + random.gauss(0, 0.0005))
+
+    def _publish_loop(self):
+        while not self._stop_event.wait(self.interval):
+            self._step_prices()
+            if self.venue == "hl":
+                self.push({"channel": "allMids", "data": {"mids": {c: f"{p:.6g}" for c, p in self.prices.items()}}},
+                          topic="allMids")
+                for coin, px in self.prices.items():
+                    self.push({"channel": "activeAssetCtx", "data": {"coin": coin, "ctx": {
+                        "funding": f"{random.uniform(-0.0001, 0.0001):.8f}",
+                        "markPx": f"{px:.6g}", "midPx": f"{px:.6g}", "oraclePx": f"{px:.6g}",
+                    }}}, topic=f"ctx:{coin}")
+            else:
+                for client in self.clients():
+                    for topic in list(client.subscriptions):
+                        try:
+                            client.send_json(self._bybit_ticker(topic, "delta"))
+                        except OSError:
+                            self.remove_client(client)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the HL / Bybit public WebSocket feeds")
+    parser.add_argument("--venue", choices=["hl", "bybit"], default="hl")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = StandInServer(args.venue, port=args.port, interval=args.interval).start()
+    print(f"🧪 {args.venue} stand-in feed on {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()